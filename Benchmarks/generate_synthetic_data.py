@@ -0,0 +1,173 @@
+import numpy as np
+import os
+
+# column layouts of the BLS state files, which drift across years - keys are the first year each layout applies to
+COLUMN_LAYOUTS = {
+    2001:["area", "st", "area_title", "occ_code", "occ_title", "group", "tot_emp", "emp_prse", "h_mean", "a_mean", "mean_prse",
+          "h_wpct10", "h_wpct25", "h_median", "h_wpct75", "h_wpct90", "a_wpct10", "a_wpct25", "a_median", "a_wpct75", "a_wpct90",
+          "annual", "hourly"],
+    2010:["AREA", "ST", "STATE", "OCC_CODE", "OCC_TITLE", "GROUP", "TOT_EMP", "EMP_PRSE", "JOBS_1000", "LOC_QUOTIENT", "H_MEAN", "A_MEAN", "MEAN_PRSE",
+          "H_PCT10", "H_PCT25", "H_MEDIAN", "H_PCT75", "H_PCT90", "A_PCT10", "A_PCT25", "A_MEDIAN", "A_PCT75", "A_PCT90",
+          "ANNUAL", "HOURLY"],
+    2019:["AREA", "AREA_TITLE", "AREA_TYPE", "PRIM_STATE", "NAICS", "NAICS_TITLE", "I_GROUP", "OWN_CODE", "OCC_CODE", "OCC_TITLE", "O_GROUP",
+          "TOT_EMP", "EMP_PRSE", "JOBS_1000", "LOC_QUOTIENT", "PCT_TOTAL", "PCT_RPT", "H_MEAN", "A_MEAN", "MEAN_PRSE",
+          "H_PCT10", "H_PCT25", "H_MEDIAN", "H_PCT75", "H_PCT90", "A_PCT10", "A_PCT25", "A_MEDIAN", "A_PCT75", "A_PCT90",
+          "ANNUAL", "HOURLY"],
+}
+
+STATES = ["Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware", "District of Columbia", "Florida",
+          "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa", "Kansas", "Kentucky", "Louisiana", "Maine", "Maryland", "Massachusetts",
+          "Michigan", "Minnesota", "Mississippi", "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire", "New Jersey", "New Mexico",
+          "New York", "North Carolina", "North Dakota", "Ohio", "Oklahoma", "Oregon", "Pennsylvania", "Rhode Island", "South Carolina",
+          "South Dakota", "Tennessee", "Texas", "Utah", "Vermont", "Virginia", "Washington", "West Virginia", "Wisconsin", "Wyoming",
+          "Guam", "Puerto Rico", "Virgin Islands"]
+
+# words occupation titles are built from
+TITLE_QUALIFIERS = ["industrial", "electrical", "mechanical", "medical", "production", "food", "warehouse", "retail", "software", "agricultural",
+                    "chemical", "construction", "transportation", "financial", "legal", "dental", "marine", "aircraft", "textile", "metal"]
+TITLE_OBJECTS = ["equipment", "machine", "truck", "tractor", "systems", "records", "materials", "products", "parts", "services",
+                 "plant", "vehicle", "cargo", "freight", "patient", "process", "quality", "inventory", "assembly", "maintenance"]
+TITLE_ROLES = ["operators", "assemblers", "technicians", "managers", "clerks", "inspectors", "mechanics", "installers", "helpers", "workers",
+               "supervisors", "engineers", "analysts", "specialists", "repairers", "drivers", "setters", "testers", "fabricators", "handlers"]
+
+# words of synthetic industry corpora
+CORPUS_WORDS = ["light", "manufacturing", "assembly", "packaging", "forklift", "warehouse", "production", "machine", "quality", "inventory",
+                "distribution", "shipment", "labor", "parts", "components", "welder", "products", "materials", "trucks", "operators"]
+
+
+def generate_occupations(num_occupations:int, seed:int=0):
+    """
+    Generates BLS-shaped occupations - (OCC_CODE, OCC_TITLE) pairs, w/ titles using the punctuation found in real titles (commas, "and", "--")
+
+    Parameters:
+        num_occupations (int): number of occupations to generate
+        seed (int): random seed
+
+    Returns:
+        occupations (list): list of (occ_code, occ_title) tuples
+    """
+    rng = np.random.default_rng(seed)
+    occupations = []
+    titles = set()
+    while len(occupations) < num_occupations:
+        qualifier, obj, role = rng.choice(TITLE_QUALIFIERS), rng.choice(TITLE_OBJECTS), rng.choice(TITLE_ROLES)
+        style = rng.integers(4)
+        if style == 0:
+            title = f"{qualifier} {obj} {role}"
+        elif style == 1:
+            title = f"{role}, {qualifier} {obj}"
+        elif style == 2:
+            title = f"{qualifier} {obj} {role} and {rng.choice(TITLE_ROLES)}"
+        else:
+            title = f"{role}--{qualifier} {obj}"
+        title = title[0].upper() + title[1:]
+        if title in titles:
+            continue
+        titles.add(title)
+        occupations.append((f"{rng.integers(11, 54)}-{rng.integers(1000, 9999)}", " ".join(word.capitalize() if word != "and" else word for word in title.split(" "))))
+    return occupations
+
+
+def format_number(value:float, integer:bool):
+    """
+    Formats a number the way BLS files do - thousands separators, hourly wages w/ 2 decimals
+    """
+    return f"{int(round(value)):,}" if integer else f"{value:,.2f}"
+
+
+def generate_bls_files(output_loc:str, years:list, num_states:int=20, num_occupations:int=400, suppression_rate:float=0.05, seed:int=0,
+                       filename_format:str="state_M{year}_dl.csv"):
+    """
+    Generates BLS-shaped yearly state files - column names drift across years (see COLUMN_LAYOUTS), numbers are comma-formatted,
+    suppression markers ("*", "**", "#") replace some values, and some years upper-case titles or append a trailing "*"
+    As in the real files, some columns only hold suppression markers in some years (MEAN_PRSE, LOC_Q in even years), so they are numeric in the other years
+
+    Parameters:
+        output_loc (str): folder to write the files to
+        years (list): two-item list representing range of years to generate
+        num_states (int): number of states per year (at most len(STATES))
+        num_occupations (int): number of occupations per state
+        suppression_rate (float): share of numeric values replaced by a suppression marker
+        seed (int): random seed
+        filename_format (str): format of the filenames
+
+    Returns:
+        num_rows (int): number of data rows written across all files
+    """
+    os.makedirs(output_loc, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    occupations = generate_occupations(num_occupations=num_occupations, seed=seed)
+    states = STATES[:num_states]
+    num_rows = 0
+
+    for year in range(years[0], years[1]+1):
+        layout = COLUMN_LAYOUTS[max(first_year for first_year in COLUMN_LAYOUTS if first_year <= year)]
+        num_year_rows = len(states) * len(occupations)
+
+        # numeric values for the whole year at once
+        tot_emp = rng.lognormal(7, 1.5, num_year_rows)
+        h_mean = rng.lognormal(3, 0.4, num_year_rows)
+        h_pcts = np.sort(h_mean[:, None] * rng.uniform(0.5, 1.6, (num_year_rows, 5)), axis=1)
+        suppressed = rng.random((num_year_rows, 3)) < suppression_rate
+        mixed_year = year % 2 == 0
+
+        lines = [",".join(layout)]
+        row = 0
+        for state_num, state in enumerate(states):
+            for occ_code, occ_title in occupations:
+                title = occ_title.upper() if year % 7 == 0 else occ_title + ("*" if year % 5 == 0 else "")
+                values = {
+                    "AREA":str(state_num + 1), "ST":state[:2].upper(), "PRIM_STATE":state[:2].upper(), "AREA_TITLE":state, "STATE":state,
+                    "AREA_TYPE":"2", "NAICS":"000000", "NAICS_TITLE":"Cross-industry", "I_GROUP":"cross-industry", "OWN_CODE":"1235",
+                    "OCC_CODE":occ_code, "OCC_TITLE":title, "GROUP":"detailed", "O_GROUP":"detailed",
+                    "TOT_EMP":"**" if suppressed[row, 0] else format_number(tot_emp[row], True),
+                    "EMP_PRSE":f"{rng.uniform(1, 30):.1f}", "JOBS_1000":f"{rng.uniform(0.1, 20):.3f}",
+                    "LOC_QUOTIENT":"**" if mixed_year and suppressed[row, 0] else f"{rng.uniform(0.2, 3):.2f}",
+                    "PCT_TOTAL":"", "PCT_RPT":"",
+                    "H_MEAN":"*" if suppressed[row, 1] else format_number(h_mean[row], False),
+                    "A_MEAN":"*" if suppressed[row, 1] else format_number(h_mean[row] * 2080, True),
+                    "MEAN_PRSE":"*" if mixed_year and suppressed[row, 1] else f"{rng.uniform(0.5, 10):.1f}",
+                    "ANNUAL":"", "HOURLY":"",
+                }
+                for pct_num, pct in enumerate(["PCT10", "PCT25", "MEDIAN", "PCT75", "PCT90"]):
+                    # top-coded wages are marked "#"
+                    top_coded = pct_num == 4 and suppressed[row, 2]
+                    values[f"H_{pct}"] = "#" if top_coded else format_number(h_pcts[row, pct_num], False)
+                    values[f"A_{pct}"] = "#" if top_coded else format_number(h_pcts[row, pct_num] * 2080, True)
+                    values[f"H_W{pct}"], values[f"A_W{pct}"] = values[f"H_{pct}"], values[f"A_{pct}"]
+                lines.append(",".join(f'"{values[col.upper()]}"' if "," in values[col.upper()] else values[col.upper()] for col in layout))
+                row += 1
+
+        with open(f"{output_loc}/{filename_format.format(year=year)}", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        num_rows += num_year_rows
+
+    return num_rows
+
+
+def generate_word2vec_binary(model_loc:str, words:list, vector_size:int=300, num_filler_words:int=10000, seed:int=0):
+    """
+    Generates a small word2vec binary (same format as the GoogleNews model) w/ random vectors for words, plus filler words to give the vocabulary a realistic size
+
+    Parameters:
+        model_loc (str): filepath to write the model to
+        words (list): words that must be in the vocabulary - e.g. all title and corpus words
+        vector_size (int): number of dimensions of each vector
+        num_filler_words (int): number of extra words in the vocabulary
+        seed (int): random seed
+    """
+    rng = np.random.default_rng(seed)
+    vocab = list(dict.fromkeys(list(words) + [f"filler{i}" for i in range(num_filler_words)]))
+    vectors = rng.standard_normal((len(vocab), vector_size)).astype(np.float32)
+    os.makedirs(os.path.dirname(os.path.abspath(model_loc)), exist_ok=True)
+    with open(model_loc, "wb") as f:
+        f.write(f"{len(vocab)} {vector_size}\n".encode())
+        for word, vector in zip(vocab, vectors):
+            f.write(word.encode() + b" " + vector.tobytes() + b"\n")
+
+
+def synthetic_vocabulary():
+    """
+    Returns every lower-cased word that synthetic titles and corpora are built from
+    """
+    return [word.lower() for word in TITLE_QUALIFIERS + TITLE_OBJECTS + TITLE_ROLES + CORPUS_WORDS]
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../Scripts")))
+from DataProcessor import DataProcessor
+from JobCodeIdentifier import JobCodeIdentifier
+from DataFilterer import DataFilterer
+from OutputWriter import OutputWriter, OUTPUT_FORMATS, DEFAULT_PARTITION_COLS
+from AggregationCube import AggregationCube
+from generate_synthetic_data import generate_bls_files, generate_word2vec_binary, synthetic_vocabulary, CORPUS_WORDS, STATES
+
+SCALES = {
+    "small":{"years":[2001, 2005], "num_states":10, "num_occupations":200, "num_filler_words":10000},
+    "medium":{"years":[2001, 2022], "num_states":20, "num_occupations":400, "num_filler_words":100000},
+    "large":{"years":[2001, 2022], "num_states":54, "num_occupations":850, "num_filler_words":500000},
+}
+
+
+def read_peak_rss_mb():
+    """
+    Returns peak resident set size of this process since the last reset_peak_rss, in MB (Linux: VmHWM in /proc/self/status)
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def reset_peak_rss():
+    """
+    Resets peak resident set size to the current resident set size, so each stage's peak is measured on its own (Linux only - no-op elsewhere)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def measure(results:dict, stage:str, fn, *args, **kwargs):
+    """
+    Runs fn, recording wall time, CPU time, and peak RSS of the stage in results
+
+    Parameters:
+        results (dict): maps each stage to its measurements - updated in place
+        stage (str): name of the stage
+        fn (callable): function running the stage
+
+    Returns:
+        result: return value of fn
+    """
+    reset_peak_rss()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = fn(*args, **kwargs)
+    results[stage] = {"wall_seconds":round(time.perf_counter() - wall_start, 4),
+                      "cpu_seconds":round(time.process_time() - cpu_start, 4),
+                      "peak_rss_mb":round(read_peak_rss_mb(), 1)}
+    return result
+
+
+def check_outputs(output_writer:OutputWriter, data_all_years, reloaded_data_all_years):
+    """
+    Checks outputs survive a round trip - data from all years (numeric in some years, suppression markers in others) is read back w/ every row,
+    and an output w/ no rows is still written w/ its columns
+
+    Parameters:
+        output_writer (OutputWriter): writer outputs were written w/
+        data_all_years (pd.DataFrame): DF written as data_all_years
+        reloaded_data_all_years (pd.DataFrame): DF read back from data_all_years
+    """
+    if len(reloaded_data_all_years) != len(data_all_years) or set(reloaded_data_all_years.columns) != set(data_all_years.columns):
+        raise RuntimeError(f"data_all_years did not survive a round trip: {data_all_years.shape} written, {reloaded_data_all_years.shape} read back")
+    output_writer.write(df=data_all_years.iloc[:0], name="empty_output")
+    empty_output = output_writer.read(name="empty_output")
+    if len(empty_output) or set(empty_output.columns) != set(data_all_years.columns):
+        raise RuntimeError(f"an output w/ no rows was not written w/ its columns - read back {empty_output.shape}")
+
+
+def run_benchmarks(work_loc:str, scale:str, output_format:str="parquet", tokenizer:str="nltk"):
+    """
+    Generates synthetic BLS files and a synthetic word2vec model in work_loc, then runs & measures each stage of the pipeline:
+    ingest, model_load, occupation_table, tokenize, similarity, filter, aggregate (aggregation cube), write (relevant data & cube), write_all_years,
+    reload (data from all years, read back) - outputs are then checked for round trips (see check_outputs)
+
+    Parameters:
+        work_loc (str): folder for generated inputs and outputs
+        scale (str): one of SCALES
+        output_format (str): format outputs are written in - parquet & arrow are partitioned by YEAR
+        tokenizer (str): "nltk" or "fast" - see JobCodeIdentifier
+
+    Returns:
+        report (dict): scale, environment, and measurements of each stage
+    """
+    config = SCALES[scale]
+    data_loc, output_loc, model_loc = f"{work_loc}/Data", f"{work_loc}/Outputs", f"{work_loc}/synthetic-vectors.bin"
+    os.makedirs(output_loc, exist_ok=True)
+    num_rows = generate_bls_files(output_loc=data_loc, years=config["years"], num_states=config["num_states"], num_occupations=config["num_occupations"])
+    generate_word2vec_binary(model_loc=model_loc, words=synthetic_vocabulary(), num_filler_words=config["num_filler_words"])
+    text_corpus = " ".join(CORPUS_WORDS)
+
+    stages = {}
+    data_processor = measure(stages, "ingest", DataProcessor, input_loc=data_loc, input_filename_format="state_M{year}_dl.csv",
+                             relevant_years=config["years"], output_loc=output_loc)
+    data_all_years = data_processor.data_all_years
+
+    model = measure(stages, "model_load", JobCodeIdentifier.load_model, model_loc=model_loc)
+
+    job_code_identifier = JobCodeIdentifier(data_all_years=data_all_years, job_code_text_corpus=text_corpus, model_loc=model_loc, relevance_threshold=0.1,
+                                            tokenizer=tokenizer)
+    # each distinct occupation is tokenized & scored once, then mapped back to its raw titles (see JobCodeIdentifier.identify_relevant_job_codes)
+    occupation_table = measure(stages, "occupation_table", job_code_identifier.build_occupation_table, data_all_years=data_all_years)
+    normalized_titles = occupation_table["NORMALIZED_TITLE"].unique().tolist()
+    tokenized_titles, tokenized_text_corpus = measure(stages, "tokenize",
+                                                      lambda: (job_code_identifier.tokenize_titles(occupation_titles=normalized_titles),
+                                                               job_code_identifier.tokenize_text_corpus(text_corpus=text_corpus)))
+
+    similarities = measure(stages, "similarity", job_code_identifier.calculate_corpora_similarities,
+                           model=model, tokenized_titles=tokenized_titles, text_corpora=[tokenized_text_corpus])
+    occupation_titles, similarities = job_code_identifier.map_to_raw_titles(occupation_table=occupation_table, normalized_titles=normalized_titles,
+                                                                            similarities=similarities)
+    relevant_job_titles = [title for title, similarity in zip(occupation_titles, similarities[:, 0]) if similarity > job_code_identifier.relevance_threshold]
+
+    data_filterer = DataFilterer(relevant_states=STATES[:config["num_states"]:2])
+    data_to_analyze = measure(stages, "filter", lambda: data_filterer.standardize_occ_title_format(
+                                  relevant_data=data_filterer.filter_data(data_all_years=data_all_years, relevant_job_titles=relevant_job_titles)))
+
+    cube = measure(stages, "aggregate", AggregationCube().build, detail_data=data_to_analyze)
+
+    output_writer = OutputWriter(output_loc=output_loc, output_format=output_format, partition_cols=DEFAULT_PARTITION_COLS)
+    measure(stages, "write", lambda: (output_writer.write(df=data_to_analyze, name="synthetic_industry"),
+                                      output_writer.write(df=cube, name="synthetic_industry_cube")))
+    measure(stages, "write_all_years", output_writer.write, df=data_all_years, name="data_all_years")
+    reloaded_data_all_years = measure(stages, "reload", output_writer.read, name="data_all_years")
+    check_outputs(output_writer=output_writer, data_all_years=data_all_years, reloaded_data_all_years=reloaded_data_all_years)
+    output_bytes = sum(os.path.getsize(os.path.join(folder, filename)) for folder, _, filenames in os.walk(output_writer.get_output_path(name="data_all_years"))
+                       for filename in filenames) if output_format != "csv" else os.path.getsize(output_writer.get_output_path(name="data_all_years"))
+
+    return {"scale":scale,
+            "output_format":output_format,
+            "data_all_years_mb_on_disk":round(output_bytes / 1024**2, 2),
+            "rows_in":num_rows,
+            "unique_titles":len(occupation_titles),
+            "normalized_titles":len(normalized_titles),
+            "tokenizer":tokenizer,
+            "rows_out":len(data_to_analyze),
+            "cube_rows":len(cube),
+            "environment":{"python":platform.python_version(), "machine":platform.machine(), "cpu_count":os.cpu_count()},
+            "stages":stages}
+
+
+# absolute slack below which a change is treated as noise, whatever its ratio - sub-second stages are noisy
+MIN_REGRESSION = {"wall_seconds":0.05, "peak_rss_mb":10}
+
+
+def compare_to_baseline(report:dict, baseline:dict, tolerance:float):
+    """
+    Compares each stage's wall time and peak RSS to the baseline - a measurement regresses if it exceeds the baseline by more than
+    tolerance (as a ratio) and by more than MIN_REGRESSION (in absolute terms)
+
+    Parameters:
+        report (dict): report returned by run_benchmarks
+        baseline (dict): previously saved report for the same scale
+        tolerance (float): ratio to the baseline above which a measurement counts as a regression - e.g. 1.25 allows 25% slack
+
+    Returns:
+        regressions (list): descriptions of measurements that regressed
+    """
+    regressions = []
+    for stage, measurements in report["stages"].items():
+        baseline_measurements = baseline["stages"].get(stage)
+        if baseline_measurements is None:
+            continue
+        for metric in ("wall_seconds", "peak_rss_mb"):
+            ratio = measurements[metric] / baseline_measurements[metric] if baseline_measurements[metric] else 1.0
+            print(f"  {stage:<12} {metric:<13} {baseline_measurements[metric]:>10} -> {measurements[metric]:>10}  ({ratio:.2f}x)")
+            if ratio > tolerance and measurements[metric] - baseline_measurements[metric] > MIN_REGRESSION[metric]:
+                regressions.append(f"{stage} {metric}: {baseline_measurements[metric]} -> {measurements[metric]} ({ratio:.2f}x)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks on synthetic BLS data and synthetic word vectors")
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="size of the synthetic data")
+    parser.add_argument("--work-loc", default=None, help="folder for generated inputs and outputs - a temporary folder by default")
+    parser.add_argument("--baseline-loc", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json"),
+                        help="JSON file of baseline reports, one per scale")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline for its scale")
+    parser.add_argument("--output-format", choices=list(OUTPUT_FORMATS), default="parquet", help="format outputs are written in")
+    parser.add_argument("--tokenizer", choices=["nltk", "fast"], default="nltk", help="tokenizer used to tokenize titles and the corpus")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="ratio to the baseline above which a stage counts as regressed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_loc:
+        report = run_benchmarks(work_loc=args.work_loc or tmp_loc, scale=args.scale, output_format=args.output_format, tokenizer=args.tokenizer)
+    print(json.dumps(report, indent=2))
+
+    baselines = {}
+    if os.path.exists(args.baseline_loc):
+        with open(args.baseline_loc) as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[args.scale] = report
+        with open(args.baseline_loc, "w") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Saved baseline for scale '{args.scale}' to {args.baseline_loc}")
+    elif args.scale in baselines:
+        print(f"Comparison to baseline (scale '{args.scale}'):")
+        regressions = compare_to_baseline(report=report, baseline=baselines[args.scale], tolerance=args.tolerance)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No regressions")
+    else:
+        print(f"No baseline for scale '{args.scale}' - run w/ --save-baseline to store one")
@@ -0,0 +1,239 @@
+import pandas as pd
+import numpy as np
+from DataProcessor import DataProcessor
+
+# labels of the STATE / OCC_TITLE columns on rows that total across all states / all occupations
+ALL_STATES = "All States"
+ALL_OCCUPATIONS = "All Occupations"
+# aggregation levels of the cube, mapped to the columns (besides YEAR) each level is grouped by
+CUBE_LEVELS = {"state_occupation":["STATE", "OCC_TITLE"], "occupation":["OCC_TITLE"], "state":["STATE"], "total":[]}
+# O_GROUP values of rows that total other rows - e.g. "Production Occupations" (major) sums its detailed occupations, "All Occupations" (total) sums every occupation
+# older files leave O_GROUP blank on detailed rows, so any other value (incl. a missing one) counts as detailed
+AGGREGATE_GROUPS = ["total", "major", "minor", "broad"]
+# wage columns averaged over employment - means and percentiles
+WAGE_COLS = ["A_MEAN", "H_MEAN", "A_PCT10", "A_PCT25", "A_MEDIAN", "A_PCT75", "A_PCT90"]
+
+class AggregationCube:
+    """
+    Class designed to precompute the rollups dashboards need from the filtered output, w/ vectorized groupby sums - one row per cell of
+    year x state x occupation, plus totals across states (STATE = ALL_STATES), across occupations (OCC_TITLE = ALL_OCCUPATIONS), and across both
+
+    Columns of each cell:
+        AGGREGATION_LEVEL: one of CUBE_LEVELS - state_occupation, occupation (all states), state (all occupations), or total
+        ROWS: number of detail rows in the cell
+        TOT_EMP: total employment of the rows that report it
+        A_MEAN, H_MEAN: employment-weighted mean wages - over rows that report both employment and the wage
+        A_PCT10 ... A_PCT90: employment-weighted averages of the rows' wage percentiles (exact for a single row - percentiles can't be combined exactly
+                             from published percentiles, so aggregated cells approximate them)
+        A_PCT90_10_SPREAD, A_PCT75_25_SPREAD: percentile wage spreads
+        {col}_SUPPRESSED_ROWS: number of rows whose value was suppressed (e.g. "*", "#") or missing - totals & means of such cells only cover the reported rows
+        TOT_EMP_YOY, A_MEAN_YOY: growth since the previous year of the same state & occupation
+        TOT_EMP_CAGR, A_MEAN_CAGR: compound annual growth rate since the first year of the same state & occupation in the cube
+        {growth col}_COVERAGE: share of the cell's state & occupation pairs its growth is calculated over - see below
+
+    Cells totaling across occupations (state & total levels) only include detailed occupations - rows whose O_GROUP is one of AGGREGATE_GROUPS
+    (e.g. a "Production Occupations" major group, or the "All Occupations" total) already sum detailed rows, so including them would count employment twice
+    and skew the weighted wages. Such rows still get their own cells at the state_occupation & occupation levels
+
+    Growth is calculated over the state & occupation pairs of a cell that are complete (no suppressed rows) in both years compared - a total over
+    the reported rows of a cell w/ suppressed rows is a lower bound, and comparing it to another year would mix changes in the value w/ changes
+    in what was reported. Growth of a state & occupation cell is thus only calculated if the cell is complete in both years, while cells totaling
+    across states or occupations (where nearly every cell has a suppressed row somewhere) compare the same complete pairs in both years -
+    e.g. TOT_EMP_YOY of a state is the employment growth of its occupations reported in both years. {growth col}_COVERAGE is the share of
+    the cell's pairs that are included (1 if all of them are) - dashboards can hide growth w/ too little coverage
+    CAGR compares each year to the first year of the series in which one of its pairs is complete
+
+    Attributes:
+        cube (pd.DataFrame): the aggregation cube - None until build is called
+
+    Methods:
+        __init__: initializes instance of AggregationCube class
+        build: builds the aggregation cube from the filtered output
+        find_aggregate_rows: returns a mask of rows that total other rows (major groups, totals)
+        parse_column: returns a detail column as float64 numbers, w/ a mask of suppressed or missing values
+        aggregate_level: sums the cell components of one aggregation level
+        add_growth: adds year-over-year growth & CAGR columns of a metric, w/ their coverage
+        sum_matched_pairs: sums a metric over the state & occupation pairs complete in two years, per cell
+    """
+    def __init__(self):
+        """
+        Initializes instance of AggregationCube class
+        """
+        self.cube = None
+
+    def build(self, detail_data:pd.DataFrame):
+        """
+        Builds the aggregation cube from the filtered output - works on data w/ or w/o the typed schema (see DataProcessor.apply_typed_schema)
+
+        Parameters:
+            detail_data (pd.DataFrame): filtered data w/ standardized OCC_TITLE - returned from DataFilterer.standardize_occ_title_format
+
+        Returns:
+            cube (pd.DataFrame): the aggregation cube - see class docstring
+        """
+        employment, employment_suppressed = self.parse_column(detail_data=detail_data, col="TOT_EMP")
+        # per-row components of each cell - every metric of a cell is a ratio of sums, so each level is a single groupby sum
+        components = {"YEAR":detail_data["YEAR"].to_numpy(dtype=np.int64),
+                      "STATE":detail_data["STATE"].astype(object).to_numpy(),
+                      "OCC_TITLE":detail_data["OCC_TITLE"].astype(object).to_numpy(),
+                      "DETAILED":~self.find_aggregate_rows(detail_data=detail_data),
+                      "ROWS":np.ones(len(detail_data), dtype=np.int64),
+                      "TOT_EMP":np.where(employment_suppressed, 0.0, employment),
+                      "TOT_EMP_REPORTED_ROWS":~employment_suppressed,
+                      "TOT_EMP_SUPPRESSED_ROWS":employment_suppressed}
+        for col in WAGE_COLS:
+            wages, wages_suppressed = self.parse_column(detail_data=detail_data, col=col)
+            weighted = ~wages_suppressed & ~employment_suppressed
+            components[f"{col}_WEIGHTED_SUM"] = np.where(weighted, wages * employment, 0.0)
+            components[f"{col}_WEIGHT"] = np.where(weighted, employment, 0.0)
+            components[f"{col}_SUPPRESSED_ROWS"] = wages_suppressed
+        components = pd.DataFrame(components)
+
+        cube = pd.concat([self.aggregate_level(components=components, level=level) for level in CUBE_LEVELS], ignore_index=True)
+        # no reported employment -> unknown total, not 0
+        cube["TOT_EMP"] = cube["TOT_EMP"].where(cube.pop("TOT_EMP_REPORTED_ROWS") > 0)
+        for col in WAGE_COLS:
+            weight = cube.pop(f"{col}_WEIGHT")
+            cube[col] = (cube.pop(f"{col}_WEIGHTED_SUM") / weight).where(weight > 0)
+        cube["A_PCT90_10_SPREAD"] = cube["A_PCT90"] - cube["A_PCT10"]
+        cube["A_PCT75_25_SPREAD"] = cube["A_PCT75"] - cube["A_PCT25"]
+
+        cube = cube.sort_values(["AGGREGATION_LEVEL", "STATE", "OCC_TITLE", "YEAR"], kind="stable", ignore_index=True)
+        for col in ("TOT_EMP", "A_MEAN"):
+            self.add_growth(cube=cube, col=col)
+
+        suppressed_cols = ["TOT_EMP_SUPPRESSED_ROWS"] + [f"{col}_SUPPRESSED_ROWS" for col in WAGE_COLS]
+        self.cube = cube[["YEAR", "STATE", "OCC_TITLE", "AGGREGATION_LEVEL", "ROWS", "TOT_EMP"] + WAGE_COLS +
+                         ["A_PCT90_10_SPREAD", "A_PCT75_25_SPREAD", "TOT_EMP_YOY", "TOT_EMP_CAGR", "A_MEAN_YOY", "A_MEAN_CAGR",
+                          "TOT_EMP_YOY_COVERAGE", "TOT_EMP_CAGR_COVERAGE", "A_MEAN_YOY_COVERAGE", "A_MEAN_CAGR_COVERAGE"] + suppressed_cols]
+        return self.cube
+
+    def find_aggregate_rows(self, detail_data:pd.DataFrame):
+        """
+        Returns a mask of rows that total other rows - O_GROUP (GROUP in older files, see NEW_COL_NAMES) is one of AGGREGATE_GROUPS
+
+        Parameters:
+            detail_data (pd.DataFrame): filtered data
+
+        Returns:
+            aggregate_rows (np.ndarray): bool mask of major group, minor group, broad occupation, and total rows
+        """
+        if "O_GROUP" not in detail_data.columns:
+            return np.zeros(len(detail_data), dtype=bool)
+        return detail_data["O_GROUP"].astype("string").str.strip().str.lower().isin(AGGREGATE_GROUPS).to_numpy(dtype=bool)
+
+    def parse_column(self, detail_data:pd.DataFrame, col:str):
+        """
+        Returns a detail column as float64 numbers - raw columns are parsed w/ DataProcessor.parse_numeric_column, typed columns are already numeric
+
+        Parameters:
+            detail_data (pd.DataFrame): filtered data
+            col (str): name of a numeric column - e.g. TOT_EMP
+
+        Returns:
+            numbers (np.ndarray): float64 values, NaN where the value was suppressed or missing
+            suppressed (np.ndarray): bool mask of rows whose value was suppressed or missing
+        """
+        if col not in detail_data.columns: # e.g. a column not published in the years we read
+            return np.full(len(detail_data), np.nan), np.ones(len(detail_data), dtype=bool)
+        values = detail_data[col]
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            numbers = DataProcessor.parse_numeric_column(values=values)[0].to_numpy()
+        return numbers, np.isnan(numbers)
+
+    def aggregate_level(self, components:pd.DataFrame, level:str):
+        """
+        Sums the cell components of one aggregation level - columns the level totals across are labeled ALL_STATES / ALL_OCCUPATIONS
+
+        Parameters:
+            components (pd.DataFrame): per-row components of each cell - see build
+            level (str): one of CUBE_LEVELS
+
+        Returns:
+            level_cells (pd.DataFrame): summed components of each cell of the level
+        """
+        keys = ["YEAR"] + CUBE_LEVELS[level]
+        if "OCC_TITLE" not in keys: # rows of major groups & totals would double-count the detailed occupations they sum
+            components = components[components["DETAILED"]]
+        # summing DETAILED counts the cell's detailed rows
+        level_cells = components.drop(columns=[col for col in ("STATE", "OCC_TITLE") if col not in keys]).groupby(keys, sort=False).sum().reset_index()
+        if "STATE" not in keys:
+            level_cells["STATE"] = ALL_STATES
+        if "OCC_TITLE" not in keys:
+            level_cells["OCC_TITLE"] = ALL_OCCUPATIONS
+        level_cells["AGGREGATION_LEVEL"] = level
+        return level_cells
+
+    def add_growth(self, cube:pd.DataFrame, col:str):
+        """
+        Adds {col}_YOY (growth since the previous year) and {col}_CAGR (compound annual growth since the first year) columns to cube, in place,
+        w/ their coverage - growth is calculated over the state & occupation pairs complete in both years compared (see class docstring)
+
+        Parameters:
+            cube (pd.DataFrame): the aggregation cube, w/ the DETAILED count of detailed rows of each cell
+            col (str): metric to calculate growth of - TOT_EMP (summed) or A_MEAN (averaged over employment)
+        """
+        # state & occupation pairs - the units growth is matched on - w/ their weighted metric where complete
+        pairs = cube[cube["AGGREGATION_LEVEL"] == "state_occupation"]
+        complete = ((pairs["TOT_EMP_SUPPRESSED_ROWS"] == 0) & (pairs[f"{col}_SUPPRESSED_ROWS"] == 0) & (pairs[col] > 0)).to_numpy()
+        weights = np.ones(len(pairs)) if col == "TOT_EMP" else pairs["TOT_EMP"].to_numpy(dtype=np.float64, na_value=np.nan)
+        pairs = pd.DataFrame({"YEAR":pairs["YEAR"].to_numpy(), "PAIR_STATE":pairs["STATE"].to_numpy(), "PAIR_OCC_TITLE":pairs["OCC_TITLE"].to_numpy(),
+                              "DETAILED":(pairs["DETAILED"] == pairs["ROWS"]).to_numpy(), "COMPLETE":complete,
+                              "VALUE":np.where(complete, pairs[col].to_numpy(dtype=np.float64, na_value=np.nan) * weights, 0.0),
+                              "WEIGHT":np.where(complete, weights, 0.0)})
+
+        growth = []
+        for level, keys in CUBE_LEVELS.items():
+            # pairs of each cell of the level, labeled like the level's cells - cells totaling across occupations only hold detailed occupations
+            level_pairs = pairs if "OCC_TITLE" in keys else pairs[pairs["DETAILED"]]
+            level_pairs = level_pairs.assign(AGGREGATION_LEVEL=level,
+                                             STATE=level_pairs["PAIR_STATE"] if "STATE" in keys else ALL_STATES,
+                                             OCC_TITLE=level_pairs["PAIR_OCC_TITLE"] if "OCC_TITLE" in keys else ALL_OCCUPATIONS)
+            # first year of each series in which one of its pairs is complete
+            base_years = level_pairs[level_pairs["COMPLETE"]].groupby(["STATE", "OCC_TITLE"], sort=False)["YEAR"].min().rename("BASE_YEAR")
+            level_pairs = level_pairs.join(base_years, on=["STATE", "OCC_TITLE"])
+
+            previous_year = self.sum_matched_pairs(level_pairs=level_pairs, compare_years=level_pairs["YEAR"] - 1)
+            base_year = self.sum_matched_pairs(level_pairs=level_pairs, compare_years=level_pairs["BASE_YEAR"])
+            elapsed_years = (base_year.index.get_level_values("YEAR") - base_year["COMPARE_YEAR"]).to_numpy(dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                growth.append(pd.DataFrame({f"{col}_YOY":previous_year["RATIO"] - 1,
+                                            f"{col}_CAGR":np.where(elapsed_years > 0, base_year["RATIO"] ** (1 / elapsed_years) - 1, np.nan),
+                                            f"{col}_YOY_COVERAGE":previous_year["COVERAGE"],
+                                            f"{col}_CAGR_COVERAGE":np.where(elapsed_years > 0, base_year["COVERAGE"], np.nan)}, index=previous_year.index))
+
+        growth = pd.concat(growth).reindex(pd.MultiIndex.from_frame(cube[["AGGREGATION_LEVEL", "YEAR", "STATE", "OCC_TITLE"]]))
+        for growth_col in growth.columns:
+            cube[growth_col] = growth[growth_col].to_numpy()
+
+    def sum_matched_pairs(self, level_pairs:pd.DataFrame, compare_years:pd.Series):
+        """
+        Compares each cell of a level to another year of the same series, over the state & occupation pairs complete in both years
+
+        Parameters:
+            level_pairs (pd.DataFrame): the level's pairs - YEAR, PAIR_STATE, PAIR_OCC_TITLE, labels of their cell (AGGREGATION_LEVEL, STATE, OCC_TITLE),
+                                        COMPLETE, and the weighted metric (VALUE, WEIGHT) where complete
+            compare_years (pd.Series): year each pair is compared to - e.g. the previous year
+
+        Returns:
+            matched (pd.DataFrame): per cell (indexed by AGGREGATION_LEVEL, YEAR, STATE, OCC_TITLE) - RATIO of the metric over the matched pairs to the metric
+                                    over the same pairs in COMPARE_YEAR (NaN if no pair matched), and COVERAGE (share of the cell's pairs matched)
+        """
+        compared_pairs = level_pairs[["YEAR", "PAIR_STATE", "PAIR_OCC_TITLE", "COMPLETE", "VALUE", "WEIGHT"]].rename(
+            columns={"YEAR":"COMPARE_YEAR", "COMPLETE":"COMPARE_COMPLETE", "VALUE":"COMPARE_VALUE", "WEIGHT":"COMPARE_WEIGHT"})
+        level_pairs = level_pairs.assign(COMPARE_YEAR=compare_years).merge(compared_pairs, on=["COMPARE_YEAR", "PAIR_STATE", "PAIR_OCC_TITLE"], how="left")
+        matched = (level_pairs["COMPLETE"] & level_pairs["COMPARE_COMPLETE"].fillna(False).astype(bool)).to_numpy()
+        sums = pd.DataFrame({"AGGREGATION_LEVEL":level_pairs["AGGREGATION_LEVEL"], "YEAR":level_pairs["YEAR"],
+                             "STATE":level_pairs["STATE"], "OCC_TITLE":level_pairs["OCC_TITLE"], "COMPARE_YEAR":level_pairs["COMPARE_YEAR"],
+                             "PAIRS":1, "MATCHED":matched.astype(np.int64)})
+        for value_col in ("VALUE", "WEIGHT", "COMPARE_VALUE", "COMPARE_WEIGHT"):
+            sums[value_col] = np.where(matched, level_pairs[value_col].to_numpy(dtype=np.float64, na_value=0.0), 0.0)
+        sums = sums.groupby(["AGGREGATION_LEVEL", "YEAR", "STATE", "OCC_TITLE"], sort=False).agg(
+            COMPARE_YEAR=("COMPARE_YEAR", "first"), PAIRS=("PAIRS", "sum"), MATCHED=("MATCHED", "sum"), VALUE=("VALUE", "sum"),
+            WEIGHT=("WEIGHT", "sum"), COMPARE_VALUE=("COMPARE_VALUE", "sum"), COMPARE_WEIGHT=("COMPARE_WEIGHT", "sum"))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = (sums["VALUE"] / sums["WEIGHT"]) / (sums["COMPARE_VALUE"] / sums["COMPARE_WEIGHT"])
+        return pd.DataFrame({"RATIO":ratio.where(sums["MATCHED"] > 0), "COVERAGE":sums["MATCHED"] / sums["PAIRS"],
+                             "COMPARE_YEAR":sums["COMPARE_YEAR"]}, index=sums.index)
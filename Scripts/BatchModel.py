@@ -0,0 +1,206 @@
+import json
+import os
+from Model import Model
+from JobCodeIdentifier import JobCodeIdentifier
+from DataFilterer import DataFilterer
+from RunReport import RunReport
+from OutputWriter import OutputWriter, DEFAULT_PARTITION_COLS
+from AggregationCube import AggregationCube
+
+class BatchModel(Model):
+    """
+    Class designed to read, process, and filter occupational data to data specific to each of many industries
+    Data is ingested once, the Word2Vec model is loaded once, and every industry's corpus is scored in a single pass
+
+    Attributes:
+        industry_specs (list): list of dicts, one per industry - each w/ name, job_code_text_corpus, relevant_states, and relevance_threshold
+        concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest
+        max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+        typed_schema (bool): whether data from all years is stored w/ a compact typed schema (see DataProcessor.apply_typed_schema)
+        chunksize (int): streaming mode - number of rows of each data file read at a time, w/ states of all industries applied while reading - None reads each file in one go
+        run_report (RunReport): per-stage telemetry of the run - disabled unless passed in
+        output_writer (OutputWriter): writes each industry's output - compressed Parquet partitioned by YEAR unless another writer is passed in
+        write_all_years (bool): whether data from all years is also written to the outputs folder (as data_all_years) during the run
+        tokenizer (str): "nltk" to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer (same tokens, w/o importing NLTK)
+        build_cube (bool): whether each industry's aggregation cube is built (see AggregationCube) and written alongside its data
+        cube (dict): maps each industry's name to the aggregation cube of its data - empty if build_cube is False
+        data_to_analyze (dict): maps each industry's name to the data relevant to that industry
+
+    Methods:
+        __init__: Initializes instance of BatchModel class
+        load_industry_specs: reads industry specs from a JSON (or YAML) file
+        check_industry_names: raises ValueError if industry names can't name distinct output files
+        get_stream_states: returns states to filter to while reading data in streaming mode - all states relevant to any industry
+        run: performs reading, processing, filtering processes for all industries, returning data we will analyze for each
+        write_outputs: writes each industry's data (and aggregation cube) to the outputs folder
+    """
+    def __init__(self, industry_specs:list, concurrent:bool=False, max_workers:int=None, typed_schema:bool=False, chunksize:int=None,
+                 run_report:RunReport=None, output_writer:OutputWriter=None, write_all_years:bool=False,
+                 tokenizer:str="nltk", build_cube:bool=True):
+        """
+        Initializes instance of BatchModel class
+
+            Parameters:
+                industry_specs (list): list of dicts, one per industry - each w/ name, job_code_text_corpus, relevant_states (None for all states), and relevance_threshold
+                concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest - output matches the sequential run
+                max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+                typed_schema (bool): whether data from all years is stored w/ a compact typed schema
+                chunksize (int): streaming mode - number of rows of each data file read at a time, w/ states of all industries applied while reading - None reads each file in one go
+                run_report (RunReport): collects per-stage telemetry of the run (filter/standardize/write stages are recorded per industry) - None disables telemetry
+                output_writer (OutputWriter): writes each industry's output - None writes compressed Parquet partitioned by YEAR
+                write_all_years (bool): whether to also write data from all years to the outputs folder (as data_all_years)
+                tokenizer (str): "nltk" (default) to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer - same tokens, w/o the cost of importing NLTK
+                build_cube (bool): whether to build each industry's aggregation cube (year x state x occupation rollups w/ growth), written as {name}_cube
+        """
+        self.check_industry_names(industry_specs=industry_specs)
+        self.industry_specs = industry_specs
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.typed_schema = typed_schema
+        self.chunksize = chunksize
+        self.run_report = run_report if run_report is not None else RunReport(enabled=False)
+        self.output_writer = output_writer if output_writer is not None else OutputWriter(output_loc=self.get_output_loc(), partition_cols=DEFAULT_PARTITION_COLS)
+        self.write_all_years = write_all_years
+        self.tokenizer = tokenizer
+        self.build_cube = build_cube
+        self.cube = {}
+
+        self.data_to_analyze = self.run()
+
+    @staticmethod
+    def load_industry_specs(specs_loc:str):
+        """
+        Reads industry specs from a JSON file (or YAML file, if PyYAML is installed)
+        The file holds a list of industries (or a dict w/ an "industries" list), each w/:
+            - name: name of the industry, used to name its output file - must be unique and a plain filename (see check_industry_names)
+            - job_code_text_corpus: text corpus describing the industry, or corpus_file: filepath (relative to the specs file) of a text file holding it
+            - relevant_states: list of states to analyze - optional, all states if omitted
+            - relevance_threshold: threshold to identify relevant job codes
+
+        Parameters:
+            specs_loc (str): filepath of industry specs file
+
+        Returns:
+            industry_specs (list): list of dicts, one per industry
+        """
+        with open(specs_loc) as f:
+            if specs_loc.endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise ImportError("Reading YAML industry specs requires PyYAML (pip install pyyaml) - or use a JSON file") from e
+                specs = yaml.safe_load(f)
+            else:
+                specs = json.load(f)
+        if isinstance(specs, dict):
+            specs = specs["industries"]
+
+        industry_specs = []
+        for spec in specs:
+            missing_keys = [key for key in ("name", "relevance_threshold") if key not in spec]
+            if "job_code_text_corpus" not in spec and "corpus_file" not in spec:
+                missing_keys.append("job_code_text_corpus (or corpus_file)")
+            if missing_keys:
+                raise ValueError(f"Industry spec {spec.get('name', spec)} is missing: {', '.join(missing_keys)}")
+
+            job_code_text_corpus = spec.get("job_code_text_corpus")
+            if job_code_text_corpus is None:
+                with open(os.path.join(os.path.dirname(os.path.abspath(specs_loc)), spec["corpus_file"])) as corpus_file:
+                    job_code_text_corpus = corpus_file.read()
+
+            industry_specs.append({"name":spec["name"],
+                                   "job_code_text_corpus":job_code_text_corpus,
+                                   "relevant_states":spec.get("relevant_states"),
+                                   "relevance_threshold":spec["relevance_threshold"]})
+
+        BatchModel.check_industry_names(industry_specs=industry_specs)
+        return industry_specs
+
+    @staticmethod
+    def check_industry_names(industry_specs:list):
+        """
+        Raises ValueError if industry names can't name distinct output files - each name is the basename of its output ({name}, {name}_cube)
+        and the key of its data, so names must be plain filenames (no folders, e.g. "../x" or "a/b") and unique, and can't clash w/
+        another industry's cube or data_all_years
+
+        Parameters:
+            industry_specs (list): list of dicts, one per industry - see load_industry_specs
+        """
+        names = [spec["name"] for spec in industry_specs]
+        for name in names:
+            if not isinstance(name, str) or name in ("", ".", "..") or os.path.basename(name) != name or "/" in name or "\\" in name or "\0" in name:
+                raise ValueError(f"Industry name {name!r} must be a plain filename - it names the industry's output files")
+        duplicate_names = sorted({name for name in names if names.count(name) > 1})
+        if duplicate_names:
+            raise ValueError(f"Industry names must be unique - duplicated: {', '.join(duplicate_names)}")
+        clashing_names = sorted(name for name in names if name == "data_all_years" or (name.endswith("_cube") and name[:-len("_cube")] in names))
+        if clashing_names:
+            raise ValueError(f"Industry names clash w/ other outputs (data_all_years, or another industry's {{name}}_cube): {', '.join(clashing_names)}")
+
+    def get_stream_states(self):
+        """
+        Returns states to filter to while reading data in streaming mode - the states of all industries, or None (all states) if any industry keeps all states
+        """
+        if any(spec["relevant_states"] is None for spec in self.industry_specs):
+            return None
+        return list(dict.fromkeys(state for spec in self.industry_specs for state in spec["relevant_states"]))
+
+    def run(self):
+
+        model_loc = self.get_model_loc()
+        text_corpora = [spec["job_code_text_corpus"] for spec in self.industry_specs]
+
+        # data_all_years is set once data is ingested - the identifier is created first so the score cache can be checked before loading the model
+        job_code_identifier = JobCodeIdentifier(data_all_years=None,
+                        job_code_text_corpus=None,
+                        model_loc=model_loc,
+                        relevance_threshold=None,
+                        score_cache_loc=f"{self.get_cache_loc()}/scores.sqlite",
+                        run_report=self.run_report,
+                        tokenizer=self.tokenizer)
+
+        data_processor, model = self.ingest_data_and_load_model(job_code_identifier=job_code_identifier, text_corpora=text_corpora)
+        job_code_identifier.data_all_years = data_processor.data_all_years
+        if self.write_all_years:
+            data_processor.write_all_years(output_writer=self.output_writer)
+
+        # tokenize each distinct occupation once, then score them against every industry's corpus in one pass
+        occupation_table = job_code_identifier.build_occupation_table(data_all_years=data_processor.data_all_years)
+        normalized_titles = occupation_table["NORMALIZED_TITLE"].unique().tolist()
+        with self.run_report.stage("tokenize", titles_in=occupation_table["OCC_TITLE"].nunique(), normalized_titles=len(normalized_titles), corpora=len(text_corpora)):
+            tokenized_titles = job_code_identifier.tokenize_titles(occupation_titles=normalized_titles)
+            tokenized_text_corpora = [job_code_identifier.tokenize_text_corpus(text_corpus=text_corpus) for text_corpus in text_corpora]
+        similarities = job_code_identifier.score_titles(tokenized_titles=tokenized_titles, tokenized_text_corpora=tokenized_text_corpora,
+                                                        model_loc=model_loc, model=model)
+        occupation_titles, similarities = job_code_identifier.map_to_raw_titles(occupation_table=occupation_table, normalized_titles=normalized_titles,
+                                                                                similarities=similarities)
+
+        # one DataFilterer shared by all industries, so its index is built once
+        data_filterer = DataFilterer(relevant_states=None)
+        data_to_analyze = {}
+        for j, spec in enumerate(self.industry_specs):
+            relevant_job_titles = [title for title, similarity in zip(occupation_titles, similarities[:, j]) if similarity > spec["relevance_threshold"]]
+
+            data_filterer.relevant_states = spec["relevant_states"]
+            with self.run_report.stage("filter", industry=spec["name"], rows_in=len(data_processor.data_all_years), titles_in=len(relevant_job_titles)) as counts:
+                industry_data = data_filterer.filter_data(data_all_years=data_processor.data_all_years,
+                                                          relevant_job_titles=relevant_job_titles)
+                counts["rows_out"] = len(industry_data)
+            with self.run_report.stage("standardize", industry=spec["name"], rows_in=len(industry_data)):
+                data_to_analyze[spec["name"]] = data_filterer.standardize_occ_title_format(relevant_data=industry_data)
+            if self.build_cube:
+                with self.run_report.stage("aggregate", industry=spec["name"], rows_in=len(industry_data)) as counts:
+                    self.cube[spec["name"]] = AggregationCube().build(detail_data=data_to_analyze[spec["name"]])
+                    counts["rows_out"] = len(self.cube[spec["name"]])
+
+        return data_to_analyze
+
+    def write_outputs(self):
+        """
+        Writes each industry's data to the outputs folder w/ output_writer - e.g. {name}.parquet - and its aggregation cube, if built, e.g. {name}_cube.parquet
+        """
+        for name, industry_data in self.data_to_analyze.items():
+            with self.run_report.stage("write", industry=name, rows_in=len(industry_data)):
+                self.output_writer.write(df=industry_data, name=name)
+                if name in self.cube:
+                    self.output_writer.write(df=self.cube[name], name=f"{name}_cube")
@@ -0,0 +1,135 @@
+import pandas as pd
+import hashlib
+import importlib.util
+import json
+import os
+import warnings
+from OutputWriter import OutputWriter
+
+class DataCache:
+    """
+    Class designed to persist processed yearly data in a columnar on-disk cache, so unchanged years do not need to be re-parsed
+    The cache is stored as Parquet, so it needs pyarrow - DataProcessor runs w/o a cache when pyarrow is not installed (see is_available),
+    and a yearly file that can't be written (or read back) is just parsed again on the next run
+
+    Attributes:
+        cache_loc (str): filepath to folder where cached yearly files and the manifest are stored
+        manifest_loc (str): filepath to the manifest - maps each source file to its size, mtime, hash, and cached file
+        manifest (dict): contents of the manifest
+
+    Methods:
+        __init__: initializes instance of DataCache class
+        load: returns the cached DF for a source file if the source file is unchanged, else None
+        store: writes the processed DF for a source file to the cache and records it in the manifest
+        save_manifest: writes the manifest to disk
+        hash_file: calculates the hash of a source file
+        is_available: returns whether the cache can be used - i.e. pyarrow is installed
+    """
+    def __init__(self, cache_loc:str):
+        """
+        Initializes instance of DataCache class
+
+        Parameters:
+            cache_loc (str): filepath to folder where cached yearly files and the manifest will be stored
+        """
+        self.cache_loc = cache_loc
+        self.manifest_loc = f"{cache_loc}/manifest.json"
+        os.makedirs(cache_loc, exist_ok=True)
+        try:
+            with open(self.manifest_loc) as f:
+                self.manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError): # no cache yet (or unreadable) - start from an empty manifest
+            self.manifest = {}
+
+    def load(self, source_loc:str):
+        """
+        Returns the cached DF for source_loc if the source file has not changed since it was cached
+
+        Parameters:
+            source_loc (str): filepath to raw source file
+
+        Returns:
+            df (pd.DataFrame): cached DF for the source file, or None if the source file is new or has changed
+        """
+        entry = self.manifest.get(os.path.basename(source_loc))
+        if entry is None:
+            return None
+        cached_file_loc = f"{self.cache_loc}/{entry['cache_file']}"
+        if not os.path.exists(cached_file_loc):
+            return None
+
+        stat = os.stat(source_loc)
+        if stat.st_size != entry["size"]:
+            return None
+        # mtime can change w/o the contents changing (e.g. re-download of identical file) - fall back to the hash
+        if stat.st_mtime != entry["mtime"]:
+            if self.hash_file(source_loc) != entry["sha256"]:
+                return None
+            entry["mtime"] = stat.st_mtime
+            self.save_manifest()
+
+        try:
+            return pd.read_parquet(cached_file_loc)
+        except Exception as e: # e.g. a truncated file - parse the source file again
+            warnings.warn(f"Could not read cached {cached_file_loc}, parsing {source_loc} instead: {e!r}")
+            return None
+
+    def store(self, source_loc:str, df:pd.DataFrame):
+        """
+        Writes the processed DF for source_loc to the cache and records the source file's size, mtime, and hash in the manifest
+        A failed write only warns - the run continues, and the year is parsed again next time
+
+        Parameters:
+            source_loc (str): filepath to raw source file
+            df (pd.DataFrame): processed DF for the source file
+        """
+        filename = os.path.basename(source_loc)
+        cache_file = f"{os.path.splitext(filename)[0]}.parquet"
+        try:
+            # columns mixing types (e.g. numbers & suppression markers) are stored as strings, as in outputs
+            OutputWriter.make_arrow_compatible(df=df).to_parquet(f"{self.cache_loc}/{cache_file}", index=False)
+        except Exception as e:
+            warnings.warn(f"Could not cache {source_loc}, continuing w/o caching it: {e!r}")
+            if self.manifest.pop(filename, None) is not None: # don't serve a previous version of the cached file
+                self.save_manifest()
+            return
+
+        stat = os.stat(source_loc)
+        self.manifest[filename] = {"size":stat.st_size,
+                                   "mtime":stat.st_mtime,
+                                   "sha256":self.hash_file(source_loc),
+                                   "cache_file":cache_file}
+        self.save_manifest()
+
+    def save_manifest(self):
+        """
+        Writes the manifest to disk - writes to a temp file first so an interrupted run cannot corrupt the manifest
+        """
+        tmp_loc = f"{self.manifest_loc}.tmp"
+        with open(tmp_loc, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_loc, self.manifest_loc)
+
+    @staticmethod
+    def is_available():
+        """
+        Returns whether the cache can be used - the cache is stored as Parquet, which needs pyarrow
+        """
+        return importlib.util.find_spec("pyarrow") is not None
+
+    @staticmethod
+    def hash_file(source_loc:str):
+        """
+        Calculates the SHA-256 hash of a file, reading it in blocks
+
+        Parameters:
+            source_loc (str): filepath to file
+
+        Returns:
+            hash (str): hex digest of the file's SHA-256 hash
+        """
+        sha256 = hashlib.sha256()
+        with open(source_loc, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(block)
+        return sha256.hexdigest()
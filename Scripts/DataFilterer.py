@@ -1,4 +1,6 @@
 import pandas as pd
+import numpy as np
+import copy
 
 class DataFilterer:
 
@@ -7,52 +9,113 @@ class DataFilterer:
 
     Attributes:
         relevant_states (list): list of states whose data we will analyze
+        indexed_data (pd.DataFrame): DF the index was built for - the index is rebuilt if filter_data is called w/ a different DF
+        sorted_positions (np.ndarray): row positions of indexed_data sorted by (OCC_TITLE, STATE, YEAR)
+        title_slices (dict): maps each OCC_TITLE to its (start, stop) slice of sorted_positions - rows w/o a STATE excluded
+        title_state_slices (dict): maps each (OCC_TITLE, STATE) pair to its (start, stop) slice of sorted_positions
 
     Methods:
         __init__: initializes instance of DataFilterer class
+        build_index: builds index from (OCC_TITLE, STATE) to row positions of the processed data
+        with_states: returns a DataFilterer for other states that shares this one's index
         filter_data: filters processed data to the relevant data we care about
-    
+        standardize_occ_title_format: standardizes the format of OCC_TITLE values
+
     """
     def __init__(self, relevant_states:list):
         """
         Initializes instance of DataFilterer class
 
         Parameters:
-            relevant_states (list): list of states we want to analyze 
+            relevant_states (list): list of states we want to analyze
+        """
+        self.relevant_states = relevant_states
+        self.indexed_data = None
+        self.sorted_positions = None
+        self.title_slices = None
+        self.title_state_slices = None
+
+    def build_index(self, data_all_years:pd.DataFrame):
+        """
+        Builds index from (OCC_TITLE, STATE) to row positions of data_all_years - row positions are sorted by (OCC_TITLE, STATE, YEAR),
+        so each title and each (title, state) pair maps to a contiguous slice of them
+
+        Parameters:
+            data_all_years (pd.DataFrame): DF with data from all years - returned from read_and_process_files
+        """
+        title_codes, titles = pd.factorize(data_all_years["OCC_TITLE"])
+        state_codes, states = pd.factorize(data_all_years["STATE"])
+        # rows missing a title or state (code -1) are never selected, so they are left out of the index
+        indexed_rows = np.flatnonzero((title_codes >= 0) & (state_codes >= 0))
+        order = np.lexsort((data_all_years["YEAR"].to_numpy()[indexed_rows], state_codes[indexed_rows], title_codes[indexed_rows]))
+        sorted_positions = indexed_rows[order]
+        sorted_title_codes = title_codes[sorted_positions]
+        sorted_state_codes = state_codes[sorted_positions]
+
+        # boundaries where the title (or title/state pair) changes in the sorted positions
+        title_starts = np.flatnonzero(np.diff(sorted_title_codes, prepend=-1) != 0)
+        title_stops = np.append(title_starts[1:], len(sorted_positions))
+        pair_starts = np.flatnonzero((np.diff(sorted_title_codes, prepend=-1) != 0) | (np.diff(sorted_state_codes, prepend=-1) != 0))
+        pair_stops = np.append(pair_starts[1:], len(sorted_positions))
+
+        self.indexed_data = data_all_years
+        self.sorted_positions = sorted_positions
+        self.title_slices = {titles[sorted_title_codes[start]]:(start, stop) for start, stop in zip(title_starts, title_stops)}
+        self.title_state_slices = {(titles[sorted_title_codes[start]], states[sorted_state_codes[start]]):(start, stop)
+                                   for start, stop in zip(pair_starts, pair_stops)}
+
+    def with_states(self, relevant_states:list):
         """
-        self.relevant_states = relevant_states        
-        
+        Returns a DataFilterer for relevant_states that shares this DataFilterer's index - lets concurrent queries for different states use one index
+
+        Parameters:
+            relevant_states (list): list of states we want to analyze
+
+        Returns:
+            data_filterer (DataFilterer): DataFilterer for relevant_states
+        """
+        data_filterer = copy.copy(self)
+        data_filterer.relevant_states = relevant_states
+        return data_filterer
 
     def filter_data(self, data_all_years:pd.DataFrame, relevant_job_titles:list):
         """
-        Filters data to relevant occupations and states 
+        Filters data to relevant occupations and states - gathers the rows via the index (built on first use) rather than scanning every row
 
-            Parameters: 
+            Parameters:
                 data_all_years (pd.DataFrame): DF with data from all years - returned from read_and_process_files
                 relevant_job_titles (list): list of job titles we want to analyze
             Returns:
                 relevant_data (pd.DataFrame): DF with data from all years, but only for job codes and states we care about
         """
-        job_titles_mask = data_all_years["OCC_TITLE"].isin(relevant_job_titles)
-        try: 
-            states_mask = data_all_years["STATE"].isin(self.relevant_states)
-        except TypeError: # handle case where relevant_states is None - set all rows w/ a State to TRUE
-            states_mask = data_all_years["STATE"].notna()
-        relevant_data = data_all_years.loc[job_titles_mask & states_mask,:]
+        if self.indexed_data is not data_all_years:
+            self.build_index(data_all_years=data_all_years)
+
+        if self.relevant_states is None: # handle case where relevant_states is None - keep all rows w/ a State
+            slices = [self.title_slices[title] for title in relevant_job_titles if title in self.title_slices]
+        else:
+            slices = [self.title_state_slices[(title, state)] for title in relevant_job_titles for state in self.relevant_states
+                      if (title, state) in self.title_state_slices]
+
+        # sorted unique positions - rows keep their original order, and repeated titles or states don't repeat rows (like isin)
+        positions = np.unique(np.concatenate([self.sorted_positions[start:stop] for start, stop in slices])) if slices else np.array([], dtype=np.intp)
+        relevant_data = data_all_years.iloc[positions]
 
         return relevant_data
-    
+
     def standardize_occ_title_format(self, relevant_data:pd.DataFrame):
         """
-        Standardizes the format of all values in OCC_TITLE format to prepare for output
+        Standardizes the format of all values in OCC_TITLE format to prepare for output - each unique title is standardized once, then mapped onto the rows
 
         Parameters:
             relevant_data (pd.DataFrame): DF of relevant data to analyze, OCC_TITLE NOT standardized
-        
+
         Returns:
             relevant_data (pd.DataFrame): DF of relevant data to analyze, OCC_TITLE standardized
         """
-        relevant_data["OCC_TITLE"] = relevant_data["OCC_TITLE"].str.title()
-        relevant_data['OCC_TITLE'] = relevant_data['OCC_TITLE'].str.replace('*', '')
+        unique_titles = pd.Series(relevant_data["OCC_TITLE"].dropna().unique(), dtype=object)
+        standardized_titles = unique_titles.str.title().str.replace('*', '', regex=False)
+        title_map = dict(zip(unique_titles, standardized_titles))
 
-        return relevant_data
\ No newline at end of file
+        # assign returns a new DF rather than writing into a slice of data_all_years
+        return relevant_data.assign(OCC_TITLE=relevant_data["OCC_TITLE"].astype(object).map(title_map))
@@ -1,5 +1,32 @@
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from DataCache import DataCache
+from RunReport import RunReport
+from OutputWriter import OutputWriter
+
+# markers BLS uses in place of numeric values that are suppressed or top-coded
+SUPPRESSION_MARKERS = ["*", "**", "***", "#", "~"]
+# BLS columns holding numeric values (stored as comma-formatted strings in the raw data)
+NUMERIC_COLS = ["TOT_EMP", "EMP_PRSE", "JOBS_1000", "LOC_Q", "PCT_TOTAL", "PCT_RPT",
+                "H_MEAN", "A_MEAN", "MEAN_PRSE",
+                "H_PCT10", "H_PCT25", "H_MEDIAN", "H_PCT75", "H_PCT90",
+                "A_PCT10", "A_PCT25", "A_MEDIAN", "A_PCT75", "A_PCT90"]
+# values read_csv parses as booleans
+TRUE_VALUES = ["True", "TRUE", "true"]
+FALSE_VALUES = ["False", "FALSE", "false"]
+# column names that change between years, mapped to the most recent version
+NEW_COL_NAMES = {
+                'AREA_TITLE':'STATE', 'LOC_QUOTIENT':'LOC_Q',
+                'H_WPCT10':'H_PCT10', 'H_WPCT25':'H_PCT25', 'H_WPCT75':'H_PCT75', 'H_WPCT90':'H_PCT90',
+                'A_WPCT10':'A_PCT10', 'A_WPCT25':'A_PCT25', 'A_WPCT75':'A_PCT75', 'A_WPCT90':'A_PCT90',
+                'GROUP':'O_GROUP', 'OCC_GROUP':'O_GROUP',
+                'ST':'PRIM_ST'
+                }
+# BLS columns holding strings that are repeated on many rows
+CATEGORICAL_COLS = ["STATE", "PRIM_ST", "OCC_CODE", "OCC_TITLE", "O_GROUP", "AREA_TYPE",
+                    "NAICS", "NAICS_TITLE", "I_GROUP", "OWN_CODE", "PRIM_STATE", "ANNUAL", "HOURLY"]
 
 class DataProcessor:
     """
@@ -9,15 +36,32 @@ class DataProcessor:
         input_loc (str): filepath to data inputs
         input_filename_format (str): the format of filenames for raw data inputs - enables efficient reading of data
         relevant_years (list): list of ints representing range of years of data we want to read in
+        output_loc (str): filepath to outputs folder - data_all_years is only written there when write_all_years is called
         job_code_text_corpus (list): text corpus that will be used to identify relevant job titles - we will assess each job title's similarity to the corpus
         data_all_years (pd.DataFrame): DF of concatenated data from all relevant years
+        data_cache (DataCache): columnar on-disk cache of processed yearly data - None if caching is disabled
+        max_workers (int): number of worker processes used to parse yearly files in parallel - None parses sequentially
+        typed_schema (bool): whether data_all_years is converted to a compact typed schema (numeric/categorical columns)
+        memory_report (dict): memory usage of data_all_years before and after conversion to the typed schema - None if typed_schema is False
+        chunksize (int): number of rows read at a time in streaming mode - None reads each file in one go
+        stream_filters (dict): filters applied to each chunk while reading - relevant_states, state_column, relevant_columns, relevant_job_titles (None if not filtering)
+        run_report (RunReport): collects telemetry of the csv_parse, concat, typed_schema, and write_all_years stages
 
     Methods:
         __init__: initializer class
         read_and_process_files: reads in raw data files and performs processing
+        read_and_process_file: reads in and processes a single year's raw data file, optionally in chunks w/ filters applied while reading
+        harmonize_column_name: maps a raw column name to its most recent version
+        write_all_years: writes data_all_years to the outputs folder
+        apply_typed_schema: converts data_all_years to a compact typed schema
+        parse_numeric_column: parses a column of comma-formatted numbers w/ suppression markers
+        summarize_column_types: records which types the values of each column of a chunk parse as
+        apply_column_types: converts string columns to the dtypes read_csv would infer from the whole file
     
     """
-    def __init__(self, input_loc:str, input_filename_format:str, relevant_years:list, output_loc:str):
+    def __init__(self, input_loc:str, input_filename_format:str, relevant_years:list, output_loc:str, cache_loc:str=None, max_workers:int=None, typed_schema:bool=False,
+                 chunksize:int=None, relevant_states:list=None, state_column:str="STATE", relevant_columns:list=None, relevant_job_titles:list=None,
+                 run_report:RunReport=None):
         """
         Initializes instance of DataManager class
 
@@ -25,19 +69,41 @@ class DataProcessor:
             input_loc (str): filepath to inputs folder
             input_filename_format (str): the format of filenames for raw data inputs - enables efficient reading of data
             relevant_years (list): list of ints representing range of years of data we want to read in
-            output_loc (str): filepath to outputs folder
+            output_loc (str): filepath to outputs folder - data_all_years is written there by write_all_years
+            cache_loc (str): filepath to folder for the on-disk cache of processed yearly data - None disables caching, as does a missing pyarrow
+            max_workers (int): number of worker processes used to parse yearly files in parallel - None parses sequentially
+            typed_schema (bool): whether to convert data_all_years to a compact typed schema - numeric columns parsed & downcast, suppression markers moved to flag columns, repeated strings stored as categoricals
+            chunksize (int): streaming mode - number of rows read at a time, so memory is bounded by the chunk size rather than the file size - None reads each file in one go
+            relevant_states (list): only keep rows for these states, applied while reading - None keeps all states
+            state_column (str): column relevant_states are matched against - e.g. STATE (state name) for state files, PRIM_ST (state abbreviation) for metropolitan/national-industry files
+            relevant_columns (list): only read these columns (harmonized names) - None reads all columns
+            relevant_job_titles (list): only keep rows for these occupation titles (matched ignoring case and trailing '*'), applied while reading - None keeps all titles
+            run_report (RunReport): collects telemetry of each ingest stage - None disables telemetry
             
         """
         self.input_loc = input_loc
         self.input_filename_format = input_filename_format
         self.relevant_years = relevant_years
         self.output_loc = output_loc
+        self.data_cache = DataCache(cache_loc=cache_loc) if cache_loc is not None and DataCache.is_available() else None
+        self.max_workers = max_workers
+        self.typed_schema = typed_schema
+        self.memory_report = None
+        self.chunksize = chunksize
+        self.run_report = run_report if run_report is not None else RunReport(enabled=False)
+        if relevant_states is None and relevant_columns is None and relevant_job_titles is None:
+            self.stream_filters = None
+        else:
+            self.stream_filters = {"relevant_states":relevant_states, "state_column":state_column,
+                                   "relevant_columns":relevant_columns, "relevant_job_titles":relevant_job_titles}
+        # cached yearly files hold all rows & columns - filtered reads bypass the cache so they never serve (or store) partial data
+        if self.stream_filters is not None:
+            self.data_cache = None
         self.data_all_years = self.read_and_process_files(inputs_loc=input_loc,
                                                           filename_format=input_filename_format,
-                                                          years=relevant_years,
-                                                          outputs_loc=output_loc)
+                                                          years=relevant_years)
 
-    def read_and_process_files(self, inputs_loc:str, filename_format:str, years:list, outputs_loc:str):
+    def read_and_process_files(self, inputs_loc:str, filename_format:str, years:list):
         """
         Reads in datafiles from folder_loc, processes, and concatenates them
             
@@ -45,35 +111,251 @@ class DataProcessor:
             inputs_loc (str): filepath for folder where data is located
             filename_format (str): format of the filenames located in folder_loc
             years (list): two-item list representing range of years we want to analyze
-            outputs_loc (str): location to write data_all_years to
 
         Returns:
             data_all_years (pd.DataFrame): DF including data from all years specified in years parameter
         """
 
-        # empty DF - DFs from each year will be concatenated here
-        data_all_years = pd.DataFrame()
+        # DFs from each year are collected here (keyed by year) and concatenated once at the end
+        yearly_dfs = {}
+        years_to_parse = []
 
         for i in range(years[0], years[1]+1):
-            # read in file
-            filename = filename_format.format(year=i)
-            df = pd.read_csv(f"{inputs_loc}/{filename}")
+            source_loc = f"{inputs_loc}/{filename_format.format(year=i)}"
+            # unchanged years are loaded straight from the cache w/ their harmonized schema
+            df = self.data_cache.load(source_loc=source_loc) if self.data_cache is not None else None
+            if df is None:
+                years_to_parse.append((source_loc, i))
+            else:
+                yearly_dfs[i] = df
+
+        # parse new/changed years - in parallel across worker processes if max_workers is set
+        source_locs = [source_loc for source_loc, _ in years_to_parse]
+        parse_years = [year for _, year in years_to_parse]
+        read_file = partial(self.read_and_process_file, chunksize=self.chunksize, stream_filters=self.stream_filters)
+        with self.run_report.stage("csv_parse", files_parsed=len(years_to_parse), files_cached=len(yearly_dfs)) as counts:
+            if self.max_workers is not None and len(years_to_parse) > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    parsed_dfs = list(executor.map(read_file, source_locs, parse_years))
+            else:
+                parsed_dfs = list(map(read_file, source_locs, parse_years))
+            counts["rows_out"] = sum(len(df) for df in parsed_dfs)
+
+        for source_loc, year, df in zip(source_locs, parse_years, parsed_dfs):
+            if self.data_cache is not None:
+                self.data_cache.store(source_loc=source_loc, df=df)
+            yearly_dfs[year] = df
+
+        # concat in year order so output matches regardless of which years came from the cache or which worker finished first
+        with self.run_report.stage("concat", files_in=len(yearly_dfs)) as counts:
+            data_all_years = pd.concat([yearly_dfs[year] for year in sorted(yearly_dfs)])
+            counts["rows_out"] = len(data_all_years)
+
+        if self.typed_schema:
+            # categories must be consistent across years, so the schema is applied after concatenating
+            with self.run_report.stage("typed_schema", rows_in=len(data_all_years)):
+                data_all_years = self.apply_typed_schema(data_all_years=data_all_years)
+        
+        return data_all_years
+
+    def write_all_years(self, output_writer:OutputWriter=None):
+        """
+        Writes data_all_years to the outputs folder - only when asked for, as the full multi-year DF is large and slow to write
+
+        Parameters:
+            output_writer (OutputWriter): writer that sets the format (e.g. Parquet partitioned by YEAR/STATE) - None writes data_all_years.csv as before
+
+        Returns:
+            output_path (str): filepath (or dataset folder) data_all_years was written to
+        """
+        if output_writer is None:
+            output_writer = OutputWriter(output_loc=self.output_loc, output_format="csv")
+        with self.run_report.stage("write_all_years", rows_in=len(self.data_all_years)):
+            return output_writer.write(df=self.data_all_years, name="data_all_years")
+
+    @staticmethod
+    def read_and_process_file(source_loc:str, year:int, chunksize:int=None, stream_filters:dict=None):
+        """
+        Reads in a single year's raw data file and harmonizes its column names
+        In streaming mode (chunksize set), the file is read chunksize rows at a time and stream_filters are applied to each chunk as it is read,
+        so only the relevant rows & columns are ever held in memory
+
+        Parameters:
+            source_loc (str): filepath to the raw data file
+            year (int): year the data file represents
+            chunksize (int): number of rows read at a time - None reads the file in one go
+            stream_filters (dict): relevant_states, state_column, relevant_columns, relevant_job_titles to filter to while reading - None keeps everything
+
+        Returns:
+            df (pd.DataFrame): DF with data from the year, column names aligned w/ most recent data
+        """
+        usecols = None
+        if stream_filters is not None and stream_filters["relevant_columns"] is not None:
+            # columns needed to apply the filters are read even if not requested, then dropped
+            read_cols = set(stream_filters["relevant_columns"])
+            if stream_filters["relevant_states"] is not None:
+                read_cols.add(stream_filters["state_column"])
+            if stream_filters["relevant_job_titles"] is not None:
+                read_cols.add("OCC_TITLE")
+            usecols = lambda col: DataProcessor.harmonize_column_name(col) in read_cols
+        if stream_filters is not None and stream_filters["relevant_job_titles"] is not None:
+            relevant_job_titles = {title.lower().rstrip("*").strip() for title in stream_filters["relevant_job_titles"]}
+
+        if chunksize is None:
+            # low_memory=False infers each column's type from the whole file - low_memory reads large files in blocks,
+            # leaving columns that mix numbers & strings (e.g. "**" markers in some blocks only)
+            chunks = [pd.read_csv(source_loc, usecols=usecols, low_memory=False)]
+        else:
+            # chunks are read as strings so every chunk has the same dtypes - columns are converted once the year is assembled
+            chunks = pd.read_csv(source_loc, usecols=usecols, chunksize=chunksize, dtype=str)
+
+        filtered_chunks = []
+        column_types = {}
+        for df in chunks:
             # process file, address column names that change between years
             # changing col names to most recent version to align w/ most recent data
-            df.columns = df.columns.str.upper()
-            new_col_names = {
-                            'AREA_TITLE':'STATE', 'LOC_QUOTIENT':'LOC_Q',
-                            'H_WPCT10':'H_PCT10', 'H_WPCT25':'H_PCT25', 'H_WPCT75':'H_PCT75', 'H_WPCT90':'H_PCT90',
-                            'A_WPCT10':'A_PCT10', 'A_WPCT25':'A_PCT25', 'A_WPCT75':'A_PCT75', 'A_WPCT90':'A_PCT90',
-                            'GROUP':'O_GROUP', 'OCC_GROUP':'O_GROUP',
-                            'ST':'PRIM_ST'
-                            }
-            df = df.rename(columns=new_col_names)
-            # create 'YEAR' col to identify source year in concatenated DF
-            df['YEAR'] = i
-            # concat this iteration's DF to data_all_years
-            data_all_years = pd.concat([data_all_years, df])
-        
-        data_all_years.to_csv(f"{outputs_loc}/data_all_years.csv", index=False)
-        
-        return data_all_years
\ No newline at end of file
+            df.columns = [DataProcessor.harmonize_column_name(col) for col in df.columns]
+            if chunksize is not None:
+                # types are summarized before filtering - read_csv infers a column's dtype from every row of the file, incl. the rows filtered out
+                for col, chunk_types in DataProcessor.summarize_column_types(df=df).items():
+                    column_types[col] = {key:column_types[col][key] | value if key in ("has_null", "has_value") else column_types[col][key] & value
+                                         for key, value in chunk_types.items()} if col in column_types else chunk_types
+            if stream_filters is not None:
+                if stream_filters["relevant_states"] is not None:
+                    df = df.loc[df[stream_filters["state_column"]].isin(stream_filters["relevant_states"])]
+                if stream_filters["relevant_job_titles"] is not None:
+                    df = df.loc[df["OCC_TITLE"].str.lower().str.rstrip("*").str.strip().isin(relevant_job_titles)]
+                if stream_filters["relevant_columns"] is not None:
+                    df = df[[col for col in df.columns if col in stream_filters["relevant_columns"]]]
+            filtered_chunks.append(df)
+        df = pd.concat(filtered_chunks) if len(filtered_chunks) > 1 else filtered_chunks[0]
+        if chunksize is not None:
+            # same dtypes as a read of the file in one go, whatever the chunksize & filters
+            df = DataProcessor.apply_column_types(df=df, column_types=column_types)
+
+        # create 'YEAR' col to identify source year in concatenated DF
+        df = df.assign(YEAR=year)
+
+        return df
+
+    @staticmethod
+    def harmonize_column_name(col:str):
+        """
+        Maps a raw column name to its most recent version - column names change between years, and are upper-cased
+
+        Parameters:
+            col (str): raw column name
+
+        Returns:
+            col (str): harmonized column name
+        """
+        return NEW_COL_NAMES.get(col.upper(), col.upper())
+
+    def apply_typed_schema(self, data_all_years:pd.DataFrame):
+        """
+        Converts data_all_years to a compact typed schema and records the memory saved in memory_report
+            - numeric columns: thousands separators parsed, suppression markers mapped to nulls, downcast to Int32/float32
+            - {col}_FLAG columns: categorical recording which suppression marker (if any) replaced each numeric value
+            - repeated string columns: stored as categoricals
+
+        Parameters:
+            data_all_years (pd.DataFrame): DF including data from all years, all columns as read from the raw data
+
+        Returns:
+            data_all_years (pd.DataFrame): DF including data from all years, w/ typed schema
+        """
+        memory_before = int(data_all_years.memory_usage(deep=True).sum())
+
+        typed_cols = {}
+        for col in data_all_years.columns:
+            if col in NUMERIC_COLS:
+                numbers, flags = self.parse_numeric_column(values=data_all_years[col])
+                # integral columns (e.g. employment, annual wages) fit in a nullable int32, everything else in float32
+                non_null = numbers.dropna()
+                if ((non_null % 1 == 0) & (non_null.abs() < 2**31)).all():
+                    typed_cols[col] = numbers.astype("Int32")
+                else:
+                    typed_cols[col] = numbers.astype("float32")
+                typed_cols[f"{col}_FLAG"] = flags
+            elif col in CATEGORICAL_COLS:
+                typed_cols[col] = data_all_years[col].astype("category")
+            elif col == "YEAR":
+                typed_cols[col] = data_all_years[col].astype("int16")
+            else:
+                typed_cols[col] = data_all_years[col]
+        # build from the underlying arrays - data_all_years has duplicate index labels across years, so avoid index alignment
+        typed_data_all_years = pd.DataFrame({col:values.array for col, values in typed_cols.items()}, index=data_all_years.index)
+
+        memory_after = int(typed_data_all_years.memory_usage(deep=True).sum())
+        self.memory_report = {"object_dtype_bytes":memory_before,
+                              "typed_schema_bytes":memory_after,
+                              "bytes_saved":memory_before - memory_after,
+                              "pct_saved":round(100 * (1 - memory_after / memory_before), 1) if memory_before else 0.0}
+
+        return typed_data_all_years
+
+    @staticmethod
+    def parse_numeric_column(values:pd.Series):
+        """
+        Parses a column of BLS numeric values - e.g. "2,310" - into numbers, mapping suppression markers - e.g. "*", "#" - to nulls
+
+        Parameters:
+            values (pd.Series): raw column values, comma-formatted strings and/or numbers
+
+        Returns:
+            numbers (pd.Series): float64 values, null where the value was missing or suppressed
+            flags (pd.Series): categorical of the suppression marker present in each row, null where there was none
+        """
+        text = values.astype("string").str.strip()
+        is_marker = text.isin(SUPPRESSION_MARKERS)
+        flags = pd.Categorical(text.where(is_marker), categories=SUPPRESSION_MARKERS)
+        # anything else that still can't be parsed (e.g. blank cells) is treated as missing
+        numbers = pd.to_numeric(text.mask(is_marker).str.replace(",", "", regex=False), errors="coerce").astype("float64")
+
+        return numbers, pd.Series(flags, index=values.index)
+
+    @staticmethod
+    def summarize_column_types(df:pd.DataFrame):
+        """
+        Records which types the values of each column of a chunk read as strings parse as - summaries of all chunks of a file are combined
+        (and-ing the type flags, or-ing has_null & has_value) and passed to apply_column_types
+
+        Parameters:
+            df (pd.DataFrame): chunk of a raw data file, read w/ dtype=str
+
+        Returns:
+            column_types (dict): maps each column to a dict of flags - numeric, integer, boolean (every non-null value parses as one), has_null, has_value
+        """
+        column_types = {}
+        for col in df.columns:
+            values = df[col].dropna()
+            numbers = pd.to_numeric(values, errors="coerce")
+            column_types[col] = {"numeric":bool(numbers.notna().all()),
+                                 "integer":bool(numbers.notna().all()) and pd.api.types.is_integer_dtype(numbers),
+                                 "boolean":bool(values.isin(TRUE_VALUES + FALSE_VALUES).all()),
+                                 "has_null":len(values) < len(df),
+                                 "has_value":len(values) > 0}
+        return column_types
+
+    @staticmethod
+    def apply_column_types(df:pd.DataFrame, column_types:dict):
+        """
+        Converts the string columns of a file read in chunks to the dtypes read_csv infers when reading the file in one go -
+        bool (object of True/False/NaN if there are nulls), int64 (float64 if there are nulls), float64, or left as strings
+
+        Parameters:
+            df (pd.DataFrame): filtered chunks of the file, read w/ dtype=str
+            column_types (dict): combined summaries of every chunk of the file - see summarize_column_types
+
+        Returns:
+            df (pd.DataFrame): df w/ inferred dtypes
+        """
+        converted_cols = {}
+        for col in df.columns:
+            types = column_types[col]
+            if types["boolean"] and types["has_value"]: # an all-null column is float64, like a numeric one
+                booleans = df[col].astype(object).map(lambda value: value in TRUE_VALUES if isinstance(value, str) else value)
+                converted_cols[col] = booleans.astype(object if types["has_null"] else bool)
+            elif types["numeric"]:
+                converted_cols[col] = pd.to_numeric(df[col]).astype("int64" if types["integer"] and not types["has_null"] else "float64")
+        return df.assign(**converted_cols)
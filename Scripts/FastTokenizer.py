@@ -0,0 +1,379 @@
+import os
+import re
+import string
+import sys
+
+# stopword sets and punkt parameters, loaded once per process (keyed by language) - see load_stop_words & load_punkt_parameters
+STOP_WORDS = {}
+PUNKT_PARAMETERS = {}
+# punkt's orthographic context flags - whether a word was seen upper/lower case at the beginning, middle, or an unknown position of a sentence
+ORTHO_BEG_UC, ORTHO_MID_UC, ORTHO_UNK_UC, ORTHO_BEG_LC, ORTHO_MID_LC, ORTHO_UNK_LC = (1 << bit for bit in range(1, 7))
+ORTHO_UC = ORTHO_BEG_UC | ORTHO_MID_UC | ORTHO_UNK_UC
+ORTHO_LC = ORTHO_BEG_LC | ORTHO_MID_LC | ORTHO_UNK_LC
+
+class FastTokenizer:
+    """
+    Class designed to tokenize text the way NLTK's word_tokenize does, w/o importing NLTK
+    word_tokenize splits text into sentences w/ the punkt model, then applies the Treebank word tokenizer rules to each sentence - FastTokenizer
+    does the same w/ precompiled ports of both: punkt's sentence splitting (nltk.tokenize.punkt - both annotation passes, incl. the orthographic
+    heuristics for initials, ordinals, abbreviations, and ellipses, and the realignment of closing quotes & brackets), using the punkt parameters
+    read from the punkt_tab data files, and the Treebank rules (nltk.tokenize.destructive)
+    Text w/o a sentence-ending character (".", "?", "!") - e.g. most occupation titles - skips sentence splitting entirely
+    Tokens only differ from word_tokenize if punkt_tab is not found as plain files (e.g. only the zipped data is installed) - FastTokenizer then splits
+    sentences w/o punkt parameters (no abbreviations, collocations, sentence starters, or orthographic context)
+
+    Attributes:
+        language (str): language of the stopwords and punkt parameters
+        punkt_parameters (dict): punkt parameters of language - abbrev_types, collocations, sent_starters, ortho_context (see load_punkt_parameters)
+
+    Methods:
+        __init__: initializes instance of FastTokenizer class
+        tokenize: splits text into tokens
+        tokenize_sentence: splits a sentence into tokens w/ the Treebank rules
+        split_sentences: splits text into sentences the way punkt does
+        contains_sentence_break: returns whether the context of a potential sentence break holds one - punkt's annotation passes
+        second_pass_sentence_break: returns whether a period-final punkt token ends a sentence after punkt's second pass
+        ortho_heuristic: returns whether a punkt token starts a sentence, based on its orthographic context
+        find_nltk_data: returns the filepath of an NLTK data file, searching the same folders NLTK does
+        load_stop_words: returns the stopword set for a language, loaded once per process
+        load_punkt_parameters: returns punkt's parameters for a language, loaded once per process
+    """
+    STARTING_QUOTES = [
+        (re.compile("([«“‘„]|[`]+)"), r" \1 "),
+        (re.compile(r"^\""), r"``"),
+        (re.compile(r"(``)"), r" \1 "),
+        (re.compile(r"([ \(\[{<])(\"|\'{2})"), r"\1 `` "),
+        (re.compile(r"(?i)(?<!\w)(\')(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)"), r"\1 "),
+    ]
+    PUNCTUATION_RULES = [
+        (re.compile(r'([^\.])(\.)([\]\)}>"\'' "»”’ " r"]*)\s*$"), r"\1 \2 \3 "),
+        (re.compile(r"([:,])([^\d])"), r" \1 \2"),
+        (re.compile(r"([:,])$"), r" \1 "),
+        (re.compile(r"\.{2,}"), r" \g<0> "),
+        (re.compile(r"[;@#$%&]"), r" \g<0> "),
+        (re.compile(r"[\u2012-\u2015]"), r" \g<0> "),
+        (re.compile(r'([^\.])(\.)([\]\)}>"\']*)\s*$'), r"\1 \2\3 "),
+        (re.compile(r"[?!]"), r" \g<0> "),
+        (re.compile(r"([^'])' "), r"\1 ' "),
+        (re.compile(r"[*]"), r" \g<0> "),
+    ]
+    PARENS_BRACKETS = (re.compile(r"[\]\[\(\)\{\}\<\>]"), r" \g<0> ")
+    DOUBLE_DASHES = (re.compile(r"--"), r" -- ")
+    ENDING_QUOTES = [
+        (re.compile("([»”’])"), r" \1 "),
+        (re.compile(r"''"), " '' "),
+        (re.compile(r'"'), " '' "),
+        (re.compile(r"\s+"), " "),
+        (re.compile(r"([^' ])('[sS]|'[mM]|'[dD]|') "), r"\1 \2 "),
+        (re.compile(r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) "), r"\1 \2 "),
+    ]
+    CONTRACTIONS = [re.compile(pattern) for pattern in [
+        r"(?i)\b(can)(?#X)(not)\b", r"(?i)\b(d)(?#X)('ye)\b", r"(?i)\b(gim)(?#X)(me)\b", r"(?i)\b(gon)(?#X)(na)\b",
+        r"(?i)\b(got)(?#X)(ta)\b", r"(?i)\b(lem)(?#X)(me)\b", r"(?i)\b(more)(?#X)('n)\b", r"(?i)\b(wan)(?#X)(na)(?=\s)",
+        r"(?i) ('t)(?#X)(is)\b", r"(?i) ('t)(?#X)(was)\b"]]
+    # punkt's regular expressions (see nltk.tokenize.punkt.PunktLanguageVars & PunktToken)
+    SENTENCE_END_CHARS = (".", "?", "!")
+    PUNKT_NON_WORD = r"(?:[)\";}\]\*:@\'\({\[\u2018\u2019\u201c\u201d\xab\xbb?!])"
+    PUNKT_MULTI_CHAR = r"(?:\-{2,}|\.{2,}|(?:\.\s){2,}\.)"
+    PUNKT_WORDS = re.compile(r"""(
+        %(MultiChar)s
+        |
+        (?=[^\(\"\`{\[:;&\#\*@\)}\]\-,])\S+?
+        (?=
+            \s|
+            $|
+            %(NonWord)s|%(MultiChar)s|
+            ,(?=$|\s|%(NonWord)s|%(MultiChar)s)
+        )
+        |
+        \S
+    )""" % {"NonWord":PUNKT_NON_WORD, "MultiChar":PUNKT_MULTI_CHAR}, re.UNICODE | re.VERBOSE)
+    PERIOD_CONTEXT = re.compile(r"""
+        [\.\?!]
+        (?=(?P<after_tok>
+            %(NonWord)s
+            |
+            \s+(?P<next_tok>\S+)
+        ))""" % {"NonWord":PUNKT_NON_WORD}, re.UNICODE | re.VERBOSE)
+    BOUNDARY_REALIGNMENT = re.compile(r'["\')\]}\u2018\u2019\u201c\u201d\xab\xbb]+?(?:\s+|(?=--)|$)', re.MULTILINE)
+    NUMERIC = re.compile(r"^-?[\.,]?\d[\d,\.-]*\.?$")
+    ELLIPSIS = re.compile(r"\.\.+$")
+    INITIAL = re.compile(r"[^\W\d]\.$", re.UNICODE)
+    # tokens that can't start a sentence
+    PUNCTUATION = tuple(";:,.!?")
+
+    def __init__(self, language:str="english"):
+        """
+        Initializes instance of FastTokenizer class
+
+        Parameters:
+            language (str): language of the punkt parameters
+        """
+        self.language = language
+        self.punkt_parameters = self.load_punkt_parameters(language=language)
+
+    def tokenize(self, text:str):
+        """
+        Splits text into tokens - same tokens as NLTK's word_tokenize (see class docstring)
+
+        Parameters:
+            text (str): text to tokenize
+
+        Returns:
+            tokens (list): list of tokens
+        """
+        if "." not in text and "?" not in text and "!" not in text: # no potential sentence break - a single sentence, as in word_tokenize
+            return self.tokenize_sentence(sentence=text.rstrip()) if text.strip() else []
+        return [token for sentence in self.split_sentences(text=text) for token in self.tokenize_sentence(sentence=sentence)]
+
+    def tokenize_sentence(self, sentence:str):
+        """
+        Splits a sentence into tokens w/ the Treebank rules - same tokens as NLTK's NLTKWordTokenizer
+
+        Parameters:
+            sentence (str): sentence to tokenize
+
+        Returns:
+            tokens (list): list of tokens
+        """
+        text = sentence
+        for regexp, substitution in self.STARTING_QUOTES:
+            text = regexp.sub(substitution, text)
+        for regexp, substitution in self.PUNCTUATION_RULES:
+            text = regexp.sub(substitution, text)
+        for regexp, substitution in (self.PARENS_BRACKETS, self.DOUBLE_DASHES):
+            text = regexp.sub(substitution, text)
+        text = " " + text + " "
+        for regexp, substitution in self.ENDING_QUOTES:
+            text = regexp.sub(substitution, text)
+        for regexp in self.CONTRACTIONS:
+            text = regexp.sub(r" \1 \2 ", text)
+        return text.split()
+
+    def split_sentences(self, text:str):
+        """
+        Splits text into sentences the way punkt does (nltk.tokenize.punkt.PunktSentenceTokenizer.sentences_from_text) - each potential break
+        (".", "?", "!" followed by punctuation or another token) is kept if punkt's annotation of the words around it marks a break,
+        then closing quotes & brackets following a break are moved back onto the sentence they close
+
+        Parameters:
+            text (str): text to split
+
+        Returns:
+            sentences (list): list of sentences
+        """
+        # potential breaks w/ the context around them - the word before a break starts after the last whitespace since the previous break's word
+        contexts = []
+        previous_match, previous_slice = None, slice(0, 0)
+        for match in self.PERIOD_CONTEXT.finditer(text):
+            before_text = text[previous_slice.stop:match.start()]
+            last_whitespace = next((i for i in range(len(before_text) - 1, -1, -1) if before_text[i] in string.whitespace), 0)
+            word_start = last_whitespace + previous_slice.stop + 1 if last_whitespace else previous_slice.start
+            word_slice = slice(word_start, match.start())
+            # overlapping contexts (e.g. "!!!") only keep the last potential break
+            if previous_match is not None and previous_slice.stop <= word_slice.start:
+                contexts.append((previous_match, text[previous_slice] + previous_match.group() + previous_match.group("after_tok")))
+            previous_match, previous_slice = match, word_slice
+        if previous_match is not None:
+            contexts.append((previous_match, text[previous_slice] + previous_match.group() + previous_match.group("after_tok")))
+
+        slices = []
+        last_break = 0
+        for match, context in contexts:
+            if self.contains_sentence_break(context=context):
+                slices.append(slice(last_break, match.end()))
+                last_break = match.start("next_tok") if match.group("next_tok") else match.end()
+        slices.append(slice(last_break, len(text.rstrip())))
+
+        # closing quotes & brackets after a break belong to the sentence before it
+        sentences = []
+        realign = 0
+        for sentence_num, sentence_slice in enumerate(slices):
+            sentence_slice = slice(sentence_slice.start + realign, sentence_slice.stop)
+            if sentence_num == len(slices) - 1:
+                if text[sentence_slice]:
+                    sentences.append(text[sentence_slice])
+                continue
+            next_slice = slices[sentence_num + 1]
+            realignment = self.BOUNDARY_REALIGNMENT.match(text[next_slice])
+            if realignment:
+                sentences.append(text[sentence_slice.start:next_slice.start + len(realignment.group(0).rstrip())])
+                realign = realignment.end()
+            else:
+                realign = 0
+                if text[sentence_slice]:
+                    sentences.append(text[sentence_slice])
+        return sentences
+
+    def contains_sentence_break(self, context:str):
+        """
+        Returns whether the context of a potential sentence break holds one - a word other than the last is marked as a break by punkt's
+        first pass (based on the word alone - abbreviations, ellipses) and second pass (based on the next word - collocations, orthographic heuristics)
+
+        Parameters:
+            context (str): the word before a potential break, the break, and the text after it (see split_sentences)
+
+        Returns:
+            contains_break (bool): whether punkt would split the context into sentences
+        """
+        # punkt tokens as (token, type, sentbreak, abbr, ellipsis) - type is lower-cased w/ numbers mapped to ##number##
+        tokens = []
+        for line in context.split("\n"):
+            if line.strip():
+                for token in self.PUNKT_WORDS.findall(line):
+                    typ = self.NUMERIC.sub("##number##", token.lower())
+                    sentbreak = abbr = ellipsis = False
+                    if token in self.SENTENCE_END_CHARS:
+                        sentbreak = True
+                    elif self.ELLIPSIS.match(token):
+                        ellipsis = True
+                    elif token.endswith(".") and not token.endswith(".."):
+                        if token[:-1].lower() in self.punkt_parameters["abbrev_types"] or \
+                                token[:-1].lower().split("-")[-1] in self.punkt_parameters["abbrev_types"]:
+                            abbr = True
+                        else:
+                            sentbreak = True
+                    tokens.append([token, typ, sentbreak, abbr, ellipsis])
+
+        for token_num, (token, typ, sentbreak, abbr, ellipsis) in enumerate(tokens[:-1]):
+            if token.endswith("."):
+                next_token = tokens[token_num + 1]
+                sentbreak = self.second_pass_sentence_break(token=token, typ=typ, sentbreak=sentbreak, abbr=abbr, ellipsis=ellipsis, next_token=next_token)
+            # a break in the last token doesn't count
+            if sentbreak:
+                return True
+        return False
+
+    def second_pass_sentence_break(self, token:str, typ:str, sentbreak:bool, abbr:bool, ellipsis:bool, next_token:list):
+        """
+        Returns whether a period-final punkt token ends a sentence after punkt's second pass, which reclassifies it based on the next token
+
+        Parameters:
+            token (str): period-final punkt token
+            typ (str): its type - see contains_sentence_break
+            sentbreak, abbr, ellipsis (bool): its first-pass annotations
+            next_token (list): the next punkt token - token, type, sentbreak, abbr, ellipsis
+
+        Returns:
+            sentbreak (bool): whether the token ends a sentence
+        """
+        typ = typ[:-1] if len(typ) > 1 and typ[-1] == "." else typ
+        next_typ = next_token[1][:-1] if next_token[2] and len(next_token[1]) > 1 and next_token[1][-1] == "." else next_token[1]
+        is_initial = self.INITIAL.match(token) is not None
+
+        # collocation heuristic - e.g. a date like "jan. 1" is one sentence
+        if (typ, next_typ) in self.punkt_parameters["collocations"]:
+            return False
+        # abbreviations & ellipses also end a sentence if the next word starts one
+        if (abbr or ellipsis) and not is_initial:
+            is_sentence_starter = self.ortho_heuristic(token=next_token[0], typ=next_typ)
+            if is_sentence_starter is True:
+                return True
+            if next_token[0][0].isupper() and next_typ in self.punkt_parameters["sent_starters"]:
+                return True
+        # initials & ordinals don't end a sentence unless the next word starts one
+        if is_initial or typ == "##number##":
+            is_sentence_starter = self.ortho_heuristic(token=next_token[0], typ=next_typ)
+            if is_sentence_starter is False:
+                return False
+            if is_sentence_starter == "unknown" and is_initial and next_token[0][0].isupper() and \
+                    not (self.punkt_parameters["ortho_context"].get(next_typ, 0) & ORTHO_LC):
+                return False
+        return sentbreak
+
+    def ortho_heuristic(self, token:str, typ:str):
+        """
+        Returns whether a punkt token starts a sentence, based on how its type is capitalized in punkt's training data (its orthographic context)
+
+        Parameters:
+            token (str): punkt token
+            typ (str): its type, w/o a sentence-final period
+
+        Returns:
+            is_sentence_starter: True, False, or "unknown"
+        """
+        if token in self.PUNCTUATION:
+            return False
+        ortho_context = self.punkt_parameters["ortho_context"].get(typ, 0)
+        if token[0].isupper() and (ortho_context & ORTHO_LC) and not (ortho_context & ORTHO_MID_UC):
+            return True
+        if token[0].islower() and ((ortho_context & ORTHO_UC) or not (ortho_context & ORTHO_BEG_LC)):
+            return False
+        return "unknown"
+
+    @staticmethod
+    def find_nltk_data(resource:str):
+        """
+        Returns the filepath of an NLTK data file (e.g. corpora/stopwords/english), searching the same folders NLTK does - w/o importing NLTK
+
+        Parameters:
+            resource (str): path of the data file within an nltk_data folder
+
+        Returns:
+            resource_loc (str): filepath of the data file - None if not found (e.g. only the zipped data is installed)
+        """
+        data_locs = [loc for loc in os.environ.get("NLTK_DATA", "").split(os.pathsep) if loc]
+        home_loc = os.path.expanduser("~/")
+        if home_loc != "~/":
+            data_locs.append(os.path.join(home_loc, "nltk_data"))
+        data_locs += [os.path.join(sys.prefix, "nltk_data"), os.path.join(sys.prefix, "share", "nltk_data"), os.path.join(sys.prefix, "lib", "nltk_data")]
+        if sys.platform.startswith("win"):
+            data_locs += [os.path.join(os.environ.get("APPDATA", "C:\\"), "nltk_data"), "C:\\nltk_data", "D:\\nltk_data", "E:\\nltk_data"]
+        else:
+            data_locs += ["/usr/share/nltk_data", "/usr/local/share/nltk_data", "/usr/lib/nltk_data", "/usr/local/lib/nltk_data"]
+
+        for data_loc in data_locs:
+            resource_loc = os.path.join(data_loc, *resource.split("/"))
+            if os.path.isfile(resource_loc):
+                return resource_loc
+        return None
+
+    @staticmethod
+    def load_stop_words(language:str="english"):
+        """
+        Returns the NLTK stopword set for language - read straight from the nltk_data file, falling back to NLTK's corpus reader (e.g. for zipped data)
+        Loaded once per process, as rebuilding the set on every call adds up
+
+        Parameters:
+            language (str): language of the stopwords
+
+        Returns:
+            stop_words (set): set of stopwords
+        """
+        if language not in STOP_WORDS:
+            stop_words_loc = FastTokenizer.find_nltk_data(resource=f"corpora/stopwords/{language}")
+            if stop_words_loc is not None:
+                with open(stop_words_loc, encoding="utf-8") as f:
+                    STOP_WORDS[language] = {line for line in f.read().splitlines() if line.strip()}
+            else:
+                from nltk.corpus import stopwords
+                STOP_WORDS[language] = set(stopwords.words(language))
+        return STOP_WORDS[language]
+
+    @staticmethod
+    def load_punkt_parameters(language:str="english"):
+        """
+        Returns punkt's parameters for language - read from the punkt_tab data files the same way NLTK reads them, loaded once per process
+        If a file is not found, its parameter is left empty
+
+        Parameters:
+            language (str): language of the punkt model
+
+        Returns:
+            punkt_parameters (dict): abbrev_types (set of abbreviations, lower-case w/o the final period), collocations (set of (word, word) pairs
+                                     that don't span a sentence break), sent_starters (set of frequent sentence starters), ortho_context (dict of
+                                     orthographic context flags of each word type)
+        """
+        if language not in PUNKT_PARAMETERS:
+            lines = {}
+            for filename in ("abbrev_types.txt", "collocations.tab", "sent_starters.txt", "ortho_context.tab"):
+                parameter_loc = FastTokenizer.find_nltk_data(resource=f"tokenizers/punkt_tab/{language}/{filename}")
+                lines[filename] = []
+                if parameter_loc is not None:
+                    with open(parameter_loc, encoding="utf-8") as f:
+                        lines[filename] = [line[:-1] if line.endswith("\n") else line for line in f]
+            PUNKT_PARAMETERS[language] = {"abbrev_types":set(lines["abbrev_types.txt"]),
+                                          "collocations":{tuple(line.split("\t")) for line in lines["collocations.tab"]},
+                                          "sent_starters":set(lines["sent_starters.txt"]),
+                                          "ortho_context":{typ:int(flags) for typ, flags in (line.split("\t") for line in lines["ortho_context.tab"])}}
+        return PUNKT_PARAMETERS[language]
@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
 from gensim.models import KeyedVectors
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords   
 import os
+import json
+from ScoreCache import ScoreCache
+from FastTokenizer import FastTokenizer
+from RunReport import RunReport
 
 class JobCodeIdentifier:
     """
@@ -13,14 +15,33 @@ class JobCodeIdentifier:
         data_all_years (pd.DataFrame): DF containing read and processed data from all relevant years
         job_code_text_corpus (list): text corpus used to identify relevant job titles - we will assess each job title's similarity to the corpus
         model_loc (str): location of Word2Vec model that will calculate similarity btwn job titles and text corpus
+        score_cache (ScoreCache): persistent cache of title similarity scores - None if caching is disabled
+        run_report (RunReport): collects telemetry of the model_load, tokenize, and similarity stages
+        tokenizer (str): "nltk" to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer - same tokens, w/o importing NLTK
+        fast_tokenizer (FastTokenizer): FastTokenizer object used in "fast" mode - None in "nltk" mode
 
     Methods:
+        load_model: loads the Word2Vec model from model_loc - either the original word2vec binary or a native memory-mapped store
+        load_model_for_run: loads the Word2Vec model, recording the model_load stage in run_report
+        convert_model: converts the word2vec binary to a native memory-mapped store w/ pre-normalized vectors
+        build_vocabulary_pack: writes a pruned native store holding only the words the tool needs - a small stand-in for the full model
+        tokenize: splits text into tokens w/ the configured tokenizer
         tokenize_text_corpus: tokenizes the text corpus, allowing for comparison to occupation titles
         identify_relevant_job_codes: uses Word2Vec model to compare occupation titles to text corpus and identify most relevant titles
+        normalize_title: normalizes an occupation title - titles differing only in case, whitespace, or a trailing '*' are the same occupation
+        build_occupation_table: builds the canonical occupation table - distinct (OCC_CODE, normalized title) pairs and their raw titles
+        map_to_raw_titles: maps similarities of normalized titles back to the raw titles in the data
+        tokenize_titles: tokenizes occupation titles, allowing for comparison to the text corpus
+        score_titles: calculates similarity of tokenized occupation titles to tokenized text corpora, using cached scores where available
+        has_cached_scores: whether scores for the text corpus are already in the score cache
         calculate_similarity: calculates similarity of an individual occupation title to the text corpus
+        calculate_similarities: calculates similarity of all occupation titles to the text corpus w/ batched matrix multiplies
+        calculate_corpora_similarities: calculates similarity of all occupation titles to each of several text corpora w/ batched matrix multiplies
+        record_scoring: records scoring telemetry (unique titles, titles scored, out-of-vocabulary token rates) in run_report
+        calculate_oov_rates: calculates share of title and corpus tokens not in the model's vocabulary
 
     """
-    def __init__(self, data_all_years:pd.DataFrame, job_code_text_corpus:list, model_loc:str, relevance_threshold:float) :
+    def __init__(self, data_all_years:pd.DataFrame, job_code_text_corpus:list, model_loc:str, relevance_threshold:float, score_cache_loc:str=None, run_report:RunReport=None, tokenizer:str="nltk") :
         """
         Initializes instance of JobCodeIdentifier class
 
@@ -29,12 +50,149 @@ class JobCodeIdentifier:
             job_code_text_corpus (list): text corpus that will be used to identify relevant job titles - we will assess each job title's similarity to the corpus
             model_loc (str): location of Word2Vec model that will calculate similarity btwn job titles and text corpus
             relevance_threshold (float): threshold to identify relevant job codes - those with similarity rating higher than this are deemed relevant
+            score_cache_loc (str): filepath to SQLite file caching title similarity scores - None disables caching
+            run_report (RunReport): collects telemetry of each scoring stage - None disables telemetry
+            tokenizer (str): "nltk" (default) to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer - same tokens, w/o the cost of importing NLTK
         """
         self.data_all_years = data_all_years
         self.job_code_text_corpus = job_code_text_corpus
         self.model_loc = model_loc
         self.relevance_threshold = relevance_threshold
+        self.score_cache = ScoreCache(cache_loc=score_cache_loc) if score_cache_loc is not None else None
+        self.run_report = run_report if run_report is not None else RunReport(enabled=False)
+        if tokenizer not in ("nltk", "fast"):
+            raise ValueError(f"tokenizer must be 'nltk' or 'fast', not {tokenizer!r}")
+        self.tokenizer = tokenizer
+        self.fast_tokenizer = FastTokenizer() if tokenizer == "fast" else None
         
+    @staticmethod
+    def load_model(model_loc:str):
+        """
+        Loads pre-trained Word2Vec model
+            - word2vec binary (.bin): parsed into memory
+            - native store written by convert_model: opened read-only via mmap, so startup is near-instant and pages are shared btwn processes on the same host
+
+        Parameters:
+            model_loc (str): filepath of pre-trained Word2Vec model
+        Returns:
+            model (KeyedVectors): loaded Word2Vec model - models loaded from a native store also carry normed_vectors (unit-length vectors, memory-mapped)
+        """
+        if model_loc.endswith(".bin"):
+            return KeyedVectors.load_word2vec_format(model_loc, binary=True)
+
+        model = KeyedVectors.load(model_loc, mmap="r")
+        normed_vectors_loc = f"{model_loc}.normed.npy"
+        if os.path.exists(normed_vectors_loc):
+            model.normed_vectors = np.load(normed_vectors_loc, mmap_mode="r")
+        return model
+
+    def load_model_for_run(self, model_loc:str):
+        """
+        Loads pre-trained Word2Vec model (see load_model), recording the model_load stage in run_report
+
+        Parameters:
+            model_loc (str): filepath of pre-trained Word2Vec model
+        Returns:
+            model (KeyedVectors): loaded Word2Vec model
+        """
+        with self.run_report.stage("model_load") as counts:
+            model = self.load_model(model_loc=model_loc)
+            counts["vocabulary_size"] = len(model.key_to_index)
+        return model
+
+    @staticmethod
+    def convert_model(model_loc:str, native_loc:str, chunk_size:int=100000):
+        """
+        One-time conversion of the word2vec binary to a native store that load_model can memory-map
+            - native_loc: KeyedVectors w/ vectors saved as a separate .npy file
+            - native_loc.normed.npy: pre-normalized (unit-length) vectors
+
+        Parameters:
+            model_loc (str): filepath of pre-trained Word2Vec model (word2vec binary format)
+            native_loc (str): filepath to write native store to
+            chunk_size (int): number of vectors normalized at a time - avoids allocating a second full-size matrix
+        """
+        model = KeyedVectors.load_word2vec_format(model_loc, binary=True)
+        # sep_limit=0 -> vectors are always stored in their own .npy file, which is what allows mmap on load
+        model.save(native_loc, sep_limit=0)
+
+        normed_vectors = np.lib.format.open_memmap(f"{native_loc}.normed.npy", mode="w+",
+                                                   dtype=model.vectors.dtype, shape=model.vectors.shape)
+        for start in range(0, len(model.vectors), chunk_size):
+            chunk = model.vectors[start:start+chunk_size]
+            norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+            normed_vectors[start:start+chunk_size] = chunk / np.where(norms > 0, norms, 1)
+        normed_vectors.flush()
+
+    @staticmethod
+    def build_vocabulary_pack(model_loc:str, pack_loc:str, title_words:list, corpus_words:list=None, top_n:int=10000):
+        """
+        Writes a vocabulary pack - a native store (same layout as convert_model, so load_model reads it in place of the full model) holding only:
+            - every title word in the model's vocabulary
+            - the top_n most frequent words that tokenized text can contain (lower-case, alphanumeric) - GoogleNews keys are ordered by frequency
+            - every extra corpus word in the model's vocabulary (e.g. words of the industry corpora in use)
+        Vectors are copied unchanged, so scores computed w/ the pack match the full model for any title/corpus whose words are all in the pack
+        A report of the pack (incl. words not in the model's vocabulary) is written next to it as {pack_loc}.json
+
+        Parameters:
+            model_loc (str): filepath of pre-trained Word2Vec model - word2vec binary or native store
+            pack_loc (str): filepath to write the pack to
+            title_words (list): tokenized words of all occupation titles
+            corpus_words (list): tokenized words of text corpora the pack should cover
+            top_n (int): number of frequency-ranked words kept on top of title & corpus words - ~2.4 MB per 1,000 words for 300-dim vectors (incl. normalized vectors)
+
+        Returns:
+            report (dict): source model, number of words & size of the pack, and title/corpus words not in the model's vocabulary
+                           (these score 0 w/ the full model too - regenerate the pack w/ new corpus words via corpus_words)
+        """
+        model = JobCodeIdentifier.load_model(model_loc=model_loc)
+        title_words = list(dict.fromkeys(title_words))
+        corpus_words = list(dict.fromkeys(word.lower() for word in corpus_words or []))
+        required_indices = {model.key_to_index[word] for word in title_words + corpus_words if word in model.key_to_index}
+
+        # tokenize_text_corpus & tokenize_titles lower-case & keep alphanumeric tokens only - other keys (phrases, capitalized words) can never be looked up
+        frequent_indices = []
+        for index, key in enumerate(model.index_to_key):
+            if len(frequent_indices) >= top_n:
+                break
+            if key.isalnum() and key == key.lower():
+                frequent_indices.append(index)
+
+        # keep the model's frequency order
+        pack_indices = sorted(required_indices.union(frequent_indices))
+        pack = KeyedVectors(vector_size=model.vector_size, dtype=model.vectors.dtype)
+        pack.add_vectors([model.index_to_key[index] for index in pack_indices], np.asarray(model.vectors[pack_indices]))
+        pack.save(pack_loc, sep_limit=0)
+        norms = np.linalg.norm(pack.vectors, axis=1, keepdims=True)
+        np.save(f"{pack_loc}.normed.npy", pack.vectors / np.where(norms > 0, norms, 1))
+
+        report = {"source_model":os.path.basename(model_loc),
+                  "source_model_fingerprint":ScoreCache.fingerprint_model(model_loc=model_loc),
+                  "top_n":top_n,
+                  "words":len(pack_indices),
+                  "title_words":len(title_words),
+                  "corpus_words":len(corpus_words),
+                  "unknown_title_words":[word for word in title_words if word not in model.key_to_index],
+                  "unknown_corpus_words":[word for word in corpus_words if word not in model.key_to_index],
+                  "size_mb":round(sum(os.path.getsize(f"{pack_loc}{suffix}") for suffix in ("", ".vectors.npy", ".normed.npy")) / 1024**2, 1)}
+        with open(f"{pack_loc}.json", "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def tokenize(self, text:str):
+        """
+        Splits text into tokens w/ the configured tokenizer - NLTK is only imported in "nltk" mode
+
+        Parameters:
+            text (str): text to tokenize
+        Returns:
+            tokens (list): list of tokens
+        """
+        if self.fast_tokenizer is not None:
+            return self.fast_tokenizer.tokenize(text)
+        from nltk.tokenize import word_tokenize
+        return word_tokenize(text)
+
     def tokenize_text_corpus(self, text_corpus):
         """
         Tokenizes text corpus, makes lowercase, removes stopwords and non-alphanumerics
@@ -44,13 +202,13 @@ class JobCodeIdentifier:
         Returns:
             tokenized_text_corpus (list): tokenized version of the text corpus
         """
-        # load stop words
-        stop_words = set(stopwords.words('english'))
+        # stop words are loaded once per process
+        stop_words = FastTokenizer.load_stop_words()
 
-        tokenized_text_corpus = [word for word in word_tokenize(text_corpus.lower()) if word.isalpha() and word not in stop_words] 
+        tokenized_text_corpus = [word for word in self.tokenize(text_corpus.lower()) if word.isalpha() and word not in stop_words] 
         return tokenized_text_corpus
     
-    def identify_relevant_job_codes(self, data_all_years:pd.DataFrame, text_corpus:str, model_loc:str, relevance_threshold:float):
+    def identify_relevant_job_codes(self, data_all_years:pd.DataFrame, text_corpus:str, model_loc:str, relevance_threshold:float, model=None):
         """
         Given a list of keywords describing occupations we're interested in, identifies relevant occupation titles in the data
         
@@ -59,33 +217,169 @@ class JobCodeIdentifier:
             text_corpus (list): tokenized list of keywords describing occupations we're interested in
             model_loc (str): filepath of pre-trained Word2Vec model
             relevance_threshold (float): threshold to identify relevant job codes - those with similarity rating higher than this are deemed relevant
+            model (KeyedVectors): already-loaded Word2Vec model - if None, model is loaded from model_loc when titles need to be scored
         Returns:
             relevant_titles (list): list of occupation titles relevant to the analysis
         """
 
-        # load Word2Vec model
-        model = KeyedVectors.load_word2vec_format(model_loc, binary=True)
+        # each distinct occupation is tokenized & scored once, however many raw variants of its title appear across years
+        occupation_table = self.build_occupation_table(data_all_years=data_all_years)
+        normalized_titles = occupation_table["NORMALIZED_TITLE"].unique().tolist()
+
+        with self.run_report.stage("tokenize", titles_in=occupation_table["OCC_TITLE"].nunique(), normalized_titles=len(normalized_titles)) as counts:
+            tokenized_titles = self.tokenize_titles(occupation_titles=normalized_titles)
+            tokenized_text_corpus = self.tokenize_text_corpus(text_corpus=text_corpus)
+            counts["corpus_tokens"] = len(tokenized_text_corpus)
+
+        # calculate similarity to keywords for all occupation titles - only titles missing from the score cache are scored w/ the model
+        similarities = self.score_titles(tokenized_titles=tokenized_titles, tokenized_text_corpora=[tokenized_text_corpus],
+                                         model_loc=model_loc, model=model)
+        occupation_titles, similarities_to_compare = self.map_to_raw_titles(occupation_table=occupation_table, normalized_titles=normalized_titles,
+                                                                            similarities=similarities)
+
+        # select titles with similarities above the threshold
+        relevant_titles = [title for title, similarity in zip(occupation_titles, similarities_to_compare[:, 0]) if similarity > relevance_threshold]
+        return relevant_titles
+
+    @staticmethod
+    def normalize_title(occupation_title:str):
+        """
+        Normalizes an occupation title - lower-cased, trailing '*' (BLS footnote marker) removed, whitespace collapsed
+        Titles differing only in these ways tokenize to the same words, so they are the same occupation for scoring
+
+        Parameters:
+            occupation_title (str): raw occupation title
+        Returns:
+            normalized_title (str): normalized occupation title
+        """
+        return " ".join(str(occupation_title).lower().rstrip("* ").split())
+
+    def build_occupation_table(self, data_all_years:pd.DataFrame):
+        """
+        Builds the canonical occupation table - one row per distinct (OCC_CODE, raw title) pair in the data, keyed by OCC_CODE and normalized title
+        Rows w/o a title are left out, as they can never be relevant
+
+        Parameters:
+            data_all_years (pd.DataFrame): DF with data from all years - returned from read_and_process_files
+        Returns:
+            occupation_table (pd.DataFrame): DF w/ OCC_CODE, NORMALIZED_TITLE, and OCC_TITLE (raw title) columns
+        """
+        title_codes, raw_titles = pd.factorize(data_all_years["OCC_TITLE"])
+        if "OCC_CODE" in data_all_years.columns:
+            occ_codes, raw_occ_codes = pd.factorize(data_all_years["OCC_CODE"])
+        else:
+            occ_codes, raw_occ_codes = np.full(len(data_all_years), -1), pd.Index([])
+        # distinct (title, OCC_CODE) pairs as one integer per row - rows w/o a title (code -1) map to negative pairs and are dropped
+        num_codes = len(raw_occ_codes) + 1
+        pairs = np.unique(title_codes.astype(np.int64) * num_codes + (occ_codes + 1))
+        pairs = pairs[pairs >= 0]
+        pair_titles, pair_occ_codes = pairs // num_codes, pairs % num_codes - 1
+
+        # normalize each raw title once, however many OCC_CODEs it appears under
+        raw_titles = np.asarray(raw_titles, dtype=object)
+        normalized_titles = np.array([self.normalize_title(title) for title in raw_titles], dtype=object)
+        raw_occ_codes = np.append(np.asarray(raw_occ_codes, dtype=object), None) # position -1 (no OCC_CODE) maps to None
+        return pd.DataFrame({"OCC_CODE":raw_occ_codes[pair_occ_codes],
+                             "NORMALIZED_TITLE":normalized_titles[pair_titles],
+                             "OCC_TITLE":raw_titles[pair_titles]})
+
+    def map_to_raw_titles(self, occupation_table:pd.DataFrame, normalized_titles:list, similarities:np.ndarray):
+        """
+        Maps similarities of normalized titles back to the raw titles in the data - every raw variant of a title gets its normalized title's similarity
+
+        Parameters:
+            occupation_table (pd.DataFrame): canonical occupation table - returned from build_occupation_table
+            normalized_titles (list): list of normalized titles, in the order of the rows of similarities
+            similarities (np.ndarray): similarity of each normalized title (rows) to each text corpus (columns)
+        Returns:
+            occupation_titles (list): list of unique raw occupation titles
+            raw_similarities (np.ndarray): similarity of each raw occupation title (rows) to each text corpus (columns)
+        """
+        raw_titles = occupation_table.drop_duplicates(subset=["OCC_TITLE"])
+        positions = pd.Index(normalized_titles).get_indexer(raw_titles["NORMALIZED_TITLE"])
+        return raw_titles["OCC_TITLE"].tolist(), similarities[positions]
 
-        occupation_titles = data_all_years["OCC_TITLE"].unique().tolist()
+    def tokenize_titles(self, occupation_titles:list):
+        """
+        Tokenizes occupation titles, makes lowercase, removes stopwords and non-alphanumerics
 
-        # load stop words
-        stop_words = set(stopwords.words('english'))
+        Parameters:
+            occupation_titles (list): list of occupation titles
+        Returns:
+            tokenized_titles (list): list of tokenized occupation titles
+        """
+        # stop words are loaded once per process
+        stop_words = FastTokenizer.load_stop_words()
         # tokenize occupation titles and remove stop words
         tokenized_titles = [
-            [word for word in word_tokenize(title.lower()) if word.isalnum() and word not in stop_words] 
+            [word for word in self.tokenize(title.lower()) if word.isalnum() and word not in stop_words] 
             for title in occupation_titles
             ]
-        
-        tokenized_text_corpus = self.tokenize_text_corpus(text_corpus=text_corpus)
+        return tokenized_titles
 
-        # calculate similarity to keywords for each occupation title  
-        similarities = [self.calculate_similarity(model=model, occupation_title=title, text_corpus=tokenized_text_corpus) for title in tokenized_titles]
-        
-        similarities_to_compare = [np.max(similarity) for similarity in similarities]
+    def score_titles(self, tokenized_titles:list, tokenized_text_corpora:list, model_loc:str, model=None):
+        """
+        Calculates similarity of each tokenized occupation title to each tokenized text corpus
+        Scores are looked up in the score cache first - the model is only loaded (if not already loaded) and used for titles missing from the cache,
+        and all missing titles are scored against all corpora w/ missing titles in a single pass
 
-        # select titles with similarities above the threshold
-        relevant_titles = [title for title, similarity in zip(occupation_titles, similarities_to_compare) if similarity > relevance_threshold]
-        return relevant_titles
+        Parameters:
+            tokenized_titles (list): list of tokenized occupation titles
+            tokenized_text_corpora (list): list of tokenized text corpora
+            model_loc (str): filepath of pre-trained Word2Vec model
+            model (KeyedVectors): already-loaded Word2Vec model - if None, model is loaded from model_loc when needed
+        Returns:
+            similarities (np.ndarray): measurement of similarity of each occupation title (rows) to each text corpus (columns)
+        """
+        if self.score_cache is None:
+            if model is None:
+                model = self.load_model_for_run(model_loc=model_loc)
+            with self.run_report.stage("similarity", titles_in=len(tokenized_titles), corpora=len(tokenized_text_corpora)):
+                similarities = self.calculate_corpora_similarities(model=model, tokenized_titles=tokenized_titles, text_corpora=tokenized_text_corpora)
+            self.record_scoring(model=model, tokenized_titles=tokenized_titles, tokenized_text_corpora=tokenized_text_corpora,
+                                unique_titles=len(set(map(tuple, tokenized_titles))), titles_scored=len(tokenized_titles))
+            return similarities
+
+        # titles w/ the same tokens have the same score - the space-joined tokens serve as the normalized title
+        normalized_titles = [" ".join(title) for title in tokenized_titles]
+        model_fingerprint = ScoreCache.fingerprint_scoring(model_loc=model_loc, tokenizer=self.tokenizer)
+        corpus_hashes = [ScoreCache.hash_corpus(tokenized_text_corpus=corpus) for corpus in tokenized_text_corpora]
+        cached_scores = [self.score_cache.lookup(model_fingerprint=model_fingerprint, corpus_hash=corpus_hash, titles=normalized_titles)
+                         for corpus_hash in corpus_hashes]
+
+        titles_to_score = {title:tokens for title, tokens in zip(normalized_titles, tokenized_titles) 
+                           if any(title not in corpus_scores for corpus_scores in cached_scores)}
+        corpora_to_score = [j for j, corpus_scores in enumerate(cached_scores) if any(title not in corpus_scores for title in titles_to_score)]
+        if titles_to_score:
+            if model is None:
+                model = self.load_model_for_run(model_loc=model_loc)
+            with self.run_report.stage("similarity", titles_in=len(titles_to_score), corpora=len(corpora_to_score)):
+                new_scores = self.calculate_corpora_similarities(model=model, tokenized_titles=list(titles_to_score.values()),
+                                                                 text_corpora=[tokenized_text_corpora[j] for j in corpora_to_score])
+            for column, j in enumerate(corpora_to_score):
+                corpus_new_scores = dict(zip(titles_to_score, new_scores[:, column].tolist()))
+                self.score_cache.store(model_fingerprint=model_fingerprint, corpus_hash=corpus_hashes[j], scores=corpus_new_scores)
+                cached_scores[j].update(corpus_new_scores)
+        self.record_scoring(model=model, tokenized_titles=list(titles_to_score.values()), tokenized_text_corpora=tokenized_text_corpora,
+                            unique_titles=len(set(normalized_titles)), titles_scored=len(titles_to_score))
+
+        return np.array([[corpus_scores[title] for corpus_scores in cached_scores] for title in normalized_titles], 
+                        dtype=np.float32).reshape(len(normalized_titles), len(cached_scores))
+
+    def has_cached_scores(self, text_corpus:str, model_loc:str):
+        """
+        Whether scores for text_corpus (calculated w/ the model at model_loc) are already in the score cache
+
+        Parameters:
+            text_corpus (str): text corpus describing occupations we're interested in
+            model_loc (str): filepath of pre-trained Word2Vec model
+        Returns:
+            has_cached_scores (bool): True if the score cache holds scores for the corpus
+        """
+        if self.score_cache is None:
+            return False
+        return self.score_cache.has_entries(model_fingerprint=ScoreCache.fingerprint_scoring(model_loc=model_loc, tokenizer=self.tokenizer),
+                                            corpus_hash=ScoreCache.hash_corpus(tokenized_text_corpus=self.tokenize_text_corpus(text_corpus=text_corpus)))
 
     def calculate_similarity(self, model, occupation_title:str, text_corpus:list):
         """
@@ -107,4 +401,111 @@ class JobCodeIdentifier:
         except KeyError:
             similarity_metric = 0 # Handle the case where a word is not in the vocabulary
 
-        return similarity_metric
\ No newline at end of file
+        return similarity_metric
+
+    def calculate_similarities(self, model, tokenized_titles:list, text_corpus:list):
+        """
+        Vectorized version of calculate_similarity - calculates the similarity of every occupation title to the text corpus w/ one matrix multiply
+        Numerically equivalent to calling calculate_similarity on each title (see calculate_corpora_similarities)
+
+            Parameters:
+                model (KeyedVectors): Word2Vec model
+                tokenized_titles (list): list of tokenized occupation titles
+                text_corpus (list): list of keywords describing occupations we're interested in
+            Returns:
+                similarity_metrics (np.ndarray): measurement of similarity of each occupation title to the text corpus
+        """
+        return self.calculate_corpora_similarities(model=model, tokenized_titles=tokenized_titles, text_corpora=[text_corpus])[:, 0]
+
+    def calculate_corpora_similarities(self, model, tokenized_titles:list, text_corpora:list):
+        """
+        Calculates the similarity of every occupation title to each of several text corpora w/ one matrix multiply
+        Numerically equivalent to calling calculate_similarity on each title/corpus pair:
+            - a title's similarity is the max over its words and all corpus keywords of dot(word vector, unit keyword vector), divided by
+              the norm of the title's stacked word vectors (gensim normalizes the title's word matrix as a whole)
+            - a title scores 0 if any of its words, or any keyword of the corpus, is not in the model's vocabulary
+
+            Parameters:
+                model (KeyedVectors): Word2Vec model
+                tokenized_titles (list): list of tokenized occupation titles
+                text_corpora (list): list of text corpora, each a list of keywords describing occupations we're interested in
+            Returns:
+                similarity_metrics (np.ndarray): measurement of similarity of each occupation title (rows) to each text corpus (columns)
+        """
+        similarity_metrics = np.zeros((len(tokenized_titles), len(text_corpora)), dtype=np.float32)
+
+        # a keyword outside the vocabulary zeroes every title for that corpus, same as calculate_similarity
+        corpora_keywords = [list(dict.fromkeys(keyword.lower() for keyword in text_corpus)) for text_corpus in text_corpora]
+        scored_corpora = [j for j, keywords in enumerate(corpora_keywords) if keywords and all(keyword in model.key_to_index for keyword in keywords)]
+        # titles containing a word outside the vocabulary keep a similarity of 0
+        scored_titles = [i for i, title in enumerate(tokenized_titles) if title and all(word in model.key_to_index for word in title)]
+        if not scored_corpora or not scored_titles:
+            return similarity_metrics
+
+        # unit-length keyword vectors of all corpora stacked - use pre-normalized vectors if the model carries them (see load_model)
+        keyword_indices = [model.key_to_index[keyword] for j in scored_corpora for keyword in corpora_keywords[j]]
+        keyword_offsets = np.cumsum([0] + [len(corpora_keywords[j]) for j in scored_corpora[:-1]])
+        normed_vectors = getattr(model, "normed_vectors", None)
+        if normed_vectors is not None:
+            keyword_matrix = np.asarray(normed_vectors[keyword_indices])
+        else:
+            keyword_matrix = np.asarray(model.vectors[keyword_indices])
+            keyword_norms = np.linalg.norm(keyword_matrix, axis=1, keepdims=True)
+            keyword_matrix = keyword_matrix / np.where(keyword_norms > 0, keyword_norms, 1)
+
+        # one row per unique title word
+        title_words = list(dict.fromkeys(word for i in scored_titles for word in tokenized_titles[i]))
+        word_positions = {word:position for position, word in enumerate(title_words)}
+        word_matrix = np.asarray(model.vectors[[model.key_to_index[word] for word in title_words]])
+        word_sq_norms = np.einsum("ij,ij->i", word_matrix, word_matrix)
+        # similarity of each title word to its most similar keyword in each corpus
+        word_max_similarities = np.maximum.reduceat(word_matrix @ keyword_matrix.T, keyword_offsets, axis=1)
+
+        # reduce per title: max over the title's words, scaled by the norm of the title's stacked word vectors
+        title_word_positions = np.array([word_positions[word] for i in scored_titles for word in tokenized_titles[i]])
+        title_offsets = np.cumsum([0] + [len(tokenized_titles[i]) for i in scored_titles[:-1]])
+        title_max_similarities = np.maximum.reduceat(word_max_similarities[title_word_positions], title_offsets, axis=0)
+        title_norms = np.sqrt(np.add.reduceat(word_sq_norms[title_word_positions], title_offsets))[:, np.newaxis]
+        similarity_metrics[np.ix_(scored_titles, scored_corpora)] = np.where(title_norms > 0, title_max_similarities / np.where(title_norms > 0, title_norms, 1), 0)
+
+        return similarity_metrics
+
+    def record_scoring(self, model, tokenized_titles:list, tokenized_text_corpora:list, unique_titles:int, titles_scored:int):
+        """
+        Records scoring telemetry in run_report - number of unique titles, how many were scored w/ the model (the rest came from the score cache),
+        and out-of-vocabulary token rates of the titles scored and the corpora (only computed when telemetry is enabled and the model was used)
+
+            Parameters:
+                model (KeyedVectors): Word2Vec model - None if every score came from the score cache
+                tokenized_titles (list): tokenized occupation titles scored w/ the model
+                tokenized_text_corpora (list): list of tokenized text corpora
+                unique_titles (int): number of unique (normalized) titles
+                titles_scored (int): number of titles scored w/ the model
+        """
+        if not self.run_report.enabled:
+            return
+        self.run_report.record(unique_titles=unique_titles, titles_scored=titles_scored, titles_from_score_cache=unique_titles - titles_scored)
+        if model is not None:
+            self.run_report.record(**self.calculate_oov_rates(model=model, tokenized_titles=tokenized_titles, text_corpora=tokenized_text_corpora))
+
+    @staticmethod
+    def calculate_oov_rates(model, tokenized_titles:list, text_corpora:list):
+        """
+        Calculates share of title and corpus tokens not in the model's vocabulary - a title or corpus w/ any such token scores 0 (see calculate_corpora_similarities)
+
+            Parameters:
+                model (KeyedVectors): Word2Vec model
+                tokenized_titles (list): list of tokenized occupation titles
+                text_corpora (list): list of tokenized text corpora
+            Returns:
+                oov_rates (dict): title_oov_token_rate, corpus_oov_token_rate, oov_token_rate (across both), and the out-of-vocabulary corpus tokens
+        """
+        title_tokens = [word for title in tokenized_titles for word in title]
+        corpus_tokens = [keyword.lower() for text_corpus in text_corpora for keyword in text_corpus]
+        title_oov = sum(word not in model.key_to_index for word in title_tokens)
+        corpus_oov_tokens = sorted({keyword for keyword in corpus_tokens if keyword not in model.key_to_index})
+        corpus_oov = sum(keyword not in model.key_to_index for keyword in corpus_tokens)
+        return {"title_oov_token_rate":title_oov / len(title_tokens) if title_tokens else 0.0,
+                "corpus_oov_token_rate":corpus_oov / len(corpus_tokens) if corpus_tokens else 0.0,
+                "oov_token_rate":(title_oov + corpus_oov) / (len(title_tokens) + len(corpus_tokens)) if title_tokens or corpus_tokens else 0.0,
+                "corpus_oov_tokens":corpus_oov_tokens}
@@ -1,8 +1,12 @@
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
 from DataProcessor import DataProcessor
 from JobCodeIdentifier import JobCodeIdentifier
 from DataFilterer import DataFilterer
+from RunReport import RunReport
+from OutputWriter import OutputWriter, DEFAULT_PARTITION_COLS
+from AggregationCube import AggregationCube
 
 class Model:
     """
@@ -12,13 +16,31 @@ class Model:
         job_code_text_corpus (list): text corpus used to identify relevant job titles - we will assess each job title's similarity to the corpus
         relevant_states (list): list of states we want to analyze 
         relevance_threshold (float): threshold to identify relevant job codes - those with similarity rating higher than this are deemed relevant
+        concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest
+        max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+        typed_schema (bool): whether data from all years is stored w/ a compact typed schema (see DataProcessor.apply_typed_schema)
+        chunksize (int): streaming mode - number of rows of each data file read at a time, w/ relevant_states applied while reading - None reads each file in one go
+        run_report (RunReport): per-stage telemetry of the run (wall/CPU time, peak RSS, rows in/out, titles scored, out-of-vocabulary token rate) - disabled unless passed in
+        output_writer (OutputWriter): writes outputs - compressed Parquet partitioned by YEAR unless another writer is passed in
+        write_all_years (bool): whether data from all years is also written to the outputs folder (as data_all_years) during the run
+        tokenizer (str): "nltk" to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer (same tokens, w/o importing NLTK)
+        build_cube (bool): whether the aggregation cube of the data we will analyze is built (see AggregationCube) and written alongside it
+        cube (pd.DataFrame): aggregation cube of the data we will analyze - None if build_cube is False
         
     Methods:
         __init__: Initializes instance of DataModel class
         get_output_loc: returns output location of DataProcessor object
+        get_model_loc: returns location of Word2Vec model, preferring the native memory-mapped store (and falling back to the vocabulary pack)
+        get_cache_loc: returns location of the on-disk data and score caches
+        get_stream_states: returns states to filter to while reading data in streaming mode
+        create_data_processor: creates DataProcessor object, reading and processing data from all relevant years
+        ingest_data_and_load_model: ingests data from all relevant years and, if needed, loads the Word2Vec model - concurrently in concurrent mode
+        write_output: writes data we will analyze (and its aggregation cube) to the outputs folder
         run_model: performs reading, processing, filtering processes, returning data we will analyze
     """
-    def __init__(self, job_code_text_corpus, relevant_states, relevance_threshold):
+    def __init__(self, job_code_text_corpus, relevant_states, relevance_threshold, concurrent:bool=False, max_workers:int=None, typed_schema:bool=False, chunksize:int=None,
+                 run_report:RunReport=None, output_writer:OutputWriter=None, write_all_years:bool=False,
+                 tokenizer:str="nltk", build_cube:bool=True):
         """
         Initializes instance of DataModel class
             
@@ -26,6 +48,15 @@ class Model:
                 job_code_text_corpus (list): text corpus used to identify relevant job titles - we will assess each job title's similarity to the corpus
                 relevant_states (list): list of states we want to analyze 
                 relevance_threshold (float): threshold to identify relevant job codes - those with similarity rating higher than this are deemed relevant
+                concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest - output matches the sequential run
+                max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+                typed_schema (bool): whether data from all years is stored w/ a compact typed schema - numeric columns parsed, suppression markers flagged, repeated strings as categoricals
+                chunksize (int): streaming mode - number of rows of each data file read at a time, w/ relevant_states applied while reading so memory stays bounded - None reads each file in one go
+                run_report (RunReport): collects per-stage telemetry of the run and optionally profiles stages - None disables telemetry
+                output_writer (OutputWriter): writes outputs - None writes compressed Parquet partitioned by YEAR (pass OutputWriter(..., output_format="csv") for CSV)
+                write_all_years (bool): whether to also write data from all years to the outputs folder (as data_all_years) - off by default, as it is large and slow to write
+                tokenizer (str): "nltk" (default) to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer - same tokens, w/o the cost of importing NLTK
+                build_cube (bool): whether to build the aggregation cube (year x state x occupation rollups w/ growth) of the data we will analyze, written as {name}_cube
             
             Returns:
                 data_to_analyze (pd.DataFrame): data relevant to the specified states (via relevant_states0) and industry (via job_code_text_corpus and relevance_threshold)
@@ -33,35 +64,151 @@ class Model:
         self.job_code_text_corpus = job_code_text_corpus
         self.relevant_states = relevant_states
         self.relevance_threshold = relevance_threshold
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.typed_schema = typed_schema
+        self.chunksize = chunksize
+        self.run_report = run_report if run_report is not None else RunReport(enabled=False)
+        self.output_writer = output_writer if output_writer is not None else OutputWriter(output_loc=self.get_output_loc(), partition_cols=DEFAULT_PARTITION_COLS)
+        self.write_all_years = write_all_years
+        self.tokenizer = tokenizer
+        self.build_cube = build_cube
+        self.cube = None
 
         self.data_to_analyze = self.run()
 
     def get_output_loc(self):
         return os.path.abspath(os.path.join(os.path.dirname(__file__), "../Outputs"))
     
-    def run(self):
-        
-        data_processor = DataProcessor(input_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Data")),
+    def get_model_loc(self):
+        """
+        Returns location of Word2Vec model - the native memory-mapped store (see convert_model.py) if it exists, else the word2vec binary
+        If neither is present (e.g. a small container), the vocabulary pack (see build_vocabulary_pack.py) is used in place of the full model
+        """
+        native_loc = os.path.abspath(os.path.join(os.path.dirname(__file__), "../Scripts/GoogleNews-vectors-negative300.kv"))
+        binary_loc = os.path.abspath(os.path.join(os.path.dirname(__file__), "../Scripts/GoogleNews-vectors-negative300.bin"))
+        pack_loc = os.path.abspath(os.path.join(os.path.dirname(__file__), "../Scripts/GoogleNews-vectors-pack.kv"))
+        if os.path.exists(native_loc):
+            return native_loc
+        if not os.path.exists(binary_loc) and os.path.exists(pack_loc):
+            return pack_loc
+        return binary_loc
+
+    def get_cache_loc(self):
+        return os.path.abspath(os.path.join(os.path.dirname(__file__), "../Cache"))
+
+    def get_stream_states(self):
+        """
+        Returns states to filter to while reading data in streaming mode - None keeps all states
+        """
+        return self.relevant_states
+
+    def create_data_processor(self, max_workers:int=None):
+        """
+        Creates DataProcessor object, which reads and processes data from all relevant years
+
+            Parameters:
+                max_workers (int): number of worker processes used to parse yearly data files - None parses sequentially
+
+            Returns:
+                data_processor (DataProcessor): DataProcessor object containing data from all relevant years
+        """
+        return DataProcessor(input_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Data")),
                             input_filename_format="state_M{year}_dl.csv",
                             relevant_years=[2001,2022], 
-                            output_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Outputs")))
+                            output_loc=self.get_output_loc(),
+                            cache_loc=self.get_cache_loc(),
+                            max_workers=max_workers,
+                            typed_schema=self.typed_schema,
+                            chunksize=self.chunksize,
+                            relevant_states=self.get_stream_states() if self.chunksize is not None else None,
+                            run_report=self.run_report)
+
+    def ingest_data_and_load_model(self, job_code_identifier:JobCodeIdentifier, text_corpora:list):
+        """
+        Ingests data from all relevant years and loads the Word2Vec model
+        Ingest and model load are independent - in concurrent mode, the model is loaded in a background thread while the yearly files are parsed in parallel
+        (unless every corpus has already been scored, in which case the model likely isn't needed at all and is left to be loaded on demand)
+
+            Parameters:
+                job_code_identifier (JobCodeIdentifier): JobCodeIdentifier object that will score occupation titles
+                text_corpora (list): list of text corpora that will be scored - None if not known ahead of time, in which case the model is always loaded
+
+            Returns:
+                data_processor (DataProcessor): DataProcessor object containing data from all relevant years
+                model (KeyedVectors): loaded Word2Vec model - None if not loaded ahead of time
+        """
+        max_workers = (self.max_workers or os.cpu_count()) if self.concurrent else None
+        if text_corpora is None and not self.concurrent:
+            return self.create_data_processor(max_workers=max_workers), job_code_identifier.load_model_for_run(model_loc=job_code_identifier.model_loc)
+
+        if self.concurrent and (text_corpora is None or 
+                                not all(job_code_identifier.has_cached_scores(text_corpus=text_corpus, model_loc=job_code_identifier.model_loc)
+                                        for text_corpus in text_corpora)):
+            with ThreadPoolExecutor(max_workers=1) as model_loader:
+                model_future = model_loader.submit(job_code_identifier.load_model_for_run, job_code_identifier.model_loc)
+                data_processor = self.create_data_processor(max_workers=max_workers)
+                model = model_future.result()
+        else:
+            data_processor = self.create_data_processor(max_workers=max_workers)
+            model = None
+
+        return data_processor, model
+
+    def write_output(self, name:str):
+        """
+        Writes data we will analyze to the outputs folder w/ output_writer - and its aggregation cube, as {name}_cube, if it was built
+
+            Parameters:
+                name (str): name of the output, e.g. light_industry
+
+            Returns:
+                output_path (str): filepath (or dataset folder) the output was written to
+        """
+        with self.run_report.stage("write", rows_in=len(self.data_to_analyze)):
+            output_path = self.output_writer.write(df=self.data_to_analyze, name=name)
+            if self.cube is not None:
+                self.output_writer.write(df=self.cube, name=f"{name}_cube")
+        return output_path
+
+    def run(self):
         
-        job_code_identifier = JobCodeIdentifier(data_all_years=data_processor.data_all_years, 
+        model_loc = self.get_model_loc()
+
+        # data_all_years is set once data is ingested - the identifier is created first so the score cache can be checked before loading the model
+        job_code_identifier = JobCodeIdentifier(data_all_years=None, 
                         job_code_text_corpus=self.job_code_text_corpus,
-                        model_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Scripts/GoogleNews-vectors-negative300.bin")),
-                        relevance_threshold=self.relevance_threshold)
+                        model_loc=model_loc,
+                        relevance_threshold=self.relevance_threshold,
+                        score_cache_loc=f"{self.get_cache_loc()}/scores.sqlite",
+                        run_report=self.run_report,
+                        tokenizer=self.tokenizer)
+
+        data_processor, model = self.ingest_data_and_load_model(job_code_identifier=job_code_identifier, text_corpora=[self.job_code_text_corpus])
+        job_code_identifier.data_all_years = data_processor.data_all_years
+        if self.write_all_years:
+            data_processor.write_all_years(output_writer=self.output_writer)
         
         data_filterer = DataFilterer(relevant_states=self.relevant_states)
 
         relevant_job_titles = job_code_identifier.identify_relevant_job_codes(data_all_years=data_processor.data_all_years,
                                                                               text_corpus=self.job_code_text_corpus,
                                                                               model_loc=job_code_identifier.model_loc,
-                                                                              relevance_threshold=self.relevance_threshold)
+                                                                              relevance_threshold=self.relevance_threshold,
+                                                                              model=model)
 
-        data_to_analyze = data_filterer.filter_data(data_all_years=data_processor.data_all_years, 
-                                                    relevant_job_titles=relevant_job_titles)
+        with self.run_report.stage("filter", rows_in=len(data_processor.data_all_years), titles_in=len(relevant_job_titles)) as counts:
+            data_to_analyze = data_filterer.filter_data(data_all_years=data_processor.data_all_years, 
+                                                        relevant_job_titles=relevant_job_titles)
+            counts["rows_out"] = len(data_to_analyze)
         
-        data_to_analyze = data_filterer.standardize_occ_title_format(relevant_data=data_to_analyze)
+        with self.run_report.stage("standardize", rows_in=len(data_to_analyze)):
+            data_to_analyze = data_filterer.standardize_occ_title_format(relevant_data=data_to_analyze)
+
+        if self.build_cube:
+            with self.run_report.stage("aggregate", rows_in=len(data_to_analyze)) as counts:
+                self.cube = AggregationCube().build(detail_data=data_to_analyze)
+                counts["rows_out"] = len(self.cube)
         
         return data_to_analyze
     
@@ -0,0 +1,384 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+
+class OccupationIndex:
+    """
+    Class designed to hold a persistent index of per-occupation token embeddings, answering two queries w/o scanning every title against every corpus word:
+        - top_k: the occupations most similar to a text corpus, w/ their scores and the corpus words that matched
+        - relevant_corpora: the stored industry corpora an occupation is relevant to
+
+    Each occupation (normalized title) is stored as its title words' vectors divided by the norm of the title's stacked word vectors, so an occupation's
+    similarity to a corpus is the max dot product btwn its stored vectors and the corpus' unit keyword vectors - the same score as
+    JobCodeIdentifier.calculate_corpora_similarities (an occupation w/ a word outside the model's vocabulary, or a corpus w/ such a word, scores 0)
+
+    Backends:
+        exact: one matrix multiply over all stored vectors - milliseconds for thousands of occupations
+        approximate: candidate occupations are retrieved from an HNSW graph (requires hnswlib), then re-scored exactly - stays fast as the catalog grows
+
+    Attributes:
+        index_loc (str): filepath to folder the index is saved to (e.g. Cache/occupation_index)
+        backend (str): exact or approximate
+        model_fingerprint (str): fingerprint of the model the vectors came from - see ScoreCache.fingerprint_model
+        titles_hash (str): hash of the normalized titles the index was built from
+        normalized_titles (list): normalized occupation titles, one per occupation
+        occ_codes (list): OCC_CODEs of each occupation
+        raw_titles (list): raw titles of each occupation found in the data
+        token_words (list): title word of each stored vector
+        token_owners (np.ndarray): occupation (position in normalized_titles) of each stored vector - vectors of an occupation are contiguous
+        token_matrix (np.ndarray): stored vectors - title word vectors divided by the norm of the title's stacked word vectors
+        corpora (list): stored industry corpora - dicts w/ name, keywords, relevance_threshold, and unknown_words (keywords not in the model's vocabulary)
+        keyword_matrix (np.ndarray): unit keyword vectors of the stored corpora, stacked (corpora w/ unknown words have none)
+        corpus_scores (np.ndarray): similarity of each occupation (rows) to each stored corpus (columns)
+        ann_index (hnswlib.Index): HNSW graph over token_matrix - None unless backend is approximate
+
+    Methods:
+        __init__: initializes instance of OccupationIndex class
+        build: builds the index from the canonical occupation table
+        load: loads the index from index_loc if it was built w/ the same model & occupations
+        save: saves the index to index_loc
+        add_corpus: stores an industry corpus, so relevant_corpora can answer for it
+        top_k: returns the occupations most similar to a text corpus
+        relevant_corpora: returns the stored corpora an occupation is relevant to
+        find_occupations: returns positions of occupations matching an OCC_CODE or title
+        get_keyword_matrix: returns unit keyword vectors of a tokenized text corpus
+        stack_corpora: calculates keyword vectors & scores of corpora to store
+        score_occupations: calculates similarity of every occupation to one or more corpora
+        build_ann_index: builds the HNSW graph over token_matrix
+        hash_titles: calculates the hash of a list of normalized titles
+    """
+    def __init__(self, index_loc:str, backend:str="exact"):
+        """
+        Initializes instance of OccupationIndex class
+
+        Parameters:
+            index_loc (str): filepath to folder the index is saved to - e.g. Cache/occupation_index, next to the data cache
+            backend (str): exact (default) or approximate (requires hnswlib)
+        """
+        if backend not in ("exact", "approximate"):
+            raise ValueError(f"backend must be 'exact' or 'approximate', not {backend!r}")
+        self.index_loc = index_loc
+        self.backend = backend
+        self.model_fingerprint = None
+        self.titles_hash = None
+        self.normalized_titles = []
+        self.occ_codes = []
+        self.raw_titles = []
+        self.token_words = []
+        self.token_owners = np.array([], dtype=np.int64)
+        self.token_matrix = np.zeros((0, 0), dtype=np.float32)
+        self.corpora = []
+        self.keyword_matrix = np.zeros((0, 0), dtype=np.float32)
+        self.corpus_scores = np.zeros((0, 0), dtype=np.float32)
+        self.ann_index = None
+        # corpora can be added while queries are answered (e.g. by the query server) - writes are serialized w/ self.lock, and queries
+        # read a consistent snapshot of the index under it (new state is computed first, then all of it is assigned at once)
+        self.lock = threading.Lock()
+
+    def build(self, occupation_table, tokenized_titles:list, model, model_fingerprint:str):
+        """
+        Builds the index from the canonical occupation table - stored corpora are kept, and re-scored against the new occupations
+
+        Parameters:
+            occupation_table (pd.DataFrame): canonical occupation table - see JobCodeIdentifier.build_occupation_table
+            tokenized_titles (list): tokenized titles, one per unique NORMALIZED_TITLE of occupation_table (in order of first appearance)
+            model (KeyedVectors): Word2Vec model
+            model_fingerprint (str): fingerprint of the model - see ScoreCache.fingerprint_model
+        """
+        normalized_titles = occupation_table["NORMALIZED_TITLE"].unique().tolist()
+        occupations = occupation_table.groupby("NORMALIZED_TITLE", sort=False)
+        occ_codes = occupations["OCC_CODE"].agg(lambda codes: sorted({code for code in codes if code is not None})).reindex(normalized_titles)
+        raw_titles = occupations["OCC_TITLE"].agg(lambda titles: list(dict.fromkeys(titles))).reindex(normalized_titles)
+
+        # occupations w/ a word outside the vocabulary always score 0, so they get no vectors
+        scored_titles = [i for i, title in enumerate(tokenized_titles) if title and all(word in model.key_to_index for word in title)]
+        token_words = [word for i in scored_titles for word in tokenized_titles[i]]
+        token_owners = np.repeat(np.array(scored_titles, dtype=np.int64), [len(tokenized_titles[i]) for i in scored_titles])
+        vectors = np.asarray(model.vectors[[model.key_to_index[word] for word in token_words]], dtype=np.float32).reshape(len(token_words), model.vector_size)
+        title_norms = np.sqrt(np.bincount(token_owners, weights=np.einsum("ij,ij->i", vectors, vectors), minlength=len(normalized_titles)))
+
+        with self.lock:
+            self.model_fingerprint = model_fingerprint
+            self.titles_hash = self.hash_titles(normalized_titles=normalized_titles)
+            self.normalized_titles = normalized_titles
+            self.occ_codes = occ_codes.tolist()
+            self.raw_titles = raw_titles.tolist()
+            self.token_words = token_words
+            self.token_owners = token_owners
+            self.token_matrix = (vectors / np.where(title_norms > 0, title_norms, 1)[token_owners, np.newaxis]).astype(np.float32)
+            self.ann_index = self.build_ann_index() if self.backend == "approximate" else None
+            # stored corpora (e.g. loaded from an index built w/ another model) are re-scored against the new vectors
+            self.corpora, self.keyword_matrix, self.corpus_scores = self.stack_corpora(corpora=self.corpora, model=model)
+
+    def load(self, model_fingerprint:str, normalized_titles:list):
+        """
+        Loads the index from index_loc if it was built w/ the same model and occupations
+        Otherwise, only the stored corpora are loaded, so build can re-score them against the new model/occupations
+
+        Parameters:
+            model_fingerprint (str): fingerprint of the model that will be used - see ScoreCache.fingerprint_model
+            normalized_titles (list): normalized titles of the occupations in the data
+
+        Returns:
+            loaded (bool): True if the index can be used as is, False if it needs to be (re)built
+        """
+        try:
+            with open(f"{self.index_loc}/index.json") as f:
+                metadata = json.load(f)
+            arrays = np.load(f"{self.index_loc}/index.npz")
+        except (FileNotFoundError, json.JSONDecodeError, ValueError): # no index yet (or unreadable) - build from scratch
+            return False
+        self.corpora = metadata["corpora"]
+        if metadata["model_fingerprint"] != model_fingerprint or metadata["titles_hash"] != self.hash_titles(normalized_titles=normalized_titles):
+            return False
+
+        self.model_fingerprint = metadata["model_fingerprint"]
+        self.titles_hash = metadata["titles_hash"]
+        self.normalized_titles = metadata["normalized_titles"]
+        self.occ_codes = metadata["occ_codes"]
+        self.raw_titles = metadata["raw_titles"]
+        self.token_words = metadata["token_words"]
+        self.token_owners = arrays["token_owners"]
+        self.token_matrix = arrays["token_matrix"]
+        self.keyword_matrix = arrays["keyword_matrix"]
+        self.corpus_scores = arrays["corpus_scores"]
+        if self.backend == "approximate":
+            self.ann_index = self.build_ann_index(ann_index_loc=f"{self.index_loc}/index.hnsw")
+        return True
+
+    def save(self):
+        """
+        Saves the index to index_loc - index.json (titles, words, stored corpora), index.npz (vectors & scores), and index.hnsw (approximate backend only)
+        """
+        os.makedirs(self.index_loc, exist_ok=True)
+        with self.lock:
+            metadata = {"model_fingerprint":self.model_fingerprint, "titles_hash":self.titles_hash, "normalized_titles":self.normalized_titles,
+                        "occ_codes":self.occ_codes, "raw_titles":self.raw_titles, "token_words":self.token_words, "corpora":self.corpora}
+            np.savez(f"{self.index_loc}/index.npz", token_owners=self.token_owners, token_matrix=self.token_matrix,
+                     keyword_matrix=self.keyword_matrix, corpus_scores=self.corpus_scores)
+            with open(f"{self.index_loc}/index.json", "w") as f:
+                json.dump(metadata, f)
+            # a graph left by an earlier approximate save would not match the vectors saved now - load would map its labels to the wrong words
+            if self.ann_index is not None:
+                self.ann_index.save_index(f"{self.index_loc}/index.hnsw")
+            elif os.path.exists(f"{self.index_loc}/index.hnsw"):
+                os.remove(f"{self.index_loc}/index.hnsw")
+
+    def add_corpus(self, name:str, tokenized_text_corpus:list, relevance_threshold:float, model):
+        """
+        Stores an industry corpus (replacing any stored corpus w/ the same name), so relevant_corpora can answer for it
+
+        Parameters:
+            name (str): name of the industry
+            tokenized_text_corpus (list): tokenized text corpus describing the industry
+            relevance_threshold (float): threshold above which an occupation is relevant to the industry
+            model (KeyedVectors): Word2Vec model
+
+        Returns:
+            unknown_words (list): corpus words not in the model's vocabulary - if any, every occupation scores 0 for this corpus
+        """
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in tokenized_text_corpus))
+        with self.lock:
+            corpora = [corpus for corpus in self.corpora if corpus["name"] != name] + \
+                      [{"name":name, "keywords":keywords, "relevance_threshold":relevance_threshold, "unknown_words":[]}]
+            corpora, keyword_matrix, corpus_scores = self.stack_corpora(corpora=corpora, model=model)
+            self.corpora, self.keyword_matrix, self.corpus_scores = corpora, keyword_matrix, corpus_scores
+        return corpora[-1]["unknown_words"]
+
+    def top_k(self, tokenized_text_corpus:list, model, k:int=10):
+        """
+        Returns the k occupations most similar to a text corpus
+
+        Parameters:
+            tokenized_text_corpus (list): tokenized text corpus
+            model (KeyedVectors): Word2Vec model
+            k (int): number of occupations to return - at least 1
+
+        Returns:
+            result (dict): occupations (list of dicts w/ normalized_title, occ_codes, raw_titles, score, and matched_words - the best-matching
+                           corpus word for each title word, best first) and unknown_words (corpus words not in the model's vocabulary)
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, not {k}")
+        with self.lock:
+            token_words, token_owners, token_matrix, ann_index = self.token_words, self.token_owners, self.token_matrix, self.ann_index
+            normalized_titles, occ_codes, raw_titles = self.normalized_titles, self.occ_codes, self.raw_titles
+
+        keywords = list(dict.fromkeys(keyword.lower() for keyword in tokenized_text_corpus))
+        keyword_matrix, unknown_words = self.get_keyword_matrix(keywords=keywords, model=model)
+        # same semantics as the pipeline - a corpus w/ an unknown word scores every occupation 0
+        if unknown_words or not keywords or not len(token_words):
+            return {"occupations":[], "unknown_words":unknown_words}
+
+        if ann_index is not None:
+            # candidate vectors closest to any keyword, then exact scores for all vectors of the candidate occupations
+            labels, _ = ann_index.knn_query(keyword_matrix, k=min(len(token_words), max(4 * k, 50)))
+            candidates = np.isin(token_owners, np.unique(token_owners[labels.ravel()]))
+            token_rows = np.flatnonzero(candidates)
+        else:
+            token_rows = np.arange(len(token_words))
+
+        token_similarities = token_matrix[token_rows] @ keyword_matrix.T
+        best_keywords = token_similarities.argmax(axis=1)
+        best_similarities = token_similarities[np.arange(len(token_rows)), best_keywords]
+        owners = token_owners[token_rows]
+        owner_starts = np.flatnonzero(np.diff(owners, prepend=-1) != 0)
+        owner_scores = np.maximum.reduceat(best_similarities, owner_starts)
+
+        top_owners = np.argsort(-owner_scores, kind="stable")[:k]
+        owner_stops = np.append(owner_starts[1:], len(token_rows))
+        occupations = []
+        for position in top_owners:
+            start, stop = owner_starts[position], owner_stops[position]
+            title = owners[start]
+            matched_words = sorted(({"title_word":token_words[token_rows[row]], "corpus_word":keywords[best_keywords[row]],
+                                     "similarity":float(best_similarities[row])} for row in range(start, stop)), key=lambda match: -match["similarity"])
+            occupations.append({"normalized_title":normalized_titles[title], "occ_codes":occ_codes[title], "raw_titles":raw_titles[title],
+                                "score":float(owner_scores[position]), "matched_words":matched_words})
+        return {"occupations":occupations, "unknown_words":unknown_words}
+
+    def relevant_corpora(self, occupation:str):
+        """
+        Returns the stored corpora an occupation is relevant to (score above the corpus' relevance_threshold), most similar first
+
+        Parameters:
+            occupation (str): OCC_CODE or title (raw or normalized) of the occupation
+
+        Returns:
+            relevant_corpora (list): list of dicts w/ normalized_title, corpus (name), score, and relevance_threshold - empty if the occupation is not in the index
+        """
+        # corpora & their scores are replaced together by add_corpus - read both from one snapshot
+        with self.lock:
+            positions, corpora, corpus_scores, normalized_titles = self.find_occupations(occupation=occupation), self.corpora, self.corpus_scores, self.normalized_titles
+        relevant_corpora = []
+        for title in positions:
+            for j, corpus in enumerate(corpora):
+                score = float(corpus_scores[title, j])
+                if score > corpus["relevance_threshold"]:
+                    relevant_corpora.append({"normalized_title":normalized_titles[title], "corpus":corpus["name"],
+                                             "score":score, "relevance_threshold":corpus["relevance_threshold"]})
+        return sorted(relevant_corpora, key=lambda match: -match["score"])
+
+    def find_occupations(self, occupation:str):
+        """
+        Returns positions of occupations matching an OCC_CODE, or else a title - titles are matched after normalization (see JobCodeIdentifier.normalize_title)
+
+        Parameters:
+            occupation (str): OCC_CODE or title (raw or normalized) of the occupation
+
+        Returns:
+            positions (list): positions of matching occupations in normalized_titles
+        """
+        positions = [i for i, codes in enumerate(self.occ_codes) if occupation in codes]
+        if positions:
+            return positions
+        normalized_title = " ".join(str(occupation).lower().rstrip("* ").split())
+        return [i for i, title in enumerate(self.normalized_titles) if title == normalized_title]
+
+    def get_keyword_matrix(self, keywords:list, model):
+        """
+        Returns unit keyword vectors of keywords - uses pre-normalized vectors if the model carries them (see JobCodeIdentifier.load_model)
+
+        Parameters:
+            keywords (list): list of unique lower-case keywords
+            model (KeyedVectors): Word2Vec model
+
+        Returns:
+            keyword_matrix (np.ndarray): unit vector of each known keyword
+            unknown_words (list): keywords not in the model's vocabulary
+        """
+        unknown_words = [keyword for keyword in keywords if keyword not in model.key_to_index]
+        known_indices = [model.key_to_index[keyword] for keyword in keywords if keyword in model.key_to_index]
+        normed_vectors = getattr(model, "normed_vectors", None)
+        if normed_vectors is not None:
+            keyword_matrix = np.asarray(normed_vectors[known_indices], dtype=np.float32)
+        else:
+            keyword_matrix = np.asarray(model.vectors[known_indices], dtype=np.float32)
+            keyword_norms = np.linalg.norm(keyword_matrix, axis=1, keepdims=True)
+            keyword_matrix = keyword_matrix / np.where(keyword_norms > 0, keyword_norms, 1)
+        return keyword_matrix.reshape(len(known_indices), model.vector_size), unknown_words
+
+    def stack_corpora(self, corpora:list, model):
+        """
+        Calculates keyword vectors, unknown words, and occupation scores of corpora - w/o changing the index, so the caller can assign the new state at once
+        Called w/ self.lock held
+
+        Parameters:
+            corpora (list): corpora to store - dicts w/ name, keywords, relevance_threshold
+            model (KeyedVectors): Word2Vec model
+
+        Returns:
+            corpora (list): copies of corpora w/ unknown_words set
+            keyword_matrix (np.ndarray): unit keyword vectors of the corpora, stacked
+            corpus_scores (np.ndarray): similarity of each occupation (rows) to each corpus (columns)
+        """
+        stacked_corpora, keyword_matrices = [], []
+        for corpus in corpora:
+            keyword_matrix, unknown_words = self.get_keyword_matrix(keywords=corpus["keywords"], model=model)
+            stacked_corpora.append({**corpus, "unknown_words":unknown_words})
+            # same semantics as the pipeline - a corpus w/ an unknown word scores every occupation 0, so its vectors are left out
+            if not unknown_words:
+                keyword_matrices.append(keyword_matrix)
+        keyword_matrix = np.vstack(keyword_matrices) if keyword_matrices else np.zeros((0, model.vector_size), dtype=np.float32)
+        corpus_scores = self.score_occupations(keyword_matrix=keyword_matrix,
+                                               corpus_sizes=[len(corpus["keywords"]) if not corpus["unknown_words"] else 0 for corpus in stacked_corpora])
+        return stacked_corpora, keyword_matrix, corpus_scores
+
+    def score_occupations(self, keyword_matrix:np.ndarray, corpus_sizes:list):
+        """
+        Calculates similarity of every occupation to each corpus w/ one matrix multiply
+
+        Parameters:
+            keyword_matrix (np.ndarray): unit keyword vectors of the corpora, stacked
+            corpus_sizes (list): number of keyword vectors of each corpus - 0 for a corpus w/ an unknown word
+
+        Returns:
+            corpus_scores (np.ndarray): similarity of each occupation (rows) to each corpus (columns)
+        """
+        corpus_scores = np.zeros((len(self.normalized_titles), len(corpus_sizes)), dtype=np.float32)
+        scored_corpora = [j for j, size in enumerate(corpus_sizes) if size > 0]
+        if not scored_corpora or not len(self.token_words):
+            return corpus_scores
+
+        keyword_offsets = np.cumsum([0] + [size for size in corpus_sizes if size > 0][:-1])
+        token_similarities = np.maximum.reduceat(self.token_matrix @ keyword_matrix.T, keyword_offsets, axis=1)
+        owner_starts = np.flatnonzero(np.diff(self.token_owners, prepend=-1) != 0)
+        corpus_scores[np.ix_(self.token_owners[owner_starts], scored_corpora)] = np.maximum.reduceat(token_similarities, owner_starts, axis=0)
+        return corpus_scores
+
+    def build_ann_index(self, ann_index_loc:str=None):
+        """
+        Builds the HNSW graph over token_matrix (inner product space) - or loads it from ann_index_loc if it exists and holds one item per stored vector
+
+        Parameters:
+            ann_index_loc (str): filepath of a saved HNSW graph - None builds a new one
+
+        Returns:
+            ann_index (hnswlib.Index): HNSW graph over token_matrix
+        """
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("The approximate backend requires hnswlib (pip install hnswlib) - or use backend='exact'") from e
+        if ann_index_loc is not None and os.path.exists(ann_index_loc):
+            ann_index = hnswlib.Index(space="ip", dim=self.token_matrix.shape[1])
+            ann_index.load_index(ann_index_loc, max_elements=max(len(self.token_words), 1))
+            # labels are positions in token_matrix - a graph w/ another item count was built from other vectors, so it is rebuilt
+            if ann_index.get_current_count() == len(self.token_words):
+                ann_index.set_ef(200)
+                return ann_index
+        ann_index = hnswlib.Index(space="ip", dim=self.token_matrix.shape[1])
+        ann_index.init_index(max_elements=max(len(self.token_words), 1), ef_construction=200, M=16)
+        if len(self.token_words):
+            ann_index.add_items(self.token_matrix, np.arange(len(self.token_words)))
+        ann_index.set_ef(200)
+        return ann_index
+
+    @staticmethod
+    def hash_titles(normalized_titles:list):
+        """
+        Calculates the hash of a list of normalized titles - an index is rebuilt when the occupations in the data change
+        """
+        return hashlib.sha256("\n".join(normalized_titles).encode()).hexdigest()
@@ -0,0 +1,147 @@
+import pandas as pd
+import os
+import shutil
+
+# output formats, mapped to the file extension (or dataset folder suffix) they are written w/
+OUTPUT_FORMATS = {"parquet":".parquet", "arrow":".arrow", "csv":".csv"}
+# default partitioning - one partition per year keeps files large enough to read efficiently; adding STATE suits the much larger
+# metropolitan/national-industry files, but splits the state files into ~1,000 tiny files that are slower to write & reload than a single file
+DEFAULT_PARTITION_COLS = ["YEAR"]
+# inferred types of object columns that Arrow converts as is - any other mix (e.g. numbers in some years, suppression markers like "**" in others) is written as strings
+ARROW_COMPATIBLE_TYPES = {"string", "empty", "boolean", "integer", "floating", "mixed-integer-float", "decimal", "bytes",
+                          "date", "datetime", "datetime64", "time", "timedelta", "timedelta64"}
+
+class OutputWriter:
+    """
+    Class designed to write output DFs - compressed Parquet (optionally partitioned by columns such as YEAR/STATE), Arrow IPC, or CSV
+
+    Parquet and Arrow outputs are columnar and compressed, so they are much smaller on disk and much faster to write and reload than CSV
+    Partitioned outputs are written as a folder w/ one subfolder per partition value (e.g. light_industry.parquet/YEAR=2019/STATE=Ohio/...),
+    so readers (pandas, pyarrow, Tableau's Parquet connector, DuckDB) can skip partitions they don't need
+
+    Attributes:
+        output_loc (str): filepath to folder outputs are written to
+        output_format (str): one of OUTPUT_FORMATS - parquet, arrow, or csv
+        partition_cols (list): columns Parquet/Arrow outputs are partitioned by - None writes a single file
+        compression (str): compression codec of Parquet/Arrow outputs - e.g. zstd, snappy, lz4, or None
+
+    Methods:
+        __init__: initializes instance of OutputWriter class
+        get_output_path: returns the filepath (or dataset folder) an output is written to
+        write: writes a DF as the output named name
+        make_arrow_compatible: casts object columns holding a mix of types to strings, so Arrow can convert them
+        read: reads the output named name back into a DF
+    """
+    def __init__(self, output_loc:str, output_format:str="parquet", partition_cols:list=None, compression:str="zstd"):
+        """
+        Initializes instance of OutputWriter class
+
+        Parameters:
+            output_loc (str): filepath to folder outputs are written to
+            output_format (str): parquet (default), arrow (Arrow IPC), or csv
+            partition_cols (list): columns Parquet/Arrow outputs are partitioned by (e.g. ["YEAR", "STATE"]) - None writes a single file, ignored for csv
+            compression (str): compression codec of Parquet/Arrow outputs - e.g. zstd, snappy, lz4, or None
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {list(OUTPUT_FORMATS)}, not {output_format!r}")
+        self.output_loc = output_loc
+        self.output_format = output_format
+        self.partition_cols = partition_cols if output_format != "csv" else None
+        self.compression = compression
+
+    def get_output_path(self, name:str):
+        """
+        Returns the filepath an output is written to - a folder if the output is partitioned
+        """
+        return f"{self.output_loc}/{name}{OUTPUT_FORMATS[self.output_format]}"
+
+    def write(self, df:pd.DataFrame, name:str):
+        """
+        Writes df as the output named name, replacing any previous version of it
+        An empty df is still written (w/ its columns), so readers of the output don't fail when a run selects no rows
+
+        Parameters:
+            df (pd.DataFrame): DF to write
+            name (str): name of the output, e.g. light_industry
+
+        Returns:
+            output_path (str): filepath (or dataset folder) the output was written to
+        """
+        output_path = self.get_output_path(name=name)
+        os.makedirs(self.output_loc, exist_ok=True)
+        if self.output_format == "csv":
+            df.to_csv(output_path, index=False)
+            return output_path
+
+        try:
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+        except ImportError as e:
+            raise ImportError(f"Writing {self.output_format} outputs requires pyarrow (pip install pyarrow) - or use output_format='csv'") from e
+
+        # partitioned outputs are folders - clear the previous run's folder so partitions that no longer exist don't linger
+        if os.path.isdir(output_path):
+            shutil.rmtree(output_path)
+        elif os.path.exists(output_path):
+            os.remove(output_path)
+
+        table = pa.Table.from_pandas(self.make_arrow_compatible(df=df), preserve_index=False)
+        if self.partition_cols and len(df) == 0:
+            # write_dataset writes no files for an empty table - write one empty file keeping the schema, which read picks up from the folder
+            os.makedirs(output_path)
+            if self.output_format == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, f"{output_path}/part-0.parquet", compression=self.compression)
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, f"{output_path}/part-0.arrow", compression=self.compression)
+        elif self.partition_cols:
+            file_format = ds.ParquetFileFormat() if self.output_format == "parquet" else ds.IpcFileFormat()
+            file_options = file_format.make_write_options(compression=self.compression)
+            ds.write_dataset(table, base_dir=output_path, format=file_format, file_options=file_options,
+                             partitioning=self.partition_cols, partitioning_flavor="hive", existing_data_behavior="overwrite_or_ignore")
+        else:
+            # a single file rather than a folder - write_dataset always writes folders
+            if self.output_format == "parquet":
+                import pyarrow.parquet as pq
+                pq.write_table(table, output_path, compression=self.compression)
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, output_path, compression=self.compression)
+        return output_path
+
+    @staticmethod
+    def make_arrow_compatible(df:pd.DataFrame):
+        """
+        Casts object columns holding a mix of types to strings - e.g. LOC_Q is numeric in years w/o suppressed values and a string column in years w/ them,
+        so data from all years holds floats and strings in one column, which Arrow refuses to convert
+
+        Parameters:
+            df (pd.DataFrame): DF to write
+
+        Returns:
+            df (pd.DataFrame): DF w/ mixed object columns cast to the string dtype (nulls kept) - df itself if no column needed casting
+        """
+        mixed_cols = [col for col in df.columns if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ARROW_COMPATIBLE_TYPES]
+        if not mixed_cols:
+            return df
+        return df.assign(**{col:df[col].astype("string") for col in mixed_cols})
+
+    def read(self, name:str):
+        """
+        Reads the output named name back into a DF - partition columns are restored from the folder names (placed last), and rows are grouped by partition
+
+        Parameters:
+            name (str): name of the output, e.g. light_industry
+
+        Returns:
+            df (pd.DataFrame): DF of the output
+        """
+        output_path = self.get_output_path(name=name)
+        if self.output_format == "csv":
+            return pd.read_csv(output_path)
+
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(output_path, format="parquet" if self.output_format == "parquet" else "ipc",
+                             partitioning="hive" if self.partition_cols else None)
+        return dataset.to_table().to_pandas()
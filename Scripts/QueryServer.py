@@ -0,0 +1,335 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from Model import Model
+from JobCodeIdentifier import JobCodeIdentifier
+from DataFilterer import DataFilterer
+from RunReport import RunReport
+from ScoreCache import ScoreCache
+from OccupationIndex import OccupationIndex
+
+class QueryServer(Model):
+    """
+    Class designed to keep data from all years and the Word2Vec model resident in a long-lived process, answering industry queries over local HTTP
+
+    Endpoints:
+        GET /health: 200 while the process is up
+        GET /status: warm-up status - warming_up, ready, or failed - plus warm-up time and data size
+        POST /query: JSON body w/ job_code_text_corpus, relevant_states (optional), relevance_threshold, output ("titles" or "rows", default "titles")
+                     returns the relevant titles (and the filtered rows if output is "rows") - 503 until warm-up completes
+        POST /top_k: JSON body w/ job_code_text_corpus, k (optional, default 10)
+                     returns the k occupations most similar to the corpus, w/ their scores and matched corpus words (see OccupationIndex.top_k)
+        POST /corpora: JSON body w/ name, job_code_text_corpus, relevance_threshold - stores an industry corpus in the occupation index
+        POST /relevant_corpora: JSON body w/ occupation (OCC_CODE or title) - returns the stored corpora the occupation is relevant to
+
+    Attributes:
+        host (str): host the server listens on
+        port (int): port the server listens on
+        concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest during warm-up
+        max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+        typed_schema (bool): whether data from all years is stored w/ a compact typed schema (see DataProcessor.apply_typed_schema)
+        chunksize (int): always None - the server keeps data for all states resident
+        status (str): warm-up status - warming_up, ready, or failed
+        warm_up_error (str): error raised during warm-up - None if warm-up did not fail
+        warm_up_seconds (float): time taken to warm up - None until warm-up completes
+        data_all_years (pd.DataFrame): DF containing read and processed data from all relevant years
+        model (KeyedVectors): loaded Word2Vec model
+        job_code_identifier (JobCodeIdentifier): JobCodeIdentifier object that scores titles
+        data_filterer (DataFilterer): DataFilterer object holding the index over data_all_years
+        tokenizer (str): "nltk" to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer (same tokens, w/o importing NLTK)
+        occupation_table (pd.DataFrame): canonical occupation table of data_all_years (see JobCodeIdentifier.build_occupation_table)
+        occupation_titles (list): unique occupation titles in data_all_years
+        normalized_titles (list): unique normalized occupation titles - each scored once per query
+        tokenized_titles (list): tokenized normalized occupation titles
+        index_backend (str): backend of the occupation index - exact, or approximate (requires hnswlib)
+        occupation_index (OccupationIndex): persistent index of occupation embeddings, saved next to the data cache
+
+    Methods:
+        __init__: Initializes instance of QueryServer class
+        warm_up: ingests data, loads the Word2Vec model, and prepares titles & the filter index
+        get_status: returns warm-up status
+        query: identifies relevant titles (and optionally rows) for an industry
+        top_k: returns the occupations most similar to a text corpus
+        add_corpus: stores an industry corpus in the occupation index
+        relevant_corpora: returns the stored corpora an occupation is relevant to
+        parse_request: validates the JSON body of a POST request and returns the method answering it
+        serve: starts warm-up in the background and serves requests until interrupted
+    """
+    def __init__(self, host:str="127.0.0.1", port:int=8000, concurrent:bool=False, max_workers:int=None, typed_schema:bool=False, tokenizer:str="nltk",
+                 index_backend:str="exact"):
+        """
+        Initializes instance of QueryServer class
+
+            Parameters:
+                host (str): host the server listens on
+                port (int): port the server listens on
+                concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest during warm-up
+                max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+                typed_schema (bool): whether data from all years is stored w/ a compact typed schema
+                tokenizer (str): "nltk" (default) to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer - same tokens, w/o the cost of importing NLTK
+                index_backend (str): backend of the occupation index - exact (default), or approximate (requires hnswlib)
+        """
+        self.host = host
+        self.port = port
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.typed_schema = typed_schema
+        self.chunksize = None
+        self.tokenizer = tokenizer
+        self.index_backend = index_backend
+        # per-stage telemetry is collected for batch runs - a long-lived server reports warm-up and query times via /status and /query instead
+        self.run_report = RunReport(enabled=False)
+
+        self.status = "warming_up"
+        self.warm_up_error = None
+        self.warm_up_seconds = None
+        self.data_all_years = None
+        self.model = None
+        self.job_code_identifier = None
+        self.data_filterer = None
+        self.occupation_table = None
+        self.occupation_titles = None
+        self.normalized_titles = None
+        self.tokenized_titles = None
+        self.occupation_index = None
+
+    def warm_up(self):
+        """
+        Ingests data from all years, loads the Word2Vec model, tokenizes the occupation titles, and builds the filter index - everything a query reuses
+        The occupation index is loaded from the cache folder, and only rebuilt (keeping its stored corpora) if the model or the occupations changed
+        """
+        start = time.perf_counter()
+        try:
+            model_loc = self.get_model_loc()
+            job_code_identifier = JobCodeIdentifier(data_all_years=None,
+                            job_code_text_corpus=None,
+                            model_loc=model_loc,
+                            relevance_threshold=None,
+                            score_cache_loc=f"{self.get_cache_loc()}/scores.sqlite",
+                            tokenizer=self.tokenizer)
+            # no corpus is known ahead of time, so the model is always loaded up front
+            data_processor, model = self.ingest_data_and_load_model(job_code_identifier=job_code_identifier, text_corpora=None)
+            job_code_identifier.data_all_years = data_processor.data_all_years
+
+            data_filterer = DataFilterer(relevant_states=None)
+            data_filterer.build_index(data_all_years=data_processor.data_all_years)
+            occupation_table = job_code_identifier.build_occupation_table(data_all_years=data_processor.data_all_years)
+            normalized_titles = occupation_table["NORMALIZED_TITLE"].unique().tolist()
+            tokenized_titles = job_code_identifier.tokenize_titles(occupation_titles=normalized_titles)
+
+            occupation_index = OccupationIndex(index_loc=f"{self.get_cache_loc()}/occupation_index", backend=self.index_backend)
+            model_fingerprint = ScoreCache.fingerprint_model(model_loc=model_loc)
+            if not occupation_index.load(model_fingerprint=model_fingerprint, normalized_titles=normalized_titles):
+                occupation_index.build(occupation_table=occupation_table, tokenized_titles=tokenized_titles, model=model, model_fingerprint=model_fingerprint)
+                occupation_index.save()
+
+            self.data_all_years = data_processor.data_all_years
+            self.model = model
+            self.job_code_identifier = job_code_identifier
+            self.data_filterer = data_filterer
+            self.occupation_table = occupation_table
+            self.occupation_titles = occupation_table["OCC_TITLE"].unique().tolist()
+            self.normalized_titles = normalized_titles
+            self.tokenized_titles = tokenized_titles
+            self.occupation_index = occupation_index
+            self.status = "ready"
+        except Exception as e:
+            self.warm_up_error = repr(e)
+            self.status = "failed"
+        self.warm_up_seconds = time.perf_counter() - start
+
+    def get_status(self):
+        """
+        Returns warm-up status
+
+            Returns:
+                status (dict): status, warm-up error & time, and number of rows & titles held
+        """
+        return {"status":self.status,
+                "warm_up_error":self.warm_up_error,
+                "warm_up_seconds":self.warm_up_seconds,
+                "rows":len(self.data_all_years) if self.data_all_years is not None else None,
+                "titles":len(self.occupation_titles) if self.occupation_titles is not None else None}
+
+    def query(self, job_code_text_corpus:str, relevant_states:list, relevance_threshold:float, output:str="titles"):
+        """
+        Identifies occupation titles relevant to an industry and, optionally, the data for them - same result as Model for the same inputs
+
+            Parameters:
+                job_code_text_corpus (str): text corpus describing the industry
+                relevant_states (list): list of states we want to analyze - None for all states
+                relevance_threshold (float): threshold to identify relevant job codes - those with similarity rating higher than this are deemed relevant
+                output (str): "titles" to return the relevant titles only, "rows" to also return the filtered rows
+
+            Returns:
+                result (dict): relevant_titles (list) and, if output is "rows", rows (list of dicts)
+        """
+        tokenized_text_corpus = self.job_code_identifier.tokenize_text_corpus(text_corpus=job_code_text_corpus)
+        similarities = self.job_code_identifier.score_titles(tokenized_titles=self.tokenized_titles, tokenized_text_corpora=[tokenized_text_corpus],
+                                                             model_loc=self.job_code_identifier.model_loc, model=self.model)
+        occupation_titles, similarities = self.job_code_identifier.map_to_raw_titles(occupation_table=self.occupation_table, normalized_titles=self.normalized_titles,
+                                                                                     similarities=similarities)
+        relevant_job_titles = [title for title, similarity in zip(occupation_titles, similarities[:, 0]) if similarity > relevance_threshold]
+
+        result = {"relevant_titles":relevant_job_titles}
+        if output == "rows":
+            data_filterer = self.data_filterer.with_states(relevant_states=relevant_states)
+            relevant_data = data_filterer.filter_data(data_all_years=self.data_all_years, relevant_job_titles=relevant_job_titles)
+            relevant_data = data_filterer.standardize_occ_title_format(relevant_data=relevant_data)
+            # to_json handles NaN/NA values, which json.dumps would write as invalid JSON
+            result["rows"] = json.loads(relevant_data.to_json(orient="records"))
+        return result
+
+    def top_k(self, job_code_text_corpus:str, k:int=10):
+        """
+        Returns the k occupations most similar to a text corpus - see OccupationIndex.top_k
+
+            Parameters:
+                job_code_text_corpus (str): text corpus describing the industry
+                k (int): number of occupations to return
+
+            Returns:
+                result (dict): occupations (w/ scores and matched corpus words) and unknown_words (corpus words not in the model's vocabulary)
+        """
+        tokenized_text_corpus = self.job_code_identifier.tokenize_text_corpus(text_corpus=job_code_text_corpus)
+        return self.occupation_index.top_k(tokenized_text_corpus=tokenized_text_corpus, model=self.model, k=k)
+
+    def add_corpus(self, name:str, job_code_text_corpus:str, relevance_threshold:float):
+        """
+        Stores an industry corpus in the occupation index (replacing any stored corpus w/ the same name) and saves the index
+
+            Parameters:
+                name (str): name of the industry
+                job_code_text_corpus (str): text corpus describing the industry
+                relevance_threshold (float): threshold above which an occupation is relevant to the industry
+
+            Returns:
+                result (dict): name of the stored corpus and unknown_words (corpus words not in the model's vocabulary - if any, no occupation is relevant)
+        """
+        tokenized_text_corpus = self.job_code_identifier.tokenize_text_corpus(text_corpus=job_code_text_corpus)
+        unknown_words = self.occupation_index.add_corpus(name=name, tokenized_text_corpus=tokenized_text_corpus,
+                                                         relevance_threshold=relevance_threshold, model=self.model)
+        self.occupation_index.save()
+        return {"name":name, "unknown_words":unknown_words}
+
+    def relevant_corpora(self, occupation:str):
+        """
+        Returns the stored corpora an occupation is relevant to - see OccupationIndex.relevant_corpora
+
+            Parameters:
+                occupation (str): OCC_CODE or title of the occupation
+
+            Returns:
+                result (dict): relevant_corpora (list of dicts w/ normalized_title, corpus, score, relevance_threshold)
+        """
+        return {"relevant_corpora":self.occupation_index.relevant_corpora(occupation=occupation)}
+
+    def parse_request(self, path:str, request:dict):
+        """
+        Validates the JSON body of a POST request and returns the method answering it - invalid bodies raise ValueError, KeyError, or TypeError (answered w/ 400)
+
+            Parameters:
+                path (str): endpoint requested - /query, /top_k, /corpora, or /relevant_corpora
+                request (dict): parsed JSON body of the request
+
+            Returns:
+                endpoint (callable): method answering the request
+                arguments (dict): keyword arguments of endpoint
+        """
+        if not isinstance(request, dict):
+            raise TypeError(f"request body must be a JSON object, not {type(request).__name__}")
+
+        def read_field(field:str, field_types:tuple, default=KeyError):
+            value = request[field] if default is KeyError else request.get(field, default)
+            # bool is a subclass of int, but true/false is never a valid number here
+            if not isinstance(value, field_types) or (isinstance(value, bool) and bool not in field_types):
+                raise TypeError(f"{field} must be {' or '.join(field_type.__name__ for field_type in field_types)}, not {type(value).__name__}")
+            return value
+
+        if path == "/query":
+            relevant_states = read_field("relevant_states", (list, type(None)), default=None)
+            if relevant_states is not None and not all(isinstance(state, str) for state in relevant_states):
+                raise TypeError("relevant_states must be a list of state names")
+            output = read_field("output", (str,), default="titles")
+            if output not in ("titles", "rows"):
+                raise ValueError(f"output must be 'titles' or 'rows', not {output!r}")
+            return self.query, {"job_code_text_corpus":read_field("job_code_text_corpus", (str,)), "relevant_states":relevant_states,
+                                "relevance_threshold":float(read_field("relevance_threshold", (int, float))), "output":output}
+        if path == "/top_k":
+            k = read_field("k", (int,), default=10)
+            if k < 1:
+                raise ValueError(f"k must be at least 1, not {k}")
+            return self.top_k, {"job_code_text_corpus":read_field("job_code_text_corpus", (str,)), "k":k}
+        if path == "/corpora":
+            return self.add_corpus, {"name":read_field("name", (str,)), "job_code_text_corpus":read_field("job_code_text_corpus", (str,)),
+                                     "relevance_threshold":float(read_field("relevance_threshold", (int, float)))}
+        return self.relevant_corpora, {"occupation":read_field("occupation", (str,))}
+
+    def serve(self):
+        """
+        Starts warm-up in a background thread - so /health and /status answer right away - then serves requests (each in its own thread) until interrupted
+        """
+        threading.Thread(target=self.warm_up, daemon=True).start()
+        http_server = ThreadingHTTPServer((self.host, self.port), self.create_request_handler())
+        try:
+            http_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            http_server.server_close()
+
+    def create_request_handler(self):
+        """
+        Creates request handler class bound to this QueryServer
+
+            Returns:
+                request_handler (type): BaseHTTPRequestHandler subclass routing requests to this QueryServer
+        """
+        query_server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+
+            def send_json(self, status_code:int, body:dict):
+                encoded_body = json.dumps(body).encode()
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded_body)))
+                self.end_headers()
+                self.wfile.write(encoded_body)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self.send_json(200, {"status":"ok"})
+                elif self.path == "/status":
+                    self.send_json(200, query_server.get_status())
+                else:
+                    self.send_json(404, {"error":f"Unknown endpoint {self.path}"})
+
+            def do_POST(self):
+                if self.path not in ("/query", "/top_k", "/corpora", "/relevant_corpora"):
+                    self.send_json(404, {"error":f"Unknown endpoint {self.path}"})
+                    return
+                if query_server.status != "ready":
+                    self.send_json(503, query_server.get_status())
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    endpoint, arguments = query_server.parse_request(path=self.path, request=request)
+                except (ValueError, KeyError, TypeError) as e:
+                    self.send_json(400, {"error":f"Invalid query: {e!r}"})
+                    return
+                start = time.perf_counter()
+                try:
+                    result = endpoint(**arguments)
+                except Exception as e:
+                    # the client always gets a response - an exception escaping do_POST would close the connection w/o one
+                    self.send_json(500, {"error":f"Query failed: {e!r}"})
+                    return
+                result["query_seconds"] = time.perf_counter() - start
+                self.send_json(200, result)
+
+            def log_message(self, format, *args):
+                pass # keep the console quiet - one line per request adds up when iterating interactively
+
+        return RequestHandler
@@ -0,0 +1,220 @@
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+try:
+    import resource
+except ImportError: # not available on Windows - peak RSS is reported as None
+    resource = None
+
+class RunReport:
+    """
+    Class designed to collect structured per-stage telemetry of a model run - wall time, CPU time, peak RSS, and stage-specific counts (e.g. rows in/out) -
+    and to optionally profile stages
+    When disabled, stage() returns a shared no-op context, so instrumented code pays next to nothing
+
+    Fields of each stage:
+        wall_seconds: wall time of the stage
+        cpu_seconds: CPU time of the whole process during the stage - counts every thread, so stages that overlap (e.g. model_load running alongside
+                     ingest in concurrent mode) each include the other's CPU time
+        thread_cpu_seconds: CPU time of the thread running the stage - excludes other stages, but also the stage's own worker threads & processes
+        peak_rss_mb: peak RSS of this process since it started, read when the stage ends (ru_maxrss) - cumulative, so a stage that stays below an
+                     earlier peak reports that peak. W/ reset_peak_rss, the stage's own peak instead (Linux: VmHWM, reset when the stage starts) - a
+                     stage that starts while another is running doesn't reset it, so its peak also covers the stages it overlaps, and it is None
+                     where the peak can't be reset (e.g. macOS, Windows). Excludes worker processes (e.g. parallel ingest) either way
+        peak_rss_delta_mb: how much process_peak_rss_mb grew during the stage - 0 unless the stage (or a stage it overlaps) set a new peak for the run
+        process_peak_rss_mb: peak RSS of the process & its finished worker processes since the run started - cumulative, not the stage's own peak
+
+    Attributes:
+        enabled (bool): whether telemetry is collected
+        profile_stages (set): names of stages to profile - "all" profiles every stage, None profiles none
+        profiler: "cprofile" to profile w/ cProfile, or a callable taking a stage name and returning a context manager (e.g. wrapping a sampling profiler)
+        profile_loc (str): folder cProfile stats are written to, one {stage}.prof file per profiled stage
+        reset_peak_rss (bool): whether VmHWM is reset when each stage starts, so peak_rss_mb is the stage's own peak - resets the peak RSS of the
+                               whole process (incl. for any other code reading it), so it is off unless asked for
+        stages (list): telemetry of each completed stage, in order - see fields above
+        summary (dict): run-level telemetry (e.g. unique titles scored, out-of-vocabulary token rate)
+        lock (threading.Lock): guards the peak RSS bookkeeping of stages that run in different threads
+        active_stages (int): number of stages currently running
+        max_peak_rss_mb (float): highest VmHWM seen before a reset (reset_peak_rss only) - resets also lower ru_maxrss, so the run's peak is kept here
+        cpu_start (float): process CPU time when the first stage started
+        cpu_end (float): process CPU time when the last stage ended
+
+    Methods:
+        __init__: initializes instance of RunReport class
+        stage: context manager measuring a stage
+        record: adds run-level telemetry to summary
+        to_dict: returns the report as a dict
+        write: writes the report as JSON
+        read_stage_peak_rss_mb: returns VmHWM of this process in MB, optionally resetting it
+        read_peak_rss_mb: returns peak RSS of the process & its finished worker processes so far
+        read_process_peak_rss_mb: returns ru_maxrss of this process or of its finished worker processes, in MB
+    """
+    def __init__(self, enabled:bool=True, profile_stages=None, profiler="cprofile", profile_loc:str=None, reset_peak_rss:bool=False):
+        """
+        Initializes instance of RunReport class
+
+        Parameters:
+            enabled (bool): whether telemetry is collected
+            profile_stages (set): names of stages to profile - "all" profiles every stage, None profiles none
+            profiler: "cprofile" to profile w/ cProfile, or a callable taking a stage name and returning a context manager (e.g. wrapping a sampling profiler)
+            profile_loc (str): folder cProfile stats are written to - defaults to the current folder
+            reset_peak_rss (bool): whether to reset the process' peak RSS (Linux: write to /proc/self/clear_refs) when each stage starts, so peak_rss_mb
+                                   is the stage's own peak - off by default, since the reset is visible to the whole process
+        """
+        self.enabled = enabled
+        self.profile_stages = profile_stages
+        self.profiler = profiler
+        self.profile_loc = profile_loc or os.getcwd()
+        self.reset_peak_rss = reset_peak_rss
+        self.stages = []
+        self.summary = {}
+        self.lock = threading.Lock()
+        self.active_stages = 0
+        self.max_peak_rss_mb = None
+        self.cpu_start = None
+        self.cpu_end = None
+
+    def stage(self, name:str, **counts):
+        """
+        Context manager measuring a stage - yields a dict the stage can add counts to (e.g. rows_out), which are recorded w/ its timings
+
+        Parameters:
+            name (str): name of the stage
+            counts: counts known when the stage starts (e.g. rows_in)
+
+        Returns:
+            stage_context: context manager yielding the stage's dict of counts
+        """
+        if not self.enabled:
+            return contextlib.nullcontext({})
+        return self.measure_stage(name, counts)
+
+    @contextlib.contextmanager
+    def measure_stage(self, name:str, counts:dict):
+        """
+        Measures a stage - see stage
+        """
+        profile_context = self.profile(name) if self.profile_stages == "all" or (self.profile_stages and name in self.profile_stages) else contextlib.nullcontext()
+        with self.lock:
+            # only reset the peak when no other stage is running - a reset would lose the peak of a stage running in another thread
+            stage_peak_rss_mb = self.read_stage_peak_rss_mb(reset=self.active_stages == 0) if self.reset_peak_rss else None
+            start_peak_rss_mb = self.read_peak_rss_mb()
+            self.active_stages += 1
+        wall_start, cpu_start, thread_cpu_start = time.perf_counter(), time.process_time(), time.thread_time()
+        if self.cpu_start is None:
+            self.cpu_start = cpu_start
+        try:
+            with profile_context:
+                yield counts
+        finally:
+            wall_end, cpu_end, thread_cpu_end = time.perf_counter(), time.process_time(), time.thread_time()
+            with self.lock:
+                self.active_stages -= 1
+                if not self.reset_peak_rss:
+                    stage_peak_rss_mb = self.read_process_peak_rss_mb(who="self")
+                elif stage_peak_rss_mb is not None:
+                    stage_peak_rss_mb = self.read_stage_peak_rss_mb(reset=False)
+                end_peak_rss_mb = self.read_peak_rss_mb()
+                self.cpu_end = cpu_end
+                self.stages.append({"stage":name,
+                                    "wall_seconds":round(wall_end - wall_start, 4),
+                                    "cpu_seconds":round(cpu_end - cpu_start, 4),
+                                    "thread_cpu_seconds":round(thread_cpu_end - thread_cpu_start, 4),
+                                    "peak_rss_mb":stage_peak_rss_mb,
+                                    "peak_rss_delta_mb":round(end_peak_rss_mb - start_peak_rss_mb, 1) if start_peak_rss_mb is not None else None,
+                                    "process_peak_rss_mb":end_peak_rss_mb,
+                                    **counts})
+
+    @contextlib.contextmanager
+    def profile(self, name:str):
+        """
+        Profiles a stage w/ cProfile (written to {profile_loc}/{name}.prof) or w/ the user-supplied profiler
+        """
+        if self.profiler != "cprofile":
+            with self.profiler(name):
+                yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.profile_loc, exist_ok=True)
+            profiler.dump_stats(f"{self.profile_loc}/{name}.prof")
+
+    def record(self, **fields):
+        """
+        Adds run-level telemetry to summary - no-op when disabled
+        """
+        if self.enabled:
+            self.summary.update(fields)
+
+    def to_dict(self):
+        """
+        Returns the report as a dict
+
+        Returns:
+            report (dict): stages, summary, total wall time of the stages, process CPU time btwn the start of the first stage & the end of the last
+                           (summing cpu_seconds would count overlapping stages twice), and peak RSS of the run
+        """
+        return {"stages":self.stages,
+                "summary":self.summary,
+                "total_wall_seconds":round(sum(stage["wall_seconds"] for stage in self.stages), 4),
+                "total_cpu_seconds":round(self.cpu_end - self.cpu_start, 4) if self.cpu_end is not None else 0.0,
+                "peak_rss_mb":self.read_peak_rss_mb()}
+
+    def write(self, report_loc:str):
+        """
+        Writes the report as JSON
+
+        Parameters:
+            report_loc (str): filepath to write the report to
+        """
+        with open(report_loc, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def read_stage_peak_rss_mb(self, reset:bool):
+        """
+        Returns VmHWM (peak RSS since the last reset) of this process in MB, and optionally resets it to the current RSS - the caller holds lock
+
+        Parameters:
+            reset (bool): whether to reset VmHWM after reading it
+
+        Returns:
+            peak_rss_mb (float): VmHWM in MB - None where VmHWM can't be read & reset (e.g. macOS, Windows)
+        """
+        try:
+            with open("/proc/self/status") as f:
+                peak_rss_mb = next(int(line.split()[1]) / 1024 for line in f if line.startswith("VmHWM:"))
+            if reset:
+                with open("/proc/self/clear_refs", "w") as f:
+                    f.write("5")
+        except (OSError, StopIteration):
+            return None
+        self.max_peak_rss_mb = max(self.max_peak_rss_mb or 0.0, peak_rss_mb)
+        return round(peak_rss_mb, 1)
+
+    def read_peak_rss_mb(self):
+        """
+        Returns peak RSS of this process (and of finished worker processes, e.g. parallel ingest) so far, in MB - incl. peaks from before VmHWM was reset
+        """
+        if resource is None:
+            return None
+        peak_rss = max(self.read_process_peak_rss_mb(who="self"), self.read_process_peak_rss_mb(who="children"))
+        return round(max(peak_rss, self.max_peak_rss_mb or 0.0), 1)
+
+    @staticmethod
+    def read_process_peak_rss_mb(who:str):
+        """
+        Returns ru_maxrss of this process ("self") or the largest of its finished worker processes ("children"), in MB - None where resource is unavailable (e.g. Windows)
+        """
+        if resource is None:
+            return None
+        # ru_maxrss is in KB on Linux, bytes on macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(resource.getrusage(resource.RUSAGE_SELF if who == "self" else resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1)
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# version of the scoring algorithm - part of every cache key, bump it when the similarity formula (or how titles & corpora are prepared for it) changes
+# so scores calculated the old way are never served (they are evicted as they go unused)
+SCORE_VERSION = 1
+
+class ScoreCache:
+    """
+    Class designed to persist similarity scores of occupation titles to a text corpus, so re-running a known corpus (e.g. to tune relevance_threshold) is a lookup rather than a recomputation
+
+    Scores are keyed by (scoring fingerprint, tokenized corpus hash, normalized title) - the scoring fingerprint covers the model file, the tokenizer,
+    and SCORE_VERSION (see fingerprint_scoring)
+    Least-recently-used scores are evicted once the cache holds more than max_entries scores - checked every eviction_interval stored scores,
+    so the cache can briefly hold up to eviction_interval scores more
+
+    Attributes:
+        cache_loc (str): filepath to SQLite file holding the cached scores
+        max_entries (int): maximum number of scores kept in the cache
+        eviction_interval (int): number of scores stored btwn checks for scores to evict
+        stored_since_eviction (int): number of scores stored since the last check
+        connection (sqlite3.Connection): connection to the cache file
+
+    Methods:
+        __init__: initializes instance of ScoreCache class
+        lookup: returns cached scores for a list of titles
+        store: writes scores for a list of titles to the cache
+        has_entries: whether any scores are cached for a model and corpus
+        evict: removes least-recently-used scores above max_entries
+        fingerprint_scoring: returns the fingerprint scores are cached under - model file, tokenizer, and SCORE_VERSION
+        fingerprint_model: calculates a cheap fingerprint of a model file
+        hash_corpus: calculates the hash of a tokenized text corpus
+    """
+    def __init__(self, cache_loc:str, max_entries:int=1000000, eviction_interval:int=10000):
+        """
+        Initializes instance of ScoreCache class
+
+        Parameters:
+            cache_loc (str): filepath to SQLite file holding the cached scores - created if it does not exist
+            max_entries (int): maximum number of scores kept in the cache
+            eviction_interval (int): number of scores stored btwn checks for scores to evict - counting the scores takes a scan of the cache
+        """
+        self.cache_loc = cache_loc
+        self.max_entries = max_entries
+        self.eviction_interval = eviction_interval
+        self.stored_since_eviction = 0
+        os.makedirs(os.path.dirname(os.path.abspath(cache_loc)), exist_ok=True)
+        # connection is shared across threads - access is serialized w/ self.lock
+        self.connection = sqlite3.connect(cache_loc, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS scores (
+                                           model_fingerprint TEXT, corpus_hash TEXT, title TEXT, score REAL, last_used REAL,
+                                           PRIMARY KEY (model_fingerprint, corpus_hash, title))""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+
+    def lookup(self, model_fingerprint:str, corpus_hash:str, titles:list):
+        """
+        Returns cached scores for titles, marking them as recently used
+
+        Parameters:
+            model_fingerprint (str): fingerprint of how the scores were calculated - see fingerprint_scoring
+            corpus_hash (str): hash of the tokenized text corpus the scores were calculated against - see hash_corpus
+            titles (list): list of normalized occupation titles
+
+        Returns:
+            scores (dict): maps each title found in the cache to its score - titles not in the cache are omitted
+        """
+        scores = {}
+        titles = list(dict.fromkeys(titles))
+        with self.lock, self.connection:
+            # stay under SQLite's limit on the number of query parameters
+            for start in range(0, len(titles), 500):
+                batch = titles[start:start+500]
+                rows = self.connection.execute(f"""SELECT title, score FROM scores
+                                                   WHERE model_fingerprint = ? AND corpus_hash = ? AND title IN ({",".join("?" * len(batch))})""",
+                                               [model_fingerprint, corpus_hash, *batch])
+                scores.update(rows)
+            now = time.time()
+            self.connection.executemany("UPDATE scores SET last_used = ? WHERE model_fingerprint = ? AND corpus_hash = ? AND title = ?",
+                                        [(now, model_fingerprint, corpus_hash, title) for title in scores])
+        return scores
+
+    def store(self, model_fingerprint:str, corpus_hash:str, scores:dict):
+        """
+        Writes scores to the cache, then evicts least-recently-used scores if the cache is over max_entries - checked every eviction_interval stored scores
+
+        Parameters:
+            model_fingerprint (str): fingerprint of how the scores were calculated - see fingerprint_scoring
+            corpus_hash (str): hash of the tokenized text corpus the scores were calculated against - see hash_corpus
+            scores (dict): maps normalized occupation titles to their scores
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)",
+                                        [(model_fingerprint, corpus_hash, title, float(score), now) for title, score in scores.items()])
+            self.stored_since_eviction += len(scores)
+            evict = self.stored_since_eviction >= self.eviction_interval
+        if evict:
+            self.evict()
+
+    def has_entries(self, model_fingerprint:str, corpus_hash:str):
+        """
+        Whether any scores are cached for the model and corpus
+
+        Parameters:
+            model_fingerprint (str): fingerprint of how the scores were calculated - see fingerprint_scoring
+            corpus_hash (str): hash of the tokenized text corpus - see hash_corpus
+
+        Returns:
+            has_entries (bool): True if at least one score is cached
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT 1 FROM scores WHERE model_fingerprint = ? AND corpus_hash = ? LIMIT 1",
+                                          [model_fingerprint, corpus_hash]).fetchone()
+        return row is not None
+
+    def evict(self):
+        """
+        Removes least-recently-used scores until the cache holds at most max_entries scores
+        """
+        with self.lock, self.connection:
+            self.stored_since_eviction = 0
+            num_entries = self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+            if num_entries > self.max_entries:
+                self.connection.execute("DELETE FROM scores WHERE rowid IN (SELECT rowid FROM scores ORDER BY last_used LIMIT ?)",
+                                        [num_entries - self.max_entries])
+
+    @staticmethod
+    def fingerprint_scoring(model_loc:str, tokenizer:str):
+        """
+        Returns the fingerprint scores are cached under - a change to the model file, the tokenizer, or the scoring algorithm (SCORE_VERSION)
+        changes the fingerprint, so scores calculated differently are never served
+
+        Parameters:
+            model_loc (str): filepath of Word2Vec model
+            tokenizer (str): tokenizer titles & corpora were tokenized w/ - "nltk" or "fast"
+
+        Returns:
+            fingerprint (str): fingerprint of how the scores are calculated
+        """
+        return f"v{SCORE_VERSION}:{tokenizer}:{ScoreCache.fingerprint_model(model_loc=model_loc)}"
+
+    @staticmethod
+    def fingerprint_model(model_loc:str):
+        """
+        Calculates a cheap fingerprint of a model file from its name, size, and modification time - hashing a multi-GB file would defeat the purpose of the cache
+
+        Parameters:
+            model_loc (str): filepath of Word2Vec model
+
+        Returns:
+            fingerprint (str): fingerprint of the model file
+        """
+        stat = os.stat(model_loc)
+        return f"{os.path.basename(model_loc)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    @staticmethod
+    def hash_corpus(tokenized_text_corpus:list):
+        """
+        Calculates the SHA-256 hash of a tokenized text corpus
+
+        Parameters:
+            tokenized_text_corpus (list): tokenized text corpus
+
+        Returns:
+            hash (str): hex digest of the corpus' SHA-256 hash
+        """
+        return hashlib.sha256("\n".join(tokenized_text_corpus).encode()).hexdigest()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+from DataProcessor import DataProcessor
+from JobCodeIdentifier import JobCodeIdentifier
+from BatchModel import BatchModel
+from run_model import light_industry_model_inputs
+
+def build_vocabulary_pack(specs_locs:list=None, corpus_files:list=None, top_n:int=10000, model_loc:str=None, pack_loc:str=None, tokenizer:str="nltk"):
+    """
+    Builds the vocabulary pack - a small stand-in for the full Word2Vec model, holding every word of the occupation titles in the data,
+    the top_n most frequent words, and every word of the light industry corpus, the industry specs in specs_locs, and corpus_files
+    Model uses the pack when the full model is not present (see Model.get_model_loc)
+
+    Parameters:
+        specs_locs (list): filepaths of industry specs files (see BatchModel.load_industry_specs) whose corpora the pack should cover
+        corpus_files (list): filepaths of text files holding extra corpora the pack should cover
+        top_n (int): number of frequency-ranked words kept on top of title & corpus words
+        model_loc (str): filepath of the full Word2Vec model - None uses the native store if it exists, else the word2vec binary
+        pack_loc (str): filepath to write the pack to - None writes it where Model looks for it
+        tokenizer (str): "nltk" or "fast" - see JobCodeIdentifier
+
+    Returns:
+        report (dict): see JobCodeIdentifier.build_vocabulary_pack
+    """
+    scripts_loc = os.path.abspath(os.path.dirname(__file__))
+    if model_loc is None:
+        native_loc = f"{scripts_loc}/GoogleNews-vectors-negative300.kv"
+        model_loc = native_loc if os.path.exists(native_loc) else f"{scripts_loc}/GoogleNews-vectors-negative300.bin"
+    pack_loc = pack_loc or f"{scripts_loc}/GoogleNews-vectors-pack.kv"
+
+    # same data (and data cache) as Model
+    data_processor = DataProcessor(input_loc=os.path.abspath(os.path.join(scripts_loc, "../Data")),
+                                   input_filename_format="state_M{year}_dl.csv",
+                                   relevant_years=[2001,2022],
+                                   output_loc=os.path.abspath(os.path.join(scripts_loc, "../Outputs")),
+                                   cache_loc=os.path.abspath(os.path.join(scripts_loc, "../Cache")))
+    job_code_identifier = JobCodeIdentifier(data_all_years=data_processor.data_all_years, job_code_text_corpus=None, model_loc=model_loc,
+                                            relevance_threshold=None, tokenizer=tokenizer)
+    occupation_table = job_code_identifier.build_occupation_table(data_all_years=data_processor.data_all_years)
+    tokenized_titles = job_code_identifier.tokenize_titles(occupation_titles=occupation_table["NORMALIZED_TITLE"].unique().tolist())
+
+    text_corpora = [light_industry_model_inputs["job_code_text_corpus"]]
+    for specs_loc in specs_locs or []:
+        text_corpora += [spec["job_code_text_corpus"] for spec in BatchModel.load_industry_specs(specs_loc=specs_loc)]
+    for corpus_file in corpus_files or []:
+        with open(corpus_file) as f:
+            text_corpora.append(f.read())
+
+    return JobCodeIdentifier.build_vocabulary_pack(model_loc=model_loc, pack_loc=pack_loc,
+                                                   title_words=[word for title in tokenized_titles for word in title],
+                                                   corpus_words=[word for text_corpus in text_corpora for word in job_code_identifier.tokenize_text_corpus(text_corpus=text_corpus)],
+                                                   top_n=top_n)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a small vocabulary pack that stands in for the full Word2Vec model (e.g. in small containers and CI)")
+    parser.add_argument("--specs-loc", action="append", default=[], help="industry specs file whose corpora the pack should cover - may be repeated")
+    parser.add_argument("--corpus-file", action="append", default=[], help="text file holding an extra corpus the pack should cover - may be repeated")
+    parser.add_argument("--top-n", type=int, default=10000, help="number of frequency-ranked words kept on top of title & corpus words")
+    parser.add_argument("--model-loc", default=None, help="full Word2Vec model - the native store if it exists, else the word2vec binary, by default")
+    parser.add_argument("--pack-loc", default=None, help="filepath to write the pack to - where Model looks for it by default")
+    parser.add_argument("--tokenizer", choices=["nltk", "fast"], default="nltk", help="tokenize w/ NLTK's word_tokenize, or w/ the faster built-in tokenizer (same tokens)")
+    args = parser.parse_args()
+
+    report = build_vocabulary_pack(specs_locs=args.specs_loc, corpus_files=args.corpus_file, top_n=args.top_n,
+                                   model_loc=args.model_loc, pack_loc=args.pack_loc, tokenizer=args.tokenizer)
+    print(json.dumps(report, indent=2))
+    if report["unknown_corpus_words"]:
+        print(f"{len(report['unknown_corpus_words'])} corpus words are not in the model's vocabulary - any corpus containing one scores every title 0")
@@ -0,0 +1,8 @@
+import os
+from JobCodeIdentifier import JobCodeIdentifier
+
+if __name__ == "__main__":
+    # one-time conversion of the GoogleNews word2vec binary to a native store that Model memory-maps on startup
+    scripts_loc = os.path.abspath(os.path.dirname(__file__))
+    JobCodeIdentifier.convert_model(model_loc=f"{scripts_loc}/GoogleNews-vectors-negative300.bin",
+                                    native_loc=f"{scripts_loc}/GoogleNews-vectors-negative300.kv")
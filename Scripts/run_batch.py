@@ -0,0 +1,72 @@
+import argparse
+import os
+from BatchModel import BatchModel
+from RunReport import RunReport
+from OutputWriter import OutputWriter, OUTPUT_FORMATS, DEFAULT_PARTITION_COLS
+
+def run_batch(specs_loc:str, concurrent:bool=False, max_workers:int=None, typed_schema:bool=False, chunksize:int=None, report_loc:str=None, profile_stages:list=None,
+              output_format:str="parquet", partition_cols:list=DEFAULT_PARTITION_COLS, write_all_years:bool=False, tokenizer:str="nltk",
+              build_cube:bool=True, reset_peak_rss:bool=False):
+    """
+    Creates BatchModel object for all industries in a specs file, runs it, and writes one output per industry
+
+    Parameters:
+        specs_loc (str): filepath of JSON (or YAML) file of industry specs - see BatchModel.load_industry_specs
+        concurrent (bool): whether to parse yearly data files in parallel and load the Word2Vec model alongside data ingest
+        max_workers (int): number of worker processes used to parse yearly data files in concurrent mode - None uses all cores
+        typed_schema (bool): whether data from all years is stored w/ a compact typed schema
+        chunksize (int): streaming mode - number of rows of each data file read at a time - None reads each file in one go
+        report_loc (str): filepath to write the JSON run report (per-stage telemetry) to - None disables telemetry
+        profile_stages (list): names of stages to profile w/ cProfile (written next to the run report) - "all" profiles every stage
+        output_format (str): format of each industry's output - parquet, arrow (Arrow IPC), or csv
+        partition_cols (list): columns Parquet/Arrow outputs are partitioned by - e.g. ["YEAR", "STATE"], None writes a single file
+        write_all_years (bool): whether to also write data from all years to the outputs folder
+        tokenizer (str): "nltk" to tokenize w/ NLTK's word_tokenize, "fast" to tokenize w/ FastTokenizer (same tokens, w/o importing NLTK)
+        build_cube (bool): whether to also write each industry's aggregation cube (year x state x occupation rollups w/ growth) as {name}_cube
+        reset_peak_rss (bool): whether the run report resets peak RSS when each stage starts, reporting each stage's own peak - see RunReport
+
+    Returns:
+        batch_model (BatchModel): BatchModel object containing data relevant to each industry
+    """
+    run_report = RunReport(enabled=report_loc is not None, profile_stages=profile_stages,
+                           profile_loc=os.path.dirname(os.path.abspath(report_loc)) if report_loc is not None else None, reset_peak_rss=reset_peak_rss)
+    batch_model = BatchModel(industry_specs=BatchModel.load_industry_specs(specs_loc=specs_loc),
+                             concurrent=concurrent,
+                             max_workers=max_workers,
+                             typed_schema=typed_schema,
+                             chunksize=chunksize,
+                             run_report=run_report,
+                             output_writer=OutputWriter(output_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Outputs")), output_format=output_format, partition_cols=partition_cols),
+                             write_all_years=write_all_years,
+                             tokenizer=tokenizer,
+                             build_cube=build_cube)
+    batch_model.write_outputs()
+    if report_loc is not None:
+        run_report.write(report_loc=report_loc)
+
+    return batch_model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the model for many industries, sharing one data ingest and one Word2Vec model load")
+    parser.add_argument("specs_loc", help="JSON (or YAML) file listing industries - each w/ name, job_code_text_corpus (or corpus_file), relevant_states, relevance_threshold")
+    parser.add_argument("--concurrent", action="store_true", help="parse yearly data files in parallel and load the Word2Vec model alongside data ingest")
+    parser.add_argument("--max-workers", type=int, default=None, help="number of worker processes used to parse yearly data files in concurrent mode")
+    parser.add_argument("--typed-schema", action="store_true", help="store data from all years w/ a compact typed schema")
+    parser.add_argument("--chunksize", type=int, default=None, help="stream data files this many rows at a time, keeping only relevant states while reading")
+    parser.add_argument("--output-format", choices=list(OUTPUT_FORMATS), default="parquet", help="format of each industry's output")
+    parser.add_argument("--partition-cols", default=",".join(DEFAULT_PARTITION_COLS),
+                        help="comma-separated columns parquet/arrow outputs are partitioned by (e.g. YEAR,STATE) - empty writes a single file")
+    parser.add_argument("--write-all-years", action="store_true", help="also write data from all years to the outputs folder")
+    parser.add_argument("--tokenizer", choices=["nltk", "fast"], default="nltk", help="tokenize w/ NLTK's word_tokenize, or w/ the faster built-in tokenizer (same tokens)")
+    parser.add_argument("--no-cube", action="store_true", help="skip the aggregation cube written alongside each industry's data")
+    parser.add_argument("--report-loc", default=None, help="write a JSON run report w/ per-stage wall/CPU time, peak RSS, and counts to this file")
+    parser.add_argument("--profile-stages", default=None, help="comma-separated stages to profile w/ cProfile (e.g. csv_parse,similarity), or 'all' - requires --report-loc")
+    parser.add_argument("--reset-peak-rss", action="store_true", help="report each stage's own peak RSS, resetting the process' peak when each stage starts (Linux only)")
+    args = parser.parse_args()
+
+    profile_stages = args.profile_stages if args.profile_stages in (None, "all") else args.profile_stages.split(",")
+    run_batch(specs_loc=args.specs_loc, concurrent=args.concurrent, max_workers=args.max_workers, typed_schema=args.typed_schema, chunksize=args.chunksize,
+              report_loc=args.report_loc, profile_stages=profile_stages, output_format=args.output_format,
+              partition_cols=args.partition_cols.split(",") if args.partition_cols else None, write_all_years=args.write_all_years, tokenizer=args.tokenizer,
+              build_cube=not args.no_cube, reset_peak_rss=args.reset_peak_rss)
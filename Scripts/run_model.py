@@ -1,18 +1,26 @@
+import os
 from Model import Model
+from RunReport import RunReport
+from OutputWriter import OutputWriter
 
-def run_model(model_inputs:dict):
+def run_model(model_inputs:dict, run_report:RunReport=None, output_writer:OutputWriter=None):
     """
     Creates DataModel object given set of inputs and runs it
 
     Parameters:
         model_inputs (dict): dictionary of inputs specifying conditions of DataModel user wishes to run
+        run_report (RunReport): collects per-stage telemetry of the run - None disables telemetry
+        output_writer (OutputWriter): writes outputs - None writes Outputs/light_industry.csv, which the Tableau workbook reads
 
     Returns:
         light_industry_model (Model): Model object containing info & data relevant to the specified industry, threshold, & states
     """
     light_industry_data_model = Model(job_code_text_corpus=model_inputs["job_code_text_corpus"],
                                         relevant_states=model_inputs["relevant_states"],
-                                        relevance_threshold=model_inputs["relevance_threshold"])
+                                        relevance_threshold=model_inputs["relevance_threshold"],
+                                        run_report=run_report,
+                                        output_writer=output_writer if output_writer is not None else
+                                                      OutputWriter(output_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Outputs")), output_format="csv"))
     
     return light_industry_data_model
 
@@ -109,8 +117,13 @@ with us.
 
 if __name__ == "__main__":
     # model inputs that represent occupations and states relevant to Light Industry
-    light_industry = run_model(model_inputs=light_industry_model_inputs)
-    light_industry.data_to_analyze.to_csv(f"{light_industry.get_output_loc()}/light_industry.csv", index=False)
+    # per-stage telemetry of the run - pass profile_stages (e.g. {"similarity"}) to also write cProfile stats of those stages to the outputs folder
+    run_report = RunReport(profile_stages=None, profile_loc=os.path.abspath(os.path.join(os.path.dirname(__file__), "../Outputs")))
+    light_industry = run_model(model_inputs=light_industry_model_inputs, run_report=run_report)
+    # a single CSV, which the Tableau workbook reads - pass output_writer=OutputWriter(...) to run_model for compressed Parquet partitioned by YEAR instead
+    # the aggregation cube (totals, weighted wages, growth by year x state x occupation) is written alongside as light_industry_cube
+    light_industry.write_output(name="light_industry")
+    run_report.write(report_loc=f"{light_industry.get_output_loc()}/light_industry_run_report.json")
 
 
 
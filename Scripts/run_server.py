@@ -0,0 +1,18 @@
+import argparse
+from QueryServer import QueryServer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep data from all years and the Word2Vec model resident, answering industry queries over local HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="host to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    parser.add_argument("--concurrent", action="store_true", help="parse yearly data files in parallel and load the Word2Vec model alongside data ingest during warm-up")
+    parser.add_argument("--max-workers", type=int, default=None, help="number of worker processes used to parse yearly data files in concurrent mode")
+    parser.add_argument("--typed-schema", action="store_true", help="store data from all years w/ a compact typed schema")
+    parser.add_argument("--tokenizer", choices=["nltk", "fast"], default="nltk", help="tokenize w/ NLTK's word_tokenize, or w/ the faster built-in tokenizer (same tokens)")
+    parser.add_argument("--index-backend", choices=["exact", "approximate"], default="exact",
+                        help="backend of the occupation index behind /top_k - approximate (HNSW) requires hnswlib")
+    args = parser.parse_args()
+
+    QueryServer(host=args.host, port=args.port, concurrent=args.concurrent,
+                max_workers=args.max_workers, typed_schema=args.typed_schema, tokenizer=args.tokenizer,
+                index_backend=args.index_backend).serve()
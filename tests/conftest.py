@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the scripts import each other as top-level modules (e.g. "from DataProcessor import DataProcessor"), as when run from the Scripts folder
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../Scripts")))
+# tests that ingest data generate BLS-shaped files w/ the benchmarks' synthetic data generator
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../Benchmarks")))
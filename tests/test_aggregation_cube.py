@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from AggregationCube import AggregationCube, ALL_STATES, ALL_OCCUPATIONS
+
+@pytest.fixture
+def detail_data():
+    """
+    Returns filtered data of two states & two years - detailed occupations, a major group summing them, and the all-occupations total
+    """
+    rows = []
+    for year, scale in ((2019, 1), (2020, 2)):
+        for state in ("Ohio", "Texas"):
+            rows += [{"YEAR":year, "STATE":state, "OCC_TITLE":"Welders", "O_GROUP":"detailed", "TOT_EMP":f"{1000 * scale:,}", "A_MEAN":"40,000"},
+                     {"YEAR":year, "STATE":state, "OCC_TITLE":"Machinists", "O_GROUP":"detailed", "TOT_EMP":f"{3000 * scale:,}", "A_MEAN":"60,000"},
+                     {"YEAR":year, "STATE":state, "OCC_TITLE":"Production Occupations", "O_GROUP":"major", "TOT_EMP":f"{4000 * scale:,}", "A_MEAN":"55,000"},
+                     {"YEAR":year, "STATE":state, "OCC_TITLE":"All Occupations", "O_GROUP":"total", "TOT_EMP":f"{9000 * scale:,}", "A_MEAN":"50,000"}]
+    return pd.DataFrame(rows)
+
+def get_cell(cube:pd.DataFrame, level:str, year:int, state:str, occ_title:str):
+    """
+    Returns the cube's cell of a level, year, state & occupation
+    """
+    cells = cube[(cube["AGGREGATION_LEVEL"] == level) & (cube["YEAR"] == year) & (cube["STATE"] == state) & (cube["OCC_TITLE"] == occ_title)]
+    assert len(cells) == 1
+    return cells.iloc[0]
+
+def test_totals_exclude_aggregate_rows(detail_data):
+    """
+    Cells totaling across occupations only sum detailed occupations - major groups & totals already sum them - while aggregate rows keep their own cells
+    """
+    cube = AggregationCube().build(detail_data=detail_data)
+
+    state = get_cell(cube=cube, level="state", year=2019, state="Ohio", occ_title=ALL_OCCUPATIONS)
+    assert state["ROWS"] == 2
+    assert state["TOT_EMP"] == 4000
+    assert state["A_MEAN"] == pytest.approx((1000 * 40000 + 3000 * 60000) / 4000)
+    total = get_cell(cube=cube, level="total", year=2020, state=ALL_STATES, occ_title=ALL_OCCUPATIONS)
+    assert total["ROWS"] == 4
+    assert total["TOT_EMP"] == 16000
+
+    assert get_cell(cube=cube, level="state_occupation", year=2019, state="Ohio", occ_title="Production Occupations")["TOT_EMP"] == 4000
+    assert get_cell(cube=cube, level="occupation", year=2020, state=ALL_STATES, occ_title="All Occupations")["TOT_EMP"] == 36000
+
+def test_growth_of_totals(detail_data):
+    """
+    Growth of cells totaling across occupations is calculated over detailed occupations reported in both years
+    """
+    cube = AggregationCube().build(detail_data=detail_data)
+    state = get_cell(cube=cube, level="state", year=2020, state="Texas", occ_title=ALL_OCCUPATIONS)
+    assert state["TOT_EMP_YOY"] == pytest.approx(1.0)
+    assert state["TOT_EMP_YOY_COVERAGE"] == 1
+    assert pd.isna(get_cell(cube=cube, level="state", year=2019, state="Texas", occ_title=ALL_OCCUPATIONS)["TOT_EMP_YOY"])
+
+def test_missing_o_group_counts_as_detailed(detail_data):
+    """
+    Rows of data w/o O_GROUP (e.g. older files) all count as detailed
+    """
+    cube = AggregationCube().build(detail_data=detail_data[detail_data["O_GROUP"] == "detailed"].drop(columns="O_GROUP"))
+    assert get_cell(cube=cube, level="state", year=2019, state="Ohio", occ_title=ALL_OCCUPATIONS)["TOT_EMP"] == 4000
@@ -0,0 +1,84 @@
+import os
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+from DataCache import DataCache
+
+@pytest.fixture
+def source_loc(tmp_path):
+    """
+    Returns the filepath of a small source file
+    """
+    source_loc = tmp_path / "state_M2019_dl.csv"
+    source_loc.write_text("STATE,TOT_EMP\nOhio,10\nTexas,**\n")
+    return str(source_loc)
+
+@pytest.fixture
+def df():
+    """
+    Returns a processed DF, w/ a column mixing numbers & suppression markers (e.g. LOC_Q)
+    """
+    return pd.DataFrame({"STATE":["Ohio", "Texas"], "TOT_EMP":[10.0, None], "LOC_Q":pd.Series([1.5, "**"], dtype=object), "YEAR":[2019, 2019]})
+
+def test_round_trip(tmp_path, source_loc, df):
+    """
+    A stored DF is loaded back - also by a new DataCache reading the manifest - w/ mixed columns stored as strings
+    """
+    DataCache(cache_loc=str(tmp_path / "cache")).store(source_loc=source_loc, df=df)
+    cached_df = DataCache(cache_loc=str(tmp_path / "cache")).load(source_loc=source_loc)
+    pd.testing.assert_frame_equal(cached_df.drop(columns="LOC_Q"), df.drop(columns="LOC_Q"))
+    assert cached_df["LOC_Q"].tolist() == ["1.5", "**"]
+
+def test_unknown_source_not_loaded(tmp_path, source_loc):
+    """
+    A source file that was never stored isn't loaded
+    """
+    assert DataCache(cache_loc=str(tmp_path / "cache")).load(source_loc=source_loc) is None
+
+def test_changed_source_invalidates(tmp_path, source_loc, df):
+    """
+    A source file whose contents changed isn't loaded - whether or not its size changed
+    """
+    data_cache = DataCache(cache_loc=str(tmp_path / "cache"))
+    data_cache.store(source_loc=source_loc, df=df)
+    stat = os.stat(source_loc)
+
+    # same size & new mtime - caught by the hash
+    with open(source_loc, "w") as f:
+        f.write("STATE,TOT_EMP\nOhio,11\nTexas,**\n")
+    os.utime(source_loc, (stat.st_atime, stat.st_mtime + 10))
+    assert os.stat(source_loc).st_size == stat.st_size
+    assert data_cache.load(source_loc=source_loc) is None
+
+    # new size
+    with open(source_loc, "a") as f:
+        f.write("Utah,5\n")
+    assert data_cache.load(source_loc=source_loc) is None
+
+def test_touched_source_still_loaded(tmp_path, source_loc, df):
+    """
+    A source file w/ a new mtime but the same contents (e.g. re-downloaded) is still loaded, and its new mtime is recorded
+    """
+    data_cache = DataCache(cache_loc=str(tmp_path / "cache"))
+    data_cache.store(source_loc=source_loc, df=df)
+    stat = os.stat(source_loc)
+    os.utime(source_loc, (stat.st_atime, stat.st_mtime + 10))
+
+    assert data_cache.load(source_loc=source_loc) is not None
+    assert DataCache(cache_loc=str(tmp_path / "cache")).manifest[os.path.basename(source_loc)]["mtime"] == stat.st_mtime + 10
+
+def test_missing_or_unreadable_cached_file(tmp_path, source_loc, df):
+    """
+    A deleted cached file isn't loaded, and a truncated one is parsed again w/ a warning
+    """
+    data_cache = DataCache(cache_loc=str(tmp_path / "cache"))
+    data_cache.store(source_loc=source_loc, df=df)
+    cached_file_loc = tmp_path / "cache" / data_cache.manifest[os.path.basename(source_loc)]["cache_file"]
+
+    cached_file_loc.write_bytes(cached_file_loc.read_bytes()[:20])
+    with pytest.warns(UserWarning, match="Could not read cached"):
+        assert data_cache.load(source_loc=source_loc) is None
+
+    cached_file_loc.unlink()
+    assert data_cache.load(source_loc=source_loc) is None
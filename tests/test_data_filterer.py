@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+from DataFilterer import DataFilterer
+
+@pytest.fixture
+def data_all_years():
+    """
+    Returns data w/ titles repeated across states & years, and rows missing a title or state
+    """
+    return pd.DataFrame({"OCC_TITLE":["Welders", "Machinists", "Welders", "Welders", None, "Machinists", "Welders", "Packers*", "Welders"],
+                         "STATE":["Ohio", "Ohio", "Texas", "Ohio", "Ohio", None, "Utah", "Texas", "Texas"],
+                         "YEAR":[2019, 2019, 2019, 2020, 2020, 2020, 2020, 2021, 2021],
+                         "TOT_EMP":np.arange(9)}, index=np.arange(9) * 10)
+
+@pytest.mark.parametrize("relevant_states", [None, ["Ohio", "Texas"], ["Texas", "Ohio", "Texas"], ["Nevada"], []])
+@pytest.mark.parametrize("relevant_job_titles", [["Welders"], ["Welders", "Machinists", "Welders"], ["Packers*", "Carpenters"], []])
+def test_filter_matches_isin(data_all_years, relevant_states, relevant_job_titles):
+    """
+    The index selects the same rows, in the same order, as masking w/ isin - repeated titles or states don't repeat rows
+    """
+    states_mask = data_all_years["STATE"].notna() if relevant_states is None else data_all_years["STATE"].isin(relevant_states)
+    expected = data_all_years[data_all_years["OCC_TITLE"].isin(relevant_job_titles) & states_mask]
+    relevant_data = DataFilterer(relevant_states=relevant_states).filter_data(data_all_years=data_all_years, relevant_job_titles=relevant_job_titles)
+    pd.testing.assert_frame_equal(relevant_data, expected)
+
+def test_index_shared_across_states(data_all_years):
+    """
+    A DataFilterer reused for other states (or other data) gives the same rows as a new one
+    """
+    data_filterer = DataFilterer(relevant_states=["Ohio"])
+    data_filterer.filter_data(data_all_years=data_all_years, relevant_job_titles=["Welders"])
+    texas_data = data_filterer.with_states(relevant_states=["Texas"]).filter_data(data_all_years=data_all_years, relevant_job_titles=["Welders"])
+    assert texas_data.index.tolist() == [20, 80]
+
+    other_data = data_all_years.iloc[::-1]
+    pd.testing.assert_frame_equal(data_filterer.filter_data(data_all_years=other_data, relevant_job_titles=["Welders"]),
+                                  other_data[(other_data["OCC_TITLE"] == "Welders") & (other_data["STATE"] == "Ohio")])
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+from DataProcessor import DataProcessor
+from generate_synthetic_data import generate_bls_files
+
+YEARS = [2009, 2012]
+
+@pytest.fixture(scope="module")
+def input_loc(tmp_path_factory):
+    """
+    Returns the folder of small BLS-shaped yearly files - column names drift across the years, and some columns mix numbers & suppression markers
+    """
+    input_loc = str(tmp_path_factory.mktemp("Data"))
+    generate_bls_files(output_loc=input_loc, years=YEARS, num_states=4, num_occupations=30, seed=1)
+    return input_loc
+
+def read_data(input_loc:str, tmp_path, **kwargs):
+    """
+    Returns data from all years, read w/ DataProcessor
+    """
+    return DataProcessor(input_loc=input_loc, input_filename_format="state_M{year}_dl.csv", relevant_years=YEARS,
+                         output_loc=str(tmp_path / "Outputs"), **kwargs).data_all_years
+
+@pytest.mark.parametrize("chunksize", [7, 50, 1000000])
+def test_chunked_matches_full(input_loc, tmp_path, chunksize):
+    """
+    Streaming mode gives the same data, w/ the same dtypes, as reading each file in one go - whatever the chunksize
+    """
+    pd.testing.assert_frame_equal(read_data(input_loc=input_loc, tmp_path=tmp_path, chunksize=chunksize),
+                                  read_data(input_loc=input_loc, tmp_path=tmp_path))
+
+def test_chunked_w_states_matches_full(input_loc, tmp_path):
+    """
+    States applied while streaming keep the same rows as filtering data read in one go
+    """
+    data_all_years = read_data(input_loc=input_loc, tmp_path=tmp_path)
+    relevant_states = sorted(data_all_years["STATE"].unique())[:2]
+    streamed_data = read_data(input_loc=input_loc, tmp_path=tmp_path, chunksize=7, relevant_states=relevant_states)
+    pd.testing.assert_frame_equal(streamed_data.reset_index(drop=True),
+                                  data_all_years[data_all_years["STATE"].isin(relevant_states)].reset_index(drop=True))
+
+def test_cached_matches_parsed(input_loc, tmp_path):
+    """
+    Years loaded from the data cache give the same data as parsing the files
+    """
+    pytest.importorskip("pyarrow")
+    parsed_data = read_data(input_loc=input_loc, tmp_path=tmp_path, cache_loc=str(tmp_path / "Cache"))
+    cached_data = read_data(input_loc=input_loc, tmp_path=tmp_path, cache_loc=str(tmp_path / "Cache"))
+    pd.testing.assert_frame_equal(cached_data, parsed_data)
+    pd.testing.assert_frame_equal(parsed_data, read_data(input_loc=input_loc, tmp_path=tmp_path))
@@ -0,0 +1,62 @@
+import pytest
+from FastTokenizer import FastTokenizer
+
+nltk = pytest.importorskip("nltk")
+from nltk.tokenize.destructive import NLTKWordTokenizer
+from nltk.tokenize.punkt import PunktParameters, PunktSentenceTokenizer
+
+# initials, abbreviations, ordinals, ellipses & quotes around potential sentence breaks - the cases where punkt's second pass decides the tokens
+TEXTS = [
+    "Production Workers, All Other",
+    "Helpers--Production Workers",
+    "Inspectors, Testers, Sorters, Samplers, and Weighers",
+    "Sr. Engineers (Mech.)",
+    "a. -- welders",
+    "a. \"quoted\" b. 'single' c.",
+    "J. Bach wrote it. a. mr. Smith came.",
+    "see st. foo and mr. Bar. j. bar now",
+    "no. 5 is next. 1. first 2. Second",
+    "Wait... what? Yes! (It ended.) Then \"another.\" 'Done.'",
+    "u.s. and e.g. etc. Inc. co. x-ray",
+    "“Curly.” quotes… and «guillemets.» here",
+    "He said, \"Stop.\" She didn't. We can't.\nNew line. A. B. C.",
+    "  leading and trailing spaces.  ",
+    "",
+]
+
+def word_tokenize(text:str, punkt_parameters:PunktParameters):
+    """
+    Returns NLTK's word_tokenize tokens of text, w/ punkt_parameters in place of the installed punkt model
+    """
+    sentences = PunktSentenceTokenizer(punkt_parameters).tokenize(text)
+    return [token for sentence in sentences for token in NLTKWordTokenizer().tokenize(sentence)]
+
+def test_same_tokens_as_word_tokenize():
+    """
+    FastTokenizer w/ the installed punkt_tab data gives the same tokens as word_tokenize
+    """
+    try:
+        nltk.data.find("tokenizers/punkt_tab/english/")
+    except LookupError:
+        pytest.skip("punkt_tab data is not installed")
+    fast_tokenizer = FastTokenizer()
+    for text in TEXTS:
+        assert fast_tokenizer.tokenize(text) == nltk.word_tokenize(text), text
+
+def test_same_tokens_w_punkt_parameters():
+    """
+    FastTokenizer applies punkt's parameters the way punkt does - abbreviations, collocations, sentence starters, and orthographic context
+    """
+    punkt_parameters = PunktParameters()
+    punkt_parameters.abbrev_types = {"mr", "dr", "etc", "e.g", "u.s", "no", "st", "inc", "co", "sr", "mech"}
+    punkt_parameters.collocations = {("st", "foo"), ("no", "##number##")}
+    punkt_parameters.sent_starters = {"bar", "the"}
+    for typ, flags in {"bar":2, "foo":32, "smith":6, "welders":18, "and":96, "then":66}.items():
+        punkt_parameters.add_ortho_context(typ, flags)
+
+    fast_tokenizer = FastTokenizer()
+    fast_tokenizer.punkt_parameters = {"abbrev_types":punkt_parameters.abbrev_types, "collocations":punkt_parameters.collocations,
+                                       "sent_starters":punkt_parameters.sent_starters, "ortho_context":dict(punkt_parameters.ortho_context)}
+    for text in TEXTS:
+        assert fast_tokenizer.split_sentences(text=text) == PunktSentenceTokenizer(punkt_parameters).tokenize(text), text
+        assert fast_tokenizer.tokenize(text) == word_tokenize(text=text, punkt_parameters=punkt_parameters), text
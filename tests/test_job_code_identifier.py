@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from JobCodeIdentifier import JobCodeIdentifier
+
+KeyedVectors = pytest.importorskip("gensim.models").KeyedVectors
+
+@pytest.fixture
+def model():
+    """
+    Returns a small random Word2Vec model
+    """
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(50)]
+    model = KeyedVectors(vector_size=8)
+    model.add_vectors(words, rng.normal(size=(len(words), 8)).astype(np.float32))
+    return model
+
+def test_similarities_match_calculate_similarity(model):
+    """
+    Batch similarities of every title to several corpora match calculate_similarity on each title/corpus pair - incl. titles & corpora w/ words
+    outside the vocabulary (scored 0), repeated words, and upper-case keywords
+    """
+    job_code_identifier = JobCodeIdentifier(data_all_years=None, job_code_text_corpus=None, model_loc=None, relevance_threshold=None)
+    tokenized_titles = [["w1"], ["w2", "w3"], ["w4", "w5", "w6"], ["w7", "w7"], ["w8", "unknown"], ["w9", "w1", "w2", "w3"]]
+    text_corpora = [["w10", "w11", "w12"], ["W13", "w1", "w13"], ["w14", "unknown"], ["w2"]]
+
+    similarities = job_code_identifier.calculate_corpora_similarities(model=model, tokenized_titles=tokenized_titles, text_corpora=text_corpora)
+    expected = np.array([[job_code_identifier.calculate_similarity(model=model, occupation_title=title, text_corpus=text_corpus) for text_corpus in text_corpora]
+                         for title in tokenized_titles])
+    np.testing.assert_allclose(similarities, expected, rtol=1e-5, atol=1e-6)
+    assert (similarities[4] == 0).all() and (similarities[:, 2] == 0).all()
+    np.testing.assert_array_equal(job_code_identifier.calculate_similarities(model=model, tokenized_titles=tokenized_titles, text_corpus=text_corpora[1]),
+                                  similarities[:, 1])
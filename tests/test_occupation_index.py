@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from OccupationIndex import OccupationIndex
+
+hnswlib = pytest.importorskip("hnswlib")
+KeyedVectors = pytest.importorskip("gensim.models").KeyedVectors
+
+@pytest.fixture
+def catalog():
+    """
+    Returns a small random model, occupation table, and tokenized titles - 1-3 word titles, so occupations share words
+    """
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(400)]
+    model = KeyedVectors(vector_size=16)
+    model.add_vectors(words, rng.normal(size=(len(words), 16)).astype(np.float32))
+    titles = list(dict.fromkeys(" ".join(rng.choice(words, size=rng.integers(1, 4), replace=False)) for _ in range(300)))
+    occupation_table = pd.DataFrame({"NORMALIZED_TITLE":titles, "OCC_CODE":[f"{i:02d}-{i:04d}" for i in range(len(titles))], "OCC_TITLE":titles})
+    corpus = [str(word) for word in rng.choice(words, size=5, replace=False)]
+    return model, occupation_table, [title.split() for title in titles], corpus
+
+def build_index(index_loc:str, backend:str, catalog:tuple):
+    """
+    Returns an OccupationIndex built from catalog w/ one stored corpus
+    """
+    model, occupation_table, tokenized_titles, corpus = catalog
+    index = OccupationIndex(index_loc=index_loc, backend=backend)
+    index.build(occupation_table=occupation_table, tokenized_titles=tokenized_titles, model=model, model_fingerprint="fp")
+    index.add_corpus(name="corpus", tokenized_text_corpus=corpus, relevance_threshold=0.5, model=model)
+    return index
+
+def test_approximate_matches_exact(tmp_path, catalog):
+    """
+    The approximate backend holds one graph item per stored vector and returns the same occupations & scores as the exact backend
+    """
+    model, _, _, corpus = catalog
+    exact = build_index(index_loc=str(tmp_path / "exact"), backend="exact", catalog=catalog)
+    approximate = build_index(index_loc=str(tmp_path / "approximate"), backend="approximate", catalog=catalog)
+    assert approximate.ann_index.get_current_count() == len(approximate.token_words)
+    assert approximate.top_k(tokenized_text_corpus=corpus, model=model, k=10) == exact.top_k(tokenized_text_corpus=corpus, model=model, k=10)
+    assert np.array_equal(approximate.corpus_scores, exact.corpus_scores)
+
+def test_approximate_save_load(tmp_path, catalog):
+    """
+    A saved graph is loaded back w/ the index and answers the same queries
+    """
+    model, occupation_table, _, corpus = catalog
+    index = build_index(index_loc=str(tmp_path), backend="approximate", catalog=catalog)
+    index.save()
+    assert os.path.exists(tmp_path / "index.hnsw")
+
+    loaded = OccupationIndex(index_loc=str(tmp_path), backend="approximate")
+    assert loaded.load(model_fingerprint="fp", normalized_titles=occupation_table["NORMALIZED_TITLE"].tolist())
+    assert loaded.ann_index.get_current_count() == len(loaded.token_words)
+    assert loaded.top_k(tokenized_text_corpus=corpus, model=model, k=10) == index.top_k(tokenized_text_corpus=corpus, model=model, k=10)
+
+def test_stale_graph_not_loaded(tmp_path, catalog):
+    """
+    A graph saved before the index was rebuilt from other occupations is not loaded - its labels would point at the wrong vectors
+    """
+    model, occupation_table, tokenized_titles, corpus = catalog
+    build_index(index_loc=str(tmp_path), backend="approximate", catalog=catalog).save()
+    stale_graph = (tmp_path / "index.hnsw").read_bytes()
+
+    # rebuilt w/ the exact backend, which removes the graph
+    smaller_catalog = (model, occupation_table.iloc[:50], tokenized_titles[:50], corpus)
+    index = build_index(index_loc=str(tmp_path), backend="exact", catalog=smaller_catalog)
+    index.save()
+    assert not os.path.exists(tmp_path / "index.hnsw")
+    expected = index.top_k(tokenized_text_corpus=corpus, model=model, k=5)
+
+    # a graph w/ another item count (e.g. left by an interrupted save) is rebuilt
+    (tmp_path / "index.hnsw").write_bytes(stale_graph)
+    loaded = OccupationIndex(index_loc=str(tmp_path), backend="approximate")
+    assert loaded.load(model_fingerprint="fp", normalized_titles=occupation_table["NORMALIZED_TITLE"].iloc[:50].tolist())
+    assert loaded.ann_index.get_current_count() == len(loaded.token_words)
+    assert loaded.top_k(tokenized_text_corpus=corpus, model=model, k=5) == expected
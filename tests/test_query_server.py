@@ -0,0 +1,47 @@
+import pytest
+from QueryServer import QueryServer
+
+@pytest.fixture
+def query_server():
+    """
+    Returns a QueryServer that isn't warmed up or serving - enough to validate requests
+    """
+    return QueryServer()
+
+@pytest.mark.parametrize("path, request_body, error", [
+    ("/query", ["forklift"], TypeError),
+    ("/query", {"relevance_threshold":0.5}, KeyError),
+    ("/query", {"job_code_text_corpus":"forklift"}, KeyError),
+    ("/query", {"job_code_text_corpus":5, "relevance_threshold":0.5}, TypeError),
+    ("/query", {"job_code_text_corpus":"forklift", "relevance_threshold":"0.5"}, TypeError),
+    ("/query", {"job_code_text_corpus":"forklift", "relevance_threshold":True}, TypeError),
+    ("/query", {"job_code_text_corpus":"forklift", "relevance_threshold":0.5, "relevant_states":"Ohio"}, TypeError),
+    ("/query", {"job_code_text_corpus":"forklift", "relevance_threshold":0.5, "relevant_states":["Ohio", 5]}, TypeError),
+    ("/query", {"job_code_text_corpus":"forklift", "relevance_threshold":0.5, "output":"csv"}, ValueError),
+    ("/top_k", {"job_code_text_corpus":"forklift", "k":0}, ValueError),
+    ("/top_k", {"job_code_text_corpus":"forklift", "k":"5"}, TypeError),
+    ("/top_k", {"job_code_text_corpus":"forklift", "k":True}, TypeError),
+    ("/top_k", {"job_code_text_corpus":"forklift", "k":2.5}, TypeError),
+    ("/corpora", {"name":"warehousing", "job_code_text_corpus":"forklift"}, KeyError),
+    ("/relevant_corpora", {"occupation":None}, TypeError),
+])
+def test_invalid_requests(query_server, path, request_body, error):
+    """
+    Invalid request bodies raise the errors answered w/ 400
+    """
+    with pytest.raises(error):
+        query_server.parse_request(path=path, request=request_body)
+
+def test_valid_requests(query_server):
+    """
+    Valid request bodies are routed to their endpoint, w/ defaults filled in and thresholds as floats
+    """
+    endpoint, arguments = query_server.parse_request(path="/query", request={"job_code_text_corpus":"forklift", "relevance_threshold":1})
+    assert endpoint == query_server.query
+    assert arguments == {"job_code_text_corpus":"forklift", "relevant_states":None, "relevance_threshold":1.0, "output":"titles"}
+    assert isinstance(arguments["relevance_threshold"], float)
+
+    endpoint, arguments = query_server.parse_request(path="/top_k", request={"job_code_text_corpus":"forklift"})
+    assert endpoint == query_server.top_k and arguments == {"job_code_text_corpus":"forklift", "k":10}
+    endpoint, arguments = query_server.parse_request(path="/relevant_corpora", request={"occupation":"51-4121"})
+    assert endpoint == query_server.relevant_corpora and arguments == {"occupation":"51-4121"}
@@ -0,0 +1,39 @@
+import pytest
+from RunReport import RunReport
+
+def test_peak_rss_not_reset_by_default(monkeypatch):
+    """
+    By default, stages report the cumulative peak & its growth, w/o resetting the process' peak RSS
+    """
+    def read_stage_peak_rss_mb(self, reset:bool):
+        raise AssertionError("peak RSS was read for a reset w/o reset_peak_rss")
+    monkeypatch.setattr(RunReport, "read_stage_peak_rss_mb", read_stage_peak_rss_mb)
+
+    run_report = RunReport()
+    with run_report.stage("first", rows_in=1) as counts:
+        counts["rows_out"] = 1
+    with run_report.stage("second"):
+        pass
+    first, second = run_report.stages
+    assert first["rows_in"] == first["rows_out"] == 1
+    if RunReport.read_process_peak_rss_mb(who="self") is None:
+        pytest.skip("peak RSS is not available on this platform")
+    assert first["peak_rss_mb"] <= second["peak_rss_mb"] <= second["process_peak_rss_mb"]
+    assert second["peak_rss_delta_mb"] >= 0
+
+def test_reset_peak_rss_opt_in(monkeypatch):
+    """
+    W/ reset_peak_rss, the peak is reset when a stage starts (and not while another stage is running)
+    """
+    resets = []
+    def read_stage_peak_rss_mb(self, reset:bool):
+        resets.append(reset)
+        return 1.0
+    monkeypatch.setattr(RunReport, "read_stage_peak_rss_mb", read_stage_peak_rss_mb)
+
+    run_report = RunReport(reset_peak_rss=True)
+    with run_report.stage("outer"):
+        with run_report.stage("inner"):
+            pass
+    assert resets == [True, False, False, False]
+    assert [stage["peak_rss_mb"] for stage in run_report.stages] == [1.0, 1.0]